@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from . import bench_calendar, bench_db, bench_sweph, bench_yaml  # noqa: F401
+from .harness import compare, fail, get_commit, load, run, save
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Measure ephem's hot paths and save the results as JSON.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="run the large sizes too (up to 1M database rows); takes minutes",
+    )
+    parser.add_argument(
+        "-k",
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="run benchmarks whose name contains NAME; repeatable",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="results file (default: benchmarks/results/<time>-<commit>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="compare against an earlier results file and exit 1 on regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="percent slowdown counted as a regression (default: 10)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    baseline = load(args.compare) if args.compare else None
+
+    # keep the benchmarks away from the user's database and config
+    scratch = tempfile.TemporaryDirectory(prefix="ephem-bench-")
+    os.environ["EPHEM_DB"] = os.path.join(scratch.name, "ephem.db")
+    os.environ["XDG_CONFIG_HOME"] = scratch.name
+
+    mode = "full" if args.full else "quick"
+    print(f"{'benchmark':<32} {'size':>9} {'median':>14} {'throughput':>16}")
+    report = run(mode, args.only)
+    scratch.cleanup()
+
+    if not report["results"]:
+        fail(f"No benchmark matches {args.only}")
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    output = args.output or RESULTS_DIR / f"{stamp}-{get_commit() or 'nogit'}.json"
+    save(report, output)
+    print(f"\nSaved results to {output}")
+
+    if baseline:
+        regressions = compare(baseline, report, args.threshold / 100)
+        if regressions:
+            fail(f"\nSlower than baseline: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
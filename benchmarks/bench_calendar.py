@@ -0,0 +1,48 @@
+import io
+import os
+from argparse import Namespace
+from contextlib import redirect_stdout
+from ephem.display.month import format_calendar
+from ephem.export import calendar_row_to_dict, write_calendar
+from ephem.sweph.calendar import get_calendar_rows
+from .harness import benchmark
+
+FIRST_YEAR = 2025
+
+
+def months(size):
+    """`size` consecutive (year, month) pairs from January of FIRST_YEAR."""
+    return [(FIRST_YEAR + i // 12, i % 12 + 1) for i in range(size)]
+
+
+@benchmark("cal table", {"quick": [12], "full": [12, 120]}, repeat=3)
+def bench_format_calendar(size, workdir):
+    args = [
+        Namespace(
+            year=year,
+            month=month,
+            offset=None,
+            ascii=False,
+            stations=True,
+            precomputed=False,
+        )
+        for year, month in months(size)
+    ]
+
+    def op():
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for month_args in args:
+                format_calendar(month_args)
+
+    return op
+
+
+@benchmark("cal csv", {"quick": [12], "full": [12, 120]}, repeat=3)
+def bench_write_calendar(size, workdir):
+    def op():
+        out = io.StringIO()
+        for year, month in months(size):
+            days = [calendar_row_to_dict(row) for row in get_calendar_rows(year, month)]
+            write_calendar(days, "Tropical", "csv", out)
+
+    return op
@@ -0,0 +1,84 @@
+import os
+import random
+import sqlite3
+from ephem import db
+from .harness import SEED, benchmark
+
+# charts added per timed run of db.add_chart, on top of the seeded table
+ADD_COUNT = 1000
+
+
+def fake_charts(size):
+    rng = random.Random(SEED)
+    for i in range(size):
+        year = rng.randint(1900, 2099)
+        stamp = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00"
+        yield (
+            f"Chart {i}",
+            stamp + "+00:00",
+            stamp + "+00:00",
+            round(rng.uniform(-60, 60), 4),
+            round(rng.uniform(-180, 180), 4),
+        )
+
+
+def seed_database(workdir, size):
+    """Point ephem at a fresh database in workdir holding `size` charts."""
+    db.close_connections()
+    os.environ["EPHEM_DB"] = str(workdir / "ephem.db")
+    db.create_tables()
+    with sqlite3.connect(db.get_db_path()) as conn:
+        conn.executemany(
+            """
+            INSERT INTO charts (name, timestamp_utc, timestamp_input, latitude, longitude)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            fake_charts(size),
+        )
+
+
+SIZES = {"quick": [10_000], "full": [10_000, 100_000, 1_000_000]}
+
+
+@benchmark("db.add_chart", SIZES, repeat=3)
+def bench_add_chart(size, workdir):
+    seed_database(workdir, size)
+    charts = list(fake_charts(ADD_COUNT))
+
+    def op():
+        for chart in charts:
+            db.add_chart(*chart)
+
+    return op, ADD_COUNT
+
+
+# computing each chart's planet positions is most of the cost
+@benchmark("db.add_charts", SIZES, repeat=3)
+def bench_add_charts(size, workdir):
+    seed_database(workdir, size)
+    charts = list(fake_charts(ADD_COUNT))
+
+    def op():
+        db.add_charts(charts)
+
+    return op, ADD_COUNT
+
+
+@benchmark("db.view_charts", SIZES, repeat=3)
+def bench_view_charts(size, workdir):
+    seed_database(workdir, size)
+    return db.view_charts
+
+
+@benchmark("db.search_charts", SIZES, repeat=3)
+def bench_search_charts(size, workdir):
+    seed_database(workdir, size)
+    query = ("art 1", "1980-01-01", "1991-01-01", (-30, -90, 60, 90))
+    # throughput counts the matching rows, not the size of the table
+    matches = len(db.search_charts(*query))
+    db.close_connections()
+
+    def op():
+        db.search_charts(*query)
+
+    return op, matches
@@ -0,0 +1,82 @@
+import random
+import numpy as np
+import swisseph as swe
+from ephem import sweph
+from ephem.sweph.aspects import synastry_scores
+from ephem.sweph.batch import get_planets_batch
+from .harness import SEED, benchmark
+
+JD_1900 = swe.julday(1900, 1, 1, 0.0)
+JD_2100 = swe.julday(2100, 1, 1, 0.0)
+
+
+def random_moments(size):
+    """Julian days and coordinates spread over 1900–2100 and the globe."""
+    rng = random.Random(SEED)
+    return [
+        (rng.uniform(JD_1900, JD_2100), rng.uniform(-60, 60), rng.uniform(-180, 180))
+        for _ in range(size)
+    ]
+
+
+@benchmark("sweph.get_planets", {"quick": [500], "full": [500, 5000]})
+def bench_get_planets(size, workdir):
+    jds = [jd for jd, _, _ in random_moments(size)]
+
+    def op():
+        for jd in jds:
+            sweph.get_planets(jd)
+
+    return op
+
+
+@benchmark("sweph.get_planets sidereal", {"quick": [500], "full": [500, 5000]})
+def bench_get_planets_sidereal(size, workdir):
+    jds = [jd for jd, _, _ in random_moments(size)]
+
+    def op():
+        for jd in jds:
+            sweph.get_planets(jd, 1)
+
+    return op
+
+
+@benchmark("sweph.get_angles", {"quick": [2000], "full": [2000, 20000]})
+def bench_get_angles(size, workdir):
+    moments = random_moments(size)
+
+    def op():
+        for jd, lat, lng in moments:
+            sweph.get_angles(jd, lat, lng)
+
+    return op
+
+
+@benchmark("sweph.cast_horoscope", {"quick": [500], "full": [500, 5000]})
+def bench_cast_horoscope(size, workdir):
+    moments = random_moments(size)
+
+    def op():
+        for jd, lat, lng in moments:
+            sweph.cast_horoscope(jd, lat, lng)
+
+    return op
+
+
+@benchmark("sweph.get_planets_batch", {"quick": [1000], "full": [1000, 10000]})
+def bench_get_planets_batch(size, workdir):
+    jds = [jd for jd, _, _ in random_moments(size)]
+    return lambda: get_planets_batch(jds)
+
+
+@benchmark("sweph.synastry_scores", {"quick": [256], "full": [256, 1024]})
+def bench_synastry_scores(size, workdir):
+    rng = np.random.default_rng(SEED)
+    lngs = rng.uniform(0, 360, (size, 11))
+    tiles = [(a, b) for a in range(0, size, 64) for b in range(0, size, 64)]
+
+    def op():
+        for a, b in tiles:
+            synastry_scores(lngs[a : a + 64], lngs[b : b + 64])
+
+    return op, size * size
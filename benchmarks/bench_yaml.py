@@ -0,0 +1,29 @@
+import os
+from contextlib import redirect_stdout
+import yaml
+from ephem import yaml_sync
+from .bench_db import fake_charts
+from .harness import benchmark
+
+
+@benchmark("yaml_sync.full_sync", {"quick": [1000], "full": [1000, 5000]}, repeat=3)
+def bench_full_sync(size, workdir):
+    """Sync `size` YAML charts into an empty database."""
+    os.environ["EPHEM_DB"] = str(workdir / "ephem.db")
+    charts_dir = yaml_sync.ensure_charts_dir()
+    for name, utc, local, lat, lng in fake_charts(size):
+        chart = {
+            "name": name,
+            "timestamp_utc": utc,
+            "timestamp_input": local,
+            "latitude": lat,
+            "longitude": lng,
+        }
+        path = charts_dir / yaml_sync.get_yaml_filename(name)
+        path.write_text(yaml.safe_dump(chart, sort_keys=False))
+
+    def op():
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            yaml_sync.full_sync()
+
+    return op
@@ -0,0 +1,154 @@
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# every benchmark draws its inputs from this seed, so runs are comparable
+SEED = 20250809
+
+BENCHMARKS = []
+
+
+def benchmark(name, sizes, repeat=5):
+    """
+    Register a benchmark. The decorated function takes (size, workdir),
+    prepares its inputs and returns a zero-argument callable that does
+    `size` units of work, or (callable, units) when the work done does
+    not equal the size. It is set up afresh before every timed repeat,
+    in its own empty workdir, and only the callable is timed.
+    `sizes` maps "quick" and "full" to the sizes each mode runs.
+    """
+
+    def register(func):
+        BENCHMARKS.append(
+            {"name": name, "sizes": sizes, "repeat": repeat, "setup": func}
+        )
+        return func
+
+    return register
+
+
+def measure(bench, size):
+    times = []
+    items = size
+    for _ in range(bench["repeat"]):
+        workdir = Path(tempfile.mkdtemp(prefix="ephem-bench-"))
+        try:
+            op = bench["setup"](size, workdir)
+            if isinstance(op, tuple):
+                op, items = op
+            start = time.perf_counter()
+            op()
+            times.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    median = statistics.median(times)
+    return {
+        "name": bench["name"],
+        "size": size,
+        "repeat": bench["repeat"],
+        "times_s": times,
+        "median_s": median,
+        "min_s": min(times),
+        "items": items,
+        "items_per_s": items / median if median else None,
+    }
+
+
+def get_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def get_metadata(mode):
+    try:
+        from importlib.metadata import version
+
+        ephem_version = version("ephem-cli")
+    except Exception:
+        ephem_version = None
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
+        "seed": SEED,
+        "commit": get_commit(),
+        "ephem": ephem_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def run(mode="quick", only=None, progress=print):
+    results = []
+    for bench in BENCHMARKS:
+        if only and not any(pattern in bench["name"] for pattern in only):
+            continue
+        for size in bench["sizes"][mode]:
+            result = measure(bench, size)
+            progress(format_result(result))
+            results.append(result)
+    return {"meta": get_metadata(mode), "results": results}
+
+
+def format_result(result):
+    rate = result["items_per_s"]
+    return (
+        f"{result['name']:<32} {result['size']:>9,} "
+        f"{result['median_s'] * 1e3:>11.2f} ms {rate:>14,.0f}/s"
+    )
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Print the change in median time for benchmarks present in both runs.
+    Returns the names that got slower by more than threshold.
+    """
+    before = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<32} {'size':>9} {'before':>11} {'after':>11} {'change':>8}")
+    for result in current["results"]:
+        key = (result["name"], result["size"])
+        if key not in before:
+            continue
+        old, new = before[key]["median_s"], result["median_s"]
+        change = new / old - 1
+        flag = "  slower" if change > threshold else ""
+        print(
+            f"{result['name']:<32} {result['size']:>9,} {old * 1e3:>9.2f}ms "
+            f"{new * 1e3:>9.2f}ms {change:>+8.1%}{flag}"
+        )
+        if change > threshold:
+            regressions.append(f"{result['name']}[{result['size']}]")
+    return regressions
+
+
+def save(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def fail(message):
+    print(message, file=sys.stderr)
+    sys.exit(1)
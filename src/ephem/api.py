@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+from ephem.commands.cast_batch import (
+    CHART_ERRORS,
+    cast_row,
+    error_message,
+    read_rows,
+)
+from ephem.export import calendar_row_to_dict
+from ephem.server import chart, parse_offset
+from ephem.sweph.calendar import get_calendar_rows
+
+# largest request body accepted, in bytes
+MAX_BODY = 16 * 1024 * 1024
+
+# batch rows per executor task; a big batch waits its turn between
+# chunks, so short requests are never stuck behind all of it
+BATCH_CHUNK = 64
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def get_calendar(year, month, offset):
+    return [calendar_row_to_dict(row) for row in get_calendar_rows(year, month, offset)]
+
+
+def cast_chunk(items, offset):
+    return [cast_row(item, offset) for item in items]
+
+
+class ChartAPI:
+    """
+    Local HTTP API for charts. Swiss Ephemeris work runs on a bounded
+    thread pool, and identical requests that arrive while one is still
+    being answered share its result.
+    """
+
+    def __init__(self, workers=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        self.inflight = {}
+
+    def close(self):
+        self.executor.shutdown()
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def coalesce(self, key, make):
+        """Await make(), unless an identical request is already on its way."""
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # one client hanging up must not cancel the work for the others
+        return await asyncio.shield(task)
+
+    async def get_now(self, query):
+        fields = {key: query.get(key) for key in ("lat", "lng", "tz", "offset")}
+        return await self.run(chart, fields)
+
+    async def get_cast(self, query):
+        if not query.get("date"):
+            raise ValueError("Missing date")
+        return await self.run(chart, query)
+
+    async def get_cal(self, query):
+        from ephem.cli import parse_month
+
+        try:
+            year = int(query["year"])
+        except (KeyError, ValueError):
+            raise ValueError("Give the year as an integer")
+        month = parse_month(query.get("month", ""))
+
+        offset = parse_offset(query.get("offset"))
+        return {"days": await self.run(get_calendar, year, month, offset)}
+
+    async def post_batch(self, query, body):
+        offset = parse_offset(query.get("offset"))
+        rows = list(read_rows(io.StringIO(body.decode("utf-8"), newline="")))
+
+        results = []
+        for start in range(0, len(rows), BATCH_CHUNK):
+            chunk = rows[start : start + BATCH_CHUNK]
+            results += await self.run(cast_chunk, chunk, offset)
+        return results
+
+    async def respond(self, method, target, body):
+        """Return (status, content type, payload bytes) for one request."""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        routes = {
+            "/now": ("GET", self.get_now),
+            "/cast": ("GET", self.get_cast),
+            "/cal": ("GET", self.get_cal),
+            "/batch": ("POST", self.post_batch),
+        }
+        if url.path not in routes:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+
+        allowed, handler = routes[url.path]
+        if method != allowed:
+            raise HTTPError(
+                HTTPStatus.METHOD_NOT_ALLOWED, f"{url.path} only accepts {allowed}"
+            )
+
+        key = (url.path, tuple(sorted(query.items())))
+        if method == "POST":
+            key += (hashlib.sha256(body).hexdigest(),)
+            result = await self.coalesce(key, lambda: handler(query, body))
+            lines = (json.dumps(r, ensure_ascii=False) + "\n" for r in result)
+            return HTTPStatus.OK, "application/x-ndjson", "".join(lines).encode()
+
+        result = await self.coalesce(key, lambda: handler(query))
+        return (
+            HTTPStatus.OK,
+            "application/json",
+            json.dumps(result, ensure_ascii=False).encode(),
+        )
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+
+                try:
+                    status, content_type, payload = await self.respond(
+                        method, target, body
+                    )
+                except HTTPError as e:
+                    status, content_type, payload = error_response(e.status, str(e))
+                except CHART_ERRORS as e:
+                    status, content_type, payload = error_response(
+                        HTTPStatus.BAD_REQUEST, error_message(e)
+                    )
+                except Exception as e:  # keep serving other clients
+                    status, content_type, payload = error_response(
+                        HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}"
+                    )
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, content_type, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            write_response(writer, *error_response(e.status, str(e)), keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8470, ready=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+
+
+def error_response(status, message):
+    return status, "application/json", json.dumps({"error": message}).encode()
+
+
+async def read_request(reader):
+    """Read one HTTP/1.1 request, or return None when the client is done."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def write_response(writer, status, content_type, payload, keep_alive=True):
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + payload)
@@ -1,10 +1,21 @@
 import argparse
 import calendar
+import importlib
+import os
 import sys
 from datetime import date
-from .commands import now, cast, cal, data
 from .config import load_config_defaults, run_save, run_show
-from .constants import AYANAMSAS
+from .export import FORMATS
+
+
+def command(module_name, func_name="run"):
+    """Import a command module only once its subcommand actually runs."""
+
+    def run(args):
+        module = importlib.import_module(f"ephem.commands.{module_name}")
+        return getattr(module, func_name)(args)
+
+    return run
 
 
 def splash_text():
@@ -89,6 +100,13 @@ def add_display_options(parser, config_defaults=None):
         default=config_defaults.get("no_geo", False),
         help="don't print coordinates",
     )
+    display.add_argument(
+        "-S",
+        "--speed",
+        action="store_true",
+        default=config_defaults.get("speed", False),
+        help="show daily speed and mark stationary planets",
+    )
 
 
 def add_config_options(parser):
@@ -100,6 +118,23 @@ def add_config_options(parser):
     )
 
 
+def add_format_option(parser):
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="print machine-readable data instead of a table",
+    )
+
+
+def add_socket_option(parser):
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="hand the work to an `ephem serve` daemon at PATH when one is running (default: $EPHEM_SOCKET)",
+    )
+
+
 def handle_save_config_action(args):
     if hasattr(args, "save_config") and args.save_config:
         run_save(args)
@@ -107,6 +142,8 @@ def handle_save_config_action(args):
 
 def handle_global_actions(args_list):
     if "--list-offsets" in args_list:
+        from .constants import AYANAMSAS
+
         print("\nAyanamsa offsets:\n")
         for i, key in enumerate(AYANAMSAS.keys()):
             print(f"{i:2}: {key}")
@@ -131,10 +168,14 @@ def handle_global_actions(args_list):
 
 
 def offset_type(value):
+    if value == "all":
+        return value
     try:
         ivalue = int(value)
     except ValueError:
-        raise argparse.ArgumentTypeError(f"Offset must be an integer, got '{value}'.")
+        raise argparse.ArgumentTypeError(
+            f"Offset must be an integer or 'all', got '{value}'."
+        )
     if not (0 <= ivalue <= 46):
         raise argparse.ArgumentTypeError(
             f"Offset must be between 0 and 46, got {ivalue}."
@@ -142,6 +183,16 @@ def offset_type(value):
     return ivalue
 
 
+def positive_int(value):
+    try:
+        ivalue = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a whole number, got '{value}'.")
+    if ivalue < 1:
+        raise argparse.ArgumentTypeError(f"Must be at least 1, got {ivalue}.")
+    return ivalue
+
+
 def parse_month(value: str):
     # try numeric
     try:
@@ -178,9 +229,9 @@ def parse_arguments(args=None):
     parent_parser.add_argument(
         "-o",
         "--offset",
-        type=int,
+        type=offset_type,
         default=config_defaults.get("offset"),
-        help="sidereal ayanamsa index or None for tropical",
+        help="sidereal ayanamsa index, or 'all' to compare every ayanamsa",
     )
 
     parser = EphemParser(
@@ -205,6 +256,13 @@ def parse_arguments(args=None):
         action="store_true",
         help="display current configuration and exit",
     )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="time each stage and print a breakdown to stderr, or write a Chrome trace with --profile=FILE; works with any command",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -212,7 +270,7 @@ def parse_arguments(args=None):
     now_parser = subparsers.add_parser(
         "now", help="🌌 calculate the chart of the moment", parents=[parent_parser]
     )
-    now_parser.set_defaults(func=now.run)
+    now_parser.set_defaults(func=command("now"))
     now_parser.add_argument("--lat", "-y", type=float, help="latitude")
     now_parser.add_argument("--lng", "-x", type=float, help="longitude")
     now_parser.add_argument(
@@ -232,12 +290,14 @@ def parse_arguments(args=None):
     )
     add_display_options(now_parser, config_defaults)
     add_config_options(now_parser)
+    add_format_option(now_parser)
+    add_socket_option(now_parser)
 
     # cast
     cast_parser = subparsers.add_parser(
         "cast", help="🎂 calculate an event or birth chart", parents=[parent_parser]
     )
-    cast_parser.set_defaults(func=cast.run)
+    cast_parser.set_defaults(func=command("cast"))
     cast_parser.add_argument(
         "event",
         nargs="*",
@@ -255,8 +315,21 @@ def parse_arguments(args=None):
     cast_parser.add_argument(
         "--save", action="store_true", help="save to chart database"
     )
+    cast_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="cast every row of a CSV or NDJSON file and print NDJSON, '-' for stdin",
+    )
+    cast_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        help="worker processes for --batch (default: one per CPU)",
+    )
     add_display_options(cast_parser, config_defaults)
     add_config_options(cast_parser)
+    add_format_option(cast_parser)
+    add_socket_option(cast_parser)
 
     # cal
     today = date.today()
@@ -281,32 +354,320 @@ def parse_arguments(args=None):
         action="store_true",
         help="use ASCII text instead of Unicode glyphs",
     )
-    cal_parser.set_defaults(func=cal.run)
+    cal_parser.add_argument(
+        "-S",
+        "--stations",
+        action="store_true",
+        help="add a column marking retrograde and direct stations",
+    )
+    cal_parser.add_argument(
+        "-P",
+        "--precomputed",
+        action="store_true",
+        help="read positions from the store built by `ephem precompute`",
+    )
+    add_format_option(cal_parser)
+    cal_parser.set_defaults(func=command("cal"))
+
+    # stations
+    stations_parser = subparsers.add_parser(
+        "stations", help="🔁 find retrograde and direct stations in a date range"
+    )
+    stations_parser.add_argument("start", metavar="START", help="start date, YYYY-MM-DD")
+    stations_parser.add_argument("end", metavar="END", help="end date, YYYY-MM-DD")
+    stations_parser.add_argument(
+        "-a",
+        "--ascii",
+        action="store_true",
+        help="use ASCII text instead of Unicode glyphs",
+    )
+    stations_parser.set_defaults(func=command("stations"))
+
+    # ingress
+    ingress_parser = subparsers.add_parser(
+        "ingress",
+        help="🚪 find sign ingresses in a date range",
+        parents=[parent_parser],
+    )
+    ingress_parser.add_argument("start", metavar="START", help="start date, YYYY-MM-DD")
+    ingress_parser.add_argument("end", metavar="END", help="end date, YYYY-MM-DD")
+    ingress_parser.add_argument(
+        "-a",
+        "--ascii",
+        action="store_true",
+        help="use ASCII text instead of Unicode glyphs",
+    )
+    ingress_parser.add_argument(
+        "-c",
+        "--classical",
+        action="store_true",
+        default=config_defaults.get("classical", False),
+        help="exclude Uranus through Pluto",
+    )
+    ingress_parser.add_argument(
+        "-n",
+        "--node",
+        choices=["true", "mean"],
+        default=config_defaults.get("node", "true"),
+        help="choose lunar node calculation method",
+    )
+    ingress_parser.add_argument(
+        "-M", "--no-moon", action="store_true", help="leave out lunar ingresses"
+    )
+    ingress_parser.set_defaults(func=command("ingress"))
+
+    # transits
+    transits_parser = subparsers.add_parser(
+        "transits", help="🔭 find transits to a saved chart in a date range"
+    )
+    transits_parser.add_argument("id", type=int, help="chart ID from the database")
+    transits_parser.add_argument("start", metavar="START", help="start date, YYYY-MM-DD")
+    transits_parser.add_argument("end", metavar="END", help="end date, YYYY-MM-DD")
+    transits_parser.add_argument(
+        "-a",
+        "--ascii",
+        action="store_true",
+        help="use ASCII text instead of Unicode glyphs",
+    )
+    transits_parser.add_argument(
+        "-c",
+        "--classical",
+        action="store_true",
+        default=config_defaults.get("classical", False),
+        help="exclude Uranus through Pluto",
+    )
+    transits_parser.add_argument(
+        "-n",
+        "--node",
+        choices=["true", "mean"],
+        default=config_defaults.get("node", "true"),
+        help="choose lunar node calculation method",
+    )
+    transits_parser.add_argument(
+        "-M", "--no-moon", action="store_true", help="leave out transits of the Moon"
+    )
+    transits_parser.add_argument(
+        "-P",
+        "--precomputed",
+        action="store_true",
+        help="read positions from the store built by `ephem precompute`",
+    )
+    transits_parser.set_defaults(func=command("transits"))
+
+    # precompute
+    precompute_parser = subparsers.add_parser(
+        "precompute",
+        help="🧮 fit a Chebyshev ephemeris store for fast range sweeps",
+    )
+    precompute_parser.add_argument(
+        "--start", type=int, default=1900, help="first year covered (default: 1900)"
+    )
+    precompute_parser.add_argument(
+        "--end", type=int, default=2100, help="year the store ends (default: 2100)"
+    )
+    precompute_parser.add_argument(
+        "--file", type=str, help="store location (default: next to ephem.db)"
+    )
+    precompute_parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="check an existing store against Swiss Ephemeris instead of building",
+    )
+    precompute_parser.add_argument(
+        "--samples",
+        type=positive_int,
+        default=2000,
+        help="number of random instants checked during validation (default: 2000)",
+    )
+    precompute_parser.set_defaults(func=command("precompute"))
+
+    # serve
+    serve_parser = subparsers.add_parser(
+        "serve", help="🛰️ keep a warm chart daemon listening on a Unix socket"
+    )
+    serve_parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="socket to listen on (default: $EPHEM_SOCKET)",
+    )
+    serve_parser.set_defaults(func=command("serve"))
+
+    # api
+    api_parser = subparsers.add_parser(
+        "api", help="🌐 serve charts, calendars and batches over local HTTP"
+    )
+    api_parser.add_argument(
+        "--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)"
+    )
+    api_parser.add_argument(
+        "--port", type=int, default=8470, help="port to listen on (default: 8470)"
+    )
+    api_parser.add_argument(
+        "-j",
+        "--workers",
+        type=positive_int,
+        help="threads for chart calculations (default: one per CPU)",
+    )
+    api_parser.set_defaults(func=command("api"))
 
     # data
     data_parser = subparsers.add_parser("data", help="🗃️ manage chart database")
     data_subparsers = data_parser.add_subparsers(dest="data_cmd", required=True)
 
     view_parser = data_subparsers.add_parser("view", help="show chart database")
-    view_parser.set_defaults(func=data.print_charts)
+    view_parser.add_argument(
+        "-n", "--limit", type=positive_int, help="show at most this many charts"
+    )
+    # not dest="offset", which is the ayanamsa everywhere else
+    view_parser.add_argument(
+        "--offset", dest="skip", type=int, metavar="N", help="skip the first N charts"
+    )
+    view_parser.add_argument(
+        "--after-id",
+        type=int,
+        metavar="ID",
+        help="start after chart ID; faster than --offset for deep pages",
+    )
+    view_parser.set_defaults(func=command("data", "print_charts"))
+
+    search_parser = data_subparsers.add_parser(
+        "search", help="find charts by name, date and place"
+    )
+    search_parser.add_argument(
+        "name", nargs="?", help="part of the chart name, ignoring case"
+    )
+    search_parser.add_argument(
+        "--from",
+        dest="start",
+        metavar="DATE",
+        help="born on or after YYYY, YYYY-MM or YYYY-MM-DD (UTC)",
+    )
+    search_parser.add_argument(
+        "--to",
+        dest="end",
+        metavar="DATE",
+        help="born on or before YYYY, YYYY-MM or YYYY-MM-DD (UTC), inclusive",
+    )
+    search_parser.add_argument(
+        "--bbox",
+        nargs=4,
+        type=float,
+        metavar=("SOUTH", "WEST", "NORTH", "EAST"),
+        help="only charts inside this box, in decimal degrees",
+    )
+    search_parser.add_argument(
+        "-n", "--limit", type=positive_int, help="show at most this many charts"
+    )
+    search_parser.set_defaults(func=command("data", "search_cmd"))
 
     load_parser = data_subparsers.add_parser(
         "load", help="load chart from database", parents=[parent_parser]
     )
     load_parser.add_argument("id", type=int, help="chart ID to load")
     add_display_options(load_parser, config_defaults)
-    load_parser.set_defaults(func=data.run_loaded_chart)
+    load_parser.set_defaults(func=command("data", "run_loaded_chart"))
 
     delete_parser = data_subparsers.add_parser(
         "delete", help="delete chart from database"
     )
     delete_parser.add_argument("id", type=int, help="delete chart by ID ")
-    delete_parser.set_defaults(func=data.delete_chart_cmd)
+    delete_parser.set_defaults(func=command("data", "delete_chart_cmd"))
+
+    import_parser = data_subparsers.add_parser(
+        "import", help="import charts from CSV, NDJSON or YAML"
+    )
+    import_parser.add_argument(
+        "file", metavar="FILE", help="file to import, or - for stdin"
+    )
+    import_parser.add_argument(
+        "-f",
+        "--format",
+        choices=["csv", "ndjson", "yaml"],
+        help="input format (default: from the file extension)",
+    )
+    import_parser.set_defaults(func=command("data_import"))
+
+    query_parser = data_subparsers.add_parser(
+        "query",
+        help="find charts by planet placements",
+        parents=[parent_parser],
+        description="""Find saved charts by placement, e.g.
+  ephem data query "sun in aries and moon in water and mars rx"
+
+Each term is BODY in SIGN, BODY in ELEMENT (fire, earth, air, water),
+BODY in MODALITY (cardinal, fixed, mutable), BODY rx or BODY direct.
+Terms combine with and, or, not and parentheses.""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    query_parser.add_argument("query", help="placement query, quoted")
+    query_parser.add_argument(
+        "-n", "--limit", type=positive_int, help="show at most this many charts"
+    )
+    query_parser.add_argument(
+        "--count", action="store_true", help="print only the number of matches"
+    )
+    query_parser.set_defaults(func=command("data", "query_cmd"))
+
+    synastry_parser = data_subparsers.add_parser(
+        "synastry", help="score aspects between saved charts"
+    )
+    synastry_parser.add_argument(
+        "ids",
+        nargs="*",
+        type=int,
+        metavar="ID",
+        help="compare these charts to all others",
+    )
+    synastry_parser.add_argument(
+        "--all", action="store_true", help="compare every pair of saved charts"
+    )
+    synastry_parser.add_argument(
+        "--min-aspects",
+        type=int,
+        default=1,
+        metavar="N",
+        help="only list pairs with at least N aspects (default: 1)",
+    )
+    synastry_parser.add_argument(
+        "--min-score",
+        type=float,
+        default=25.0,
+        metavar="S",
+        help="only list pairs scoring at least S, 0 for every pair (default: 25)",
+    )
+    synastry_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        help="worker processes (default: one per CPU)",
+    )
+    synastry_parser.add_argument(
+        "--output", metavar="FILE", help="write the CSV edge list to FILE"
+    )
+    synastry_parser.set_defaults(func=command("synastry"))
+
+    similar_parser = data_subparsers.add_parser(
+        "similar", help="find the charts whose planets sit closest to one chart's"
+    )
+    similar_parser.add_argument("id", type=int, help="chart ID to compare with")
+    similar_parser.add_argument(
+        "-k",
+        type=positive_int,
+        default=10,
+        metavar="N",
+        help="how many charts to show (default: 10)",
+    )
+    similar_parser.set_defaults(func=command("data", "similar_cmd"))
+
+    backfill_parser = data_subparsers.add_parser(
+        "backfill", help="index planet positions of charts saved before they were"
+    )
+    backfill_parser.set_defaults(func=command("data", "backfill_cmd"))
 
     sync_parser = data_subparsers.add_parser(
         "sync", help="sync YAML charts with database"
     )
-    sync_parser.set_defaults(func=data.yaml_sync_cmd)
+    sync_parser.set_defaults(func=command("data", "yaml_sync_cmd"))
 
     # show splash text and help if no args given
     if len(args) == 0:
@@ -317,16 +678,24 @@ def parse_arguments(args=None):
     parsed = parser.parse_args(args)
 
     # validate offset range
-    if (
-        hasattr(parsed, "offset")
-        and parsed.offset is not None
-        and not (0 <= int(parsed.offset) <= 46)
-    ):
+    offset = getattr(parsed, "offset", None)
+    if offset == "all":
+        if parsed.command not in ("now", "cast", "data"):
+            print(
+                f"\n❌ Error: --offset all only works with charts, not `{parsed.command}`.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    elif offset is not None and not (0 <= int(offset) <= 46):
         print("\n❌ Error: --offset must be between 0 and 46.", file=sys.stderr)
         sys.exit(1)
 
     # validate 'cast' requires at least 1 event arg (DATE)
-    if parsed.command == "cast" and (not parsed.event or len(parsed.event) < 1):
+    if (
+        parsed.command == "cast"
+        and not parsed.batch
+        and (not parsed.event or len(parsed.event) < 1)
+    ):
         print(
             "\n❌ Error: `cast` needs at minimum a DATE argument. Type `ephem cast --help` for more info.",
             file=sys.stderr,
@@ -336,9 +705,7 @@ def parse_arguments(args=None):
     return parsed
 
 
-def main():
-    args = parse_arguments()
-
+def dispatch(args):
     if hasattr(args, "func"):
         # handle --save-config BEFORE running the main command
         if args.command in ["now", "cast"]:
@@ -350,5 +717,32 @@ def main():
         sys.exit(1)
 
 
+def forward_to_daemon(argv):
+    """Exit with the daemon's answer for now/cast, if a daemon is running."""
+    if not argv or argv[0] not in ("now", "cast") or "--batch" in argv:
+        return
+    if "--socket" not in " ".join(argv) and not os.environ.get("EPHEM_SOCKET"):
+        return
+
+    from .client import find_socket, run_remote
+
+    code = run_remote(find_socket(argv), argv)
+    if code is not None:
+        sys.exit(code)
+
+
+def main():
+    argv = sys.argv[1:]
+    if not any(arg == "--profile" or arg.startswith("--profile=") for arg in argv):
+        forward_to_daemon(argv)
+        dispatch(parse_arguments(argv))
+        return
+
+    from .profile import pop_profile_option, run_profiled
+
+    target, argv = pop_profile_option(argv)
+    run_profiled(target, lambda: dispatch(parse_arguments(argv)))
+
+
 if __name__ == "__main__":
     main()
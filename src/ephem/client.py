@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+import socket
+import sys
+
+# seconds to wait for the daemon before giving up on a request
+TIMEOUT = 30.0
+
+
+def find_socket(argv):
+    """Socket path from --socket PATH or --socket=PATH, else $EPHEM_SOCKET."""
+    for i, arg in enumerate(argv):
+        if arg == "--socket" and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith("--socket="):
+            return arg.split("=", 1)[1]
+    return os.environ.get("EPHEM_SOCKET") or None
+
+
+def request(path, payload, timeout=TIMEOUT):
+    """Send one JSON request to the daemon and return its JSON response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def run_remote(path, argv):
+    """
+    Run a subcommand on the daemon at path and replay its output. Returns
+    the exit code, or None when no daemon answers so the caller can fall
+    back to working locally.
+    """
+    payload = {
+        "op": "run",
+        "argv": argv,
+        "tty": sys.stdout.isatty(),
+        "columns": shutil.get_terminal_size().columns,
+        "env": {
+            key: os.environ[key]
+            for key in ("TERM", "COLORTERM", "NO_COLOR")
+            if key in os.environ
+        },
+    }
+    try:
+        response = request(path, payload)
+    except (OSError, ValueError):
+        return None
+
+    if not response.get("ok"):
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit"]
@@ -0,0 +1,26 @@
+import asyncio
+import sys
+from ephem.api import ChartAPI
+
+
+def main(args):
+    api = ChartAPI(args.workers)
+
+    def ready(server):
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Serving the chart API on http://{host}:{port}", file=sys.stderr)
+
+    try:
+        asyncio.run(api.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
+def run(args):
+    try:
+        main(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
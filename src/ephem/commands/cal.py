@@ -1,9 +1,33 @@
-from ephem.display.month import format_calendar
+from ephem.export import FORMATS, calendar_row_to_dict, get_zodiac_name, write_calendar
+from ephem.sweph.calendar import get_calendar_rows
 import sys
 
 
+def format_calendar(args):
+    # the table is drawn with rich, which data output never loads
+    from ephem.display.month import format_calendar as render
+
+    return render(args)
+
+
+def write_calendar_data(args):
+    store = None
+    if getattr(args, "precomputed", False):
+        from ephem.sweph.chebyshev import ChebyshevStore
+
+        store = ChebyshevStore()
+
+    offset = getattr(args, "offset", None)
+    rows = get_calendar_rows(args.year, args.month, offset, store)
+    days = [calendar_row_to_dict(row) for row in rows]
+    write_calendar(days, get_zodiac_name(offset), args.format)
+
+
 def main(args):
-    format_calendar(args)
+    if getattr(args, "format", None) in FORMATS:
+        write_calendar_data(args)
+    else:
+        format_calendar(args)
 
 
 def run(args):
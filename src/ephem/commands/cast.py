@@ -3,8 +3,8 @@ from zoneinfo import ZoneInfo
 from ephem.utils.locale import get_locale, InvalidCoordinatesError
 from ephem.utils.year import validate_year
 from ephem import sweph
-from ephem.display import format_chart
-from ephem.db import add_chart, create_tables
+from ephem.display import format_chart, format_comparison, write_chart_data
+from ephem.export import get_zodiac_name
 import re
 import sys
 
@@ -83,6 +83,11 @@ def get_moment(date_str, time_arg=None, tz_str=None):
 
 
 def main(args):
+    if getattr(args, "batch", None):
+        from .cast_batch import main as batch_main
+
+        return batch_main(args)
+
     date, time, raw_title = parse_event(args.event)
 
     # title remains None for display if empty
@@ -91,28 +96,72 @@ def main(args):
     dt_local, dt_utc, approx_time = get_moment(date, time, args.timezone)
     lat, lng, approx_locale, config_locale = get_locale(args)
 
-    jd_now, jd_then, *_ = sweph.get_julian_days(dt_utc, args)
+    jd_now, _ = sweph.get_julian_days(dt_utc, args)
     offset = getattr(args, "offset", None)
-    planets = sweph.get_planets(jd_now, jd_then, offset)
+    # one tropical pass serves every ayanamsa in comparison mode
+    compare = offset == "all"
+    if compare:
+        offset = None
+    planets = sweph.get_planets(jd_now, offset)
     angles = sweph.get_angles(jd_now, lat, lng, offset)
     part_of_fortune = sweph.get_pars_fortunae(angles, planets)
     horoscope = sweph.build_horoscope(planets, angles, part_of_fortune)
 
-    output = format_chart(
-        args,
-        title,
-        lat,
-        lng,
-        dt_local,
-        dt_utc,
-        horoscope,
-        planets,
-        approx_time,
-        approx_locale,
-        config_locale,
-    )
+    output_format = getattr(args, "format", None)
+    if output_format:
+        if compare:
+            horoscopes = [("Tropical", horoscope)]
+            horoscopes += sweph.get_sidereal_horoscopes(jd_now, planets, angles)
+        else:
+            horoscopes = [(get_zodiac_name(offset), horoscope)]
+        write_chart_data(
+            args,
+            output_format,
+            title,
+            lat,
+            lng,
+            dt_local,
+            dt_utc,
+            horoscopes,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
+        output = None
+    elif compare:
+        horoscopes = [("Tropical", horoscope)]
+        horoscopes += sweph.get_sidereal_horoscopes(jd_now, planets, angles)
+        output = format_comparison(
+            args,
+            title,
+            lat,
+            lng,
+            dt_local,
+            dt_utc,
+            horoscopes,
+            planets,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
+    else:
+        output = format_chart(
+            args,
+            title,
+            lat,
+            lng,
+            dt_local,
+            dt_utc,
+            horoscope,
+            planets,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
 
     if args.save:
+        from ephem.db import add_chart, create_tables
+
         create_tables()
         name_to_save = (
             str(title).strip() if title and title.strip() else "Untitled Chart"
@@ -124,8 +173,10 @@ def main(args):
             latitude=args.lat,
             longitude=args.lng,
         )
-        print()
-        print(f"Chart saved at index {chart_id}.")
+        # keep machine-readable output clean
+        out = sys.stderr if output_format else sys.stdout
+        print(file=out)
+        print(f"Chart saved at index {chart_id}.", file=out)
 
     if output is not None:
         for line in output:
@@ -0,0 +1,205 @@
+import collections
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import swisseph as swe
+from ephem import sweph
+from ephem.export import chart_to_dict, get_zodiac_name, horoscope_to_dict
+from ephem.utils.locale import validate_coordinates
+from ephem.utils.output import stdout_stream
+from .cast import get_moment, parse_event, parse_time
+
+FIELDS = ["date", "time", "lat", "lng", "tz", "title"]
+
+# rows handed to a worker at once; keeps pickling overhead small
+CHUNK_SIZE = 64
+
+# chunks in flight per worker; input is read no further ahead than this
+CHUNKS_AHEAD = 4
+
+# bad dates and coordinates, unknown time zones, and dates the ephemeris
+# does not cover
+CHART_ERRORS = (ValueError, KeyError, swe.Error)
+
+
+def read_csv_rows(lines):
+    reader = csv.reader(lines)
+    fields = FIELDS
+    for cells in reader:
+        if not any(cell.strip() for cell in cells):
+            continue
+        if reader.line_num == 1 and cells[0].strip().lower() == "date":
+            fields = [cell.strip().lower() for cell in cells]
+            continue
+        yield reader.line_num, dict(zip(fields, cells))
+
+
+def read_ndjson_rows(lines):
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, {"error": f"Invalid JSON: {e.msg}"}
+            continue
+        if not isinstance(row, dict):
+            yield line_num, {"error": "Expected a JSON object"}
+            continue
+        yield line_num, {key.lower(): value for key, value in row.items()}
+
+
+def read_rows(f):
+    """
+    Yield (line number, row dict) from CSV or NDJSON. NDJSON is detected
+    by a leading `{`; CSV may start with a header naming the columns,
+    otherwise columns are taken as DATE, TIME, LAT, LNG, TZ, TITLE.
+    """
+    first = f.readline()
+    while first and not first.strip():
+        first = f.readline()
+
+    lines = itertools.chain([first], f)
+    if first.lstrip().startswith("{"):
+        yield from read_ndjson_rows(lines)
+    else:
+        yield from read_csv_rows(lines)
+
+
+def clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def cast_fields(row, offset=None):
+    """
+    Cast one chart from a dict of DATE, TIME, LAT, LNG, TZ and TITLE
+    fields into a JSON-ready dict. Raises one of CHART_ERRORS when the
+    fields can't be cast.
+    """
+    date = clean(row.get("date"))
+    if date is None:
+        raise ValueError("Missing DATE")
+
+    # DATE and TIME as `ephem cast DATE TIME` reads them
+    time = clean(row.get("time"))
+    date, parsed_time, _ = parse_event([date] if time is None else [date, time])
+    if time is not None and parsed_time is None:
+        # parse_event took the time for a title; say what is wrong with it
+        parse_time(time)
+    dt_local, dt_utc, approx_time = get_moment(date, parsed_time, clean(row.get("tz")))
+
+    lat, lng = clean(row.get("lat")), clean(row.get("lng"))
+    if lat is not None and lng is not None:
+        lat, lng = validate_coordinates(lat, lng)
+    elif lat is not None or lng is not None:
+        raise ValueError("Both latitude and longitude must be provided together")
+
+    jd_now, _ = sweph.get_julian_days(dt_utc, None)
+    if approx_time:
+        horoscope = sweph.cast_horoscope(jd_now, offset=offset)
+    else:
+        horoscope = sweph.cast_horoscope(jd_now, lat, lng, offset)
+
+    return chart_to_dict(
+        clean(row.get("title")),
+        dt_local,
+        dt_utc,
+        approx_time,
+        lat,
+        lng,
+        get_zodiac_name(offset),
+        horoscope_to_dict(horoscope),
+    )
+
+
+def error_message(error):
+    # KeyError, e.g. from an unknown time zone, quotes its message
+    if isinstance(error, KeyError) and error.args:
+        return str(error.args[0])
+    return str(error)
+
+
+def cast_row(item, offset=None):
+    """Cast one input row, or report why it failed, tagged with its line."""
+    line_num, row = item
+    if "error" in row:
+        return {"line": line_num, "error": row["error"]}
+
+    try:
+        return {"line": line_num, **cast_fields(row, offset)}
+    except CHART_ERRORS as e:
+        return {"line": line_num, "error": error_message(e)}
+
+
+def cast_chunk(items, offset=None):
+    return [cast_row(item, offset) for item in items]
+
+
+def cast_rows(rows, offset=None, jobs=None):
+    """
+    Yield results for rows in input order, cast over a process pool.
+    Rows are read a few chunks ahead of the results, so a large input
+    streams through instead of being held in memory.
+    """
+    if jobs == 1:
+        yield from map(partial(cast_row, offset=offset), rows)
+        return
+
+    rows = iter(rows)
+    chunks = iter(lambda: list(itertools.islice(rows, CHUNK_SIZE)), [])
+    ahead = CHUNKS_AHEAD * (jobs or os.cpu_count() or 1)
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(cast_chunk, chunk, offset))
+                if len(pending) >= ahead:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # stopped early; don't wait for chunks nobody will read
+            for future in pending:
+                future.cancel()
+
+
+def write_results(results):
+    failed = 0
+    # a reader that quits early also stops the casting
+    with stdout_stream() as out:
+        for result in results:
+            failed += "error" in result
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    if failed:
+        print(f"{failed} row(s) could not be cast", file=sys.stderr)
+
+
+def main(args):
+    offset = getattr(args, "offset", None)
+    if offset == "all":
+        raise ValueError("--offset all can't be combined with --batch")
+    if args.save:
+        raise ValueError("--save can't be combined with --batch")
+    if getattr(args, "format", None) not in (None, "ndjson"):
+        raise ValueError("--batch always prints NDJSON")
+
+    jobs = args.jobs or os.cpu_count()
+    if args.batch == "-":
+        write_results(cast_rows(read_rows(sys.stdin), offset, jobs))
+        return
+
+    try:
+        f = open(args.batch, newline="", encoding="utf-8")
+    except OSError as e:
+        raise ValueError(f"Can't read batch file: {e}")
+
+    with f:
+        write_results(cast_rows(read_rows(f), offset, jobs))
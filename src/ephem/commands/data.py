@@ -1,9 +1,21 @@
 import argparse
+import itertools
+import os
+import shutil
 import sqlite3
-import pydoc
+import sys
 from . import cast
-from datetime import datetime
-from ephem.db import view_charts, get_chart, delete_chart
+from datetime import date, datetime
+from ephem.db import (
+    backfill_positions,
+    count_unindexed_charts,
+    create_tables,
+    delete_chart,
+    get_chart,
+    iter_charts,
+    search_charts,
+)
+from ephem.utils.output import stdout_stream
 
 
 def run_loaded_chart(args):
@@ -45,43 +57,154 @@ def run_loaded_chart(args):
         "theme",
         "ascii",
         "node",
+        "speed",
     ]
     for opt in display_options:
         setattr(loaded_args, opt, getattr(args, opt, None))
 
     if hasattr(args, "offset") and args.offset is not None:
-        loaded_args.offset = int(args.offset)
+        loaded_args.offset = args.offset if args.offset == "all" else int(args.offset)
 
     cast.run(loaded_args)
 
 
+NO_CHARTS = "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
+
+
 def print_charts(args=None):
+    limit = getattr(args, "limit", None)
+    paging = getattr(args, "skip", None) or getattr(args, "after_id", None)
+    charts = iter_charts(
+        limit=limit,
+        offset=getattr(args, "skip", None),
+        after_id=getattr(args, "after_id", None),
+    )
     try:
-        charts = view_charts()
+        first = next(charts, None)
     except sqlite3.OperationalError as e:
         if "no such table: charts" in str(e):
-            pydoc.pager(
-                "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
-            )
+            print(NO_CHARTS)
             return
         raise e
 
-    if not charts:
-        pydoc.pager(
-            "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
+    if first is None:
+        print("No more charts." if paging else NO_CHARTS)
+        return
+
+    count, last_id = 0, None
+
+    def blocks():
+        nonlocal count, last_id
+        for chart in itertools.chain([first], charts):
+            count, last_id = count + 1, chart["id"]
+            yield format_chart(chart)
+
+    page(blocks())
+
+    if limit and count == limit:
+        print(
+            f"Next page: ephem data view --limit {limit} --after-id {last_id}",
+            file=sys.stderr,
         )
+
+
+def page(lines):
+    """
+    Stream lines through $MANPAGER, $PAGER or less on a terminal, like
+    pydoc.pager but without first joining everything into one string.
+    Quitting the pager stops reading the database.
+    """
+    pager = None
+    if sys.stdin.isatty() and sys.stdout.isatty():
+        if os.environ.get("TERM") not in ("dumb", "emacs"):
+            pager = (
+                os.environ.get("MANPAGER")
+                or os.environ.get("PAGER")
+                or shutil.which("less")
+                or shutil.which("more")
+            )
+
+    if not pager:
+        # a reader that quits early also stops reading the database
+        with stdout_stream() as out:
+            for line in lines:
+                out.write(line + "\n")
         return
 
-    lines = []
-    for chart in charts:
-        lines.append(f"[{chart['id']}] {chart['name']}")
-        lines.append(f"   UTC:     {chart['timestamp_utc']}")
-        lines.append(f"   Local:   {chart['timestamp_input']}")
-        lines.append(f"   Lat:     {chart['latitude']}, Lng: {chart['longitude']}")
-        lines.append("")  # blank line
+    import subprocess
+
+    proc = subprocess.Popen(
+        pager, shell=True, stdin=subprocess.PIPE, errors="backslashreplace"
+    )
+    try:
+        with proc.stdin as pipe:
+            try:
+                for line in lines:
+                    pipe.write(line + "\n")
+            except KeyboardInterrupt:
+                pass
+    except OSError:
+        pass  # the pager was quit before the end
+    while True:
+        try:
+            proc.wait()
+            break
+        except KeyboardInterrupt:
+            # the pager ignores ctrl-c too; don't leave the terminal raw
+            pass
+
+
+def format_chart(chart):
+    lines = [
+        f"[{chart['id']}] {chart['name']}",
+        f"   UTC:     {chart['timestamp_utc']}",
+        f"   Local:   {chart['timestamp_input']}",
+        f"   Lat:     {chart['latitude']}, Lng: {chart['longitude']}",
+        "",  # blank line
+    ]
+    return "\n".join(lines)
+
+
+def format_charts(charts):
+    return "\n".join(format_chart(chart) for chart in charts)
+
+
+def date_bounds(value):
+    """
+    Return the first instant of YYYY, YYYY-MM or YYYY-MM-DD and the first
+    instant after it, as ISO strings comparable with timestamp_utc.
+    """
+    parts = value.split("-")
+    try:
+        if len(parts) > 3:
+            raise ValueError
+        numbers = [int(part) for part in parts]
+        first = date(numbers[0], *(numbers[1:] + [1, 1])[:2])
+    except ValueError:
+        raise ValueError(f"Give dates as YYYY, YYYY-MM or YYYY-MM-DD, got '{value}'")
+
+    if len(parts) == 1:
+        after = date(first.year + 1, 1, 1)
+    elif len(parts) == 2:
+        after = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    else:
+        after = date.fromordinal(first.toordinal() + 1)
+    return first.isoformat(), after.isoformat()
+
+
+def search_cmd(args):
+    try:
+        start = date_bounds(args.start)[0] if args.start else None
+        end = date_bounds(args.end)[1] if args.end else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    output = "\n".join(lines)
-    pydoc.pager(output)
+    charts = search_charts(args.name, start, end, args.bbox, args.limit)
+    if not charts:
+        print("No charts match.")
+        return
+    print(format_charts(charts))
 
 
 def delete_chart_cmd(args):
@@ -92,6 +215,74 @@ def delete_chart_cmd(args):
         print(f"⚠️  Chart ID {args.id} not found. Nothing deleted.")
 
 
+def query_cmd(args):
+    from ephem.query import query_charts
+
+    try:
+        if args.offset == "all":
+            raise ValueError("--offset all can't be used with queries")
+        charts = query_charts(args.query, args.offset, args.limit)
+        first = next(charts, None)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    unindexed = count_unindexed_charts()
+    if unindexed:
+        print(
+            f"⚠️  {unindexed} chart(s) have no stored positions and were skipped."
+            " Run `ephem data backfill` to include them.",
+            file=sys.stderr,
+        )
+
+    if first is None:
+        print("0" if args.count else "No charts match.")
+        return
+    if args.count:
+        print(1 + sum(1 for _ in charts))
+        return
+
+    page(format_chart(chart) for chart in itertools.chain([first], charts))
+
+
+def similar_cmd(args):
+    from ephem.similar import similar_charts
+
+    try:
+        matches = similar_charts(args.id, args.k)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    unindexed = count_unindexed_charts()
+    if unindexed:
+        print(
+            f"⚠️  {unindexed} chart(s) have no stored positions and were skipped."
+            " Run `ephem data backfill` to include them.",
+            file=sys.stderr,
+        )
+
+    if not matches:
+        print("No other charts to compare with.")
+        return
+    for chart_id, similarity in matches:
+        block = format_chart(get_chart(chart_id))
+        # similarity goes on the [ID] Name line
+        print(block.replace("\n", f"  ({similarity:.1%} similar)\n", 1))
+
+
+def backfill_cmd(args=None):
+    create_tables()
+
+    def progress(done):
+        print(f"\rIndexed {done} chart(s)...", end="", file=sys.stderr, flush=True)
+
+    done = backfill_positions(progress=progress)
+    if done:
+        print(file=sys.stderr)
+    print(f"✅ Indexed positions for {done} chart(s)")
+
+
 def yaml_sync_cmd(args=None):
     try:
         from ephem.yaml_sync import full_sync
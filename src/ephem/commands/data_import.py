@@ -0,0 +1,183 @@
+import csv
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from ephem.db import add_charts, create_tables
+from ephem.utils.locale import validate_coordinates
+from .cast import get_moment
+from .cast_batch import FIELDS, clean, error_message, read_ndjson_rows
+
+IMPORT_FORMATS = ("csv", "ndjson", "yaml")
+
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+# bad dates, times and coordinates, and unknown time zones
+IMPORT_ERRORS = (ValueError, KeyError)
+
+# header names that mark the first CSV row as a header
+HEADER_FIELDS = {"date", "title", "name", "timestamp_utc", "timestamp_input"}
+
+
+def detect_format(path):
+    fmt = EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Can't tell the format of {path}; pass --format "
+            + "/".join(IMPORT_FORMATS)
+        )
+    return fmt
+
+
+def read_csv_rows(lines):
+    """
+    Like the `cast --batch` reader, but the header may also name the
+    columns of the charts table.
+    """
+    reader = csv.reader(lines)
+    fields = FIELDS
+    for cells in reader:
+        if not any(cell.strip() for cell in cells):
+            continue
+        header = [cell.strip().lower() for cell in cells]
+        if reader.line_num == 1 and HEADER_FIELDS.intersection(header):
+            fields = header
+            continue
+        yield reader.line_num, dict(zip(fields, cells))
+
+
+def read_yaml_rows(f):
+    """Yield (document number, row dict) from a multi-document YAML stream."""
+    import yaml
+
+    documents = yaml.safe_load_all(f)
+    number = 0
+    while True:
+        number += 1
+        try:
+            document = next(documents)
+        except StopIteration:
+            return
+        except yaml.YAMLError as e:
+            # the parser can't find its footing again after a syntax error
+            yield number, {"error": f"Invalid YAML: {e}"}
+            return
+
+        if document is None:
+            number -= 1
+            continue
+        if not isinstance(document, dict):
+            yield number, {"error": "Expected a mapping"}
+            continue
+        yield number, {str(key).lower(): value for key, value in document.items()}
+
+
+def read_import_rows(f, fmt):
+    if fmt == "yaml":
+        return read_yaml_rows(f)
+    if fmt == "ndjson":
+        return read_ndjson_rows(f)
+    return read_csv_rows(f)
+
+
+def parse_timestamp(value, field):
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO 8601 timestamp, got '{value}'")
+    if dt.tzinfo is None:
+        raise ValueError(f"{field} needs a UTC offset, got '{value}'")
+    return dt
+
+
+def chart_record(row):
+    """
+    Turn one input row into a (name, timestamp_utc, timestamp_input,
+    latitude, longitude) tuple for the charts table. Rows either carry
+    the stored timestamps, as exported by `data sync`, or the DATE, TIME,
+    TZ, LAT, LNG and TITLE fields read by `cast --batch`.
+    """
+    name = clean(row.get("name")) or clean(row.get("title")) or "Untitled Chart"
+
+    if clean(row.get("timestamp_utc")):
+        dt_utc = parse_timestamp(row["timestamp_utc"], "timestamp_utc")
+        dt_utc = dt_utc.astimezone(timezone.utc)
+        dt_local = dt_utc
+        if clean(row.get("timestamp_input")):
+            dt_local = parse_timestamp(row["timestamp_input"], "timestamp_input")
+    else:
+        date = clean(row.get("date"))
+        if date is None:
+            raise ValueError("Missing DATE or timestamp_utc")
+        dt_local, dt_utc, _ = get_moment(
+            date, clean(row.get("time")), clean(row.get("tz"))
+        )
+
+    lat = clean(row.get("lat", row.get("latitude")))
+    lng = clean(row.get("lng", row.get("longitude")))
+    if lat is not None and lng is not None:
+        lat, lng = validate_coordinates(lat, lng)
+    elif lat is not None or lng is not None:
+        raise ValueError("Both latitude and longitude must be provided together")
+
+    return name, dt_utc.isoformat(), dt_local.isoformat(), lat, lng
+
+
+def valid_records(rows, errors, unit="line"):
+    """
+    Yield a record for every valid row, and report the others to stderr
+    as they turn up, so the insert streams along with the file.
+    """
+    for number, row in rows:
+        if "error" in row:
+            message = row["error"]
+        else:
+            try:
+                yield chart_record(row)
+                continue
+            except IMPORT_ERRORS as e:
+                message = error_message(e)
+        errors.append(number)
+        print(f"{unit} {number}: {message}", file=sys.stderr)
+
+
+def import_charts(f, fmt):
+    """Import charts from an open file. Returns (inserted, failed) counts."""
+    errors = []
+    unit = "document" if fmt == "yaml" else "line"
+    create_tables()
+    inserted = add_charts(valid_records(read_import_rows(f, fmt), errors, unit))
+    return inserted, len(errors)
+
+
+def main(args):
+    fmt = args.format
+    if args.file == "-":
+        if fmt is None:
+            raise ValueError("Pass --format when importing from stdin")
+        inserted, failed = import_charts(sys.stdin, fmt)
+    else:
+        fmt = fmt or detect_format(args.file)
+        try:
+            f = open(args.file, newline="", encoding="utf-8")
+        except OSError as e:
+            raise ValueError(f"Can't read import file: {e}")
+        with f:
+            inserted, failed = import_charts(f, fmt)
+
+    print(f"✅ Imported {inserted} chart(s)")
+    if failed:
+        print(f"⚠️  Skipped {failed} invalid row(s)", file=sys.stderr)
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
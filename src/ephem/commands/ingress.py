@@ -0,0 +1,62 @@
+import heapq
+from ephem.constants import OBJECTS
+from ephem.sweph.julian import date_to_jd, jd_to_datetime
+from ephem.sweph.search import find_ingresses
+from ephem.utils.signs import sign_from_index
+import sys
+
+INGRESS_KEYS = ["ae", "ag", "hg", "cu", "fe", "sn", "pb", "ura", "nep", "plu"]
+
+
+def get_ingress_keys(args):
+    keys = list(INGRESS_KEYS)
+    if args.classical:
+        keys = [k for k in keys if k not in ("ura", "nep", "plu")]
+    if args.no_moon:
+        keys.remove("ag")
+    keys.append("true_node" if args.node == "true" else "mean_node")
+    return keys
+
+
+def format_ingress(jd, obj_key, sign_index, forward, ascii_mode=False):
+    _, sign = sign_from_index(sign_index)
+    rx_marker = "" if forward else " r"
+
+    if ascii_mode:
+        obj_name = OBJECTS[obj_key].name.ljust(9)
+        placement = sign.name
+    else:
+        obj_name = OBJECTS[obj_key].glyph.ljust(2)
+        placement = f"{sign.glyph} {sign.name}"
+
+    return f"{jd_to_datetime(jd)} UTC  {obj_name} enters {placement}{rx_marker}"
+
+
+def tag_body(obj_key, ingresses):
+    for jd, sign_index, forward in ingresses:
+        yield jd, obj_key, sign_index, forward
+
+
+def main(args):
+    jd_start = date_to_jd(args.start)
+    jd_end = date_to_jd(args.end)
+    if jd_end <= jd_start:
+        raise ValueError(f"END must be after START, got {args.start} to {args.end}")
+
+    offset = getattr(args, "offset", None)
+    searches = [
+        tag_body(obj_key, find_ingresses(obj_key, jd_start, jd_end, offset))
+        for obj_key in get_ingress_keys(args)
+    ]
+
+    # each search is already in time order, so merging streams the output
+    for jd, obj_key, sign_index, forward in heapq.merge(*searches):
+        print(format_ingress(jd, obj_key, sign_index, forward, args.ascii), flush=True)
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
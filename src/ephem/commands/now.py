@@ -2,8 +2,8 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from ephem.utils.locale import get_locale, InvalidCoordinatesError
 from ephem import sweph
-from ephem.display import format_chart
-from ephem.db import add_chart, create_tables
+from ephem.display import format_chart, format_comparison, write_chart_data
+from ephem.export import get_zodiac_name
 import sys
 
 
@@ -23,32 +23,76 @@ def main(args):
     dt_local, dt_utc, approx_time = get_moment(args.timezone)
     lat, lng, approx_locale, config_locale = get_locale(args)
 
-    jd_now, jd_then, dt_utc_shifted = sweph.get_julian_days(dt_utc, args)
+    jd_now, dt_utc_shifted = sweph.get_julian_days(dt_utc, args)
     offset = getattr(args, "offset", None)
+    # one tropical pass serves every ayanamsa in comparison mode
+    compare = offset == "all"
+    if compare:
+        offset = None
 
     dt_local_shifted = dt_utc_shifted.astimezone(dt_local.tzinfo)
 
-    planets = sweph.get_planets(jd_now, jd_then, offset)
+    planets = sweph.get_planets(jd_now, offset)
     angles = sweph.get_angles(jd_now, lat, lng, offset)
-    part_of_fortune = sweph.get_pars_fortunae(planets, angles)
+    part_of_fortune = sweph.get_pars_fortunae(angles, planets)
     horoscope = sweph.build_horoscope(planets, angles, part_of_fortune)
     title = "Chart of the Moment"
 
-    output = format_chart(
-        args,
-        title,
-        lat,
-        lng,
-        dt_local_shifted,
-        dt_utc_shifted,
-        horoscope,
-        planets,
-        approx_time,
-        approx_locale,
-        config_locale,
-    )
+    output_format = getattr(args, "format", None)
+    if output_format:
+        if compare:
+            horoscopes = [("Tropical", horoscope)]
+            horoscopes += sweph.get_sidereal_horoscopes(jd_now, planets, angles)
+        else:
+            horoscopes = [(get_zodiac_name(offset), horoscope)]
+        write_chart_data(
+            args,
+            output_format,
+            title,
+            lat,
+            lng,
+            dt_local_shifted,
+            dt_utc_shifted,
+            horoscopes,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
+        output = None
+    elif compare:
+        horoscopes = [("Tropical", horoscope)]
+        horoscopes += sweph.get_sidereal_horoscopes(jd_now, planets, angles)
+        output = format_comparison(
+            args,
+            title,
+            lat,
+            lng,
+            dt_local_shifted,
+            dt_utc_shifted,
+            horoscopes,
+            planets,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
+    else:
+        output = format_chart(
+            args,
+            title,
+            lat,
+            lng,
+            dt_local_shifted,
+            dt_utc_shifted,
+            horoscope,
+            planets,
+            approx_time,
+            approx_locale,
+            config_locale,
+        )
 
     if args.save:
+        from ephem.db import add_chart, create_tables
+
         save_title = f"{dt_utc.strftime('%Y-%m-%d %H:%M:%S UTC')}"
         create_tables()
         chart_id = add_chart(
@@ -58,8 +102,10 @@ def main(args):
             latitude=args.lat,
             longitude=args.lng,
         )
-        print()
-        print(f"Chart saved at index {chart_id}.")
+        # keep machine-readable output clean
+        out = sys.stderr if output_format else sys.stdout
+        print(file=out)
+        print(f"Chart saved at index {chart_id}.", file=out)
 
     if output is not None:
         for line in output:
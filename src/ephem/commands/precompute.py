@@ -0,0 +1,45 @@
+from pathlib import Path
+from ephem.sweph.chebyshev import ChebyshevStore, get_store_path, write_store
+from ephem.utils.year import validate_year
+import swisseph as swe
+import sys
+
+
+def print_validation(store, n_samples):
+    print(f"\nWorst-case error over {n_samples} random instants:\n")
+    errors = store.validate(n_samples)
+    for obj_key, error in errors.items():
+        print(f"  {obj_key:<10} {error:8.3f}″")
+    print(f"\n  overall    {max(errors.values()):8.3f}″")
+
+
+def main(args):
+    path = Path(args.file) if args.file else get_store_path()
+
+    if args.validate:
+        print_validation(ChebyshevStore(path), args.samples)
+        return
+
+    validate_year(args.start)
+    validate_year(args.end)
+    if args.end <= args.start:
+        raise ValueError(f"End year must be after start year, got {args.start}–{args.end}")
+
+    jd_start = swe.julday(args.start, 1, 1, 0.0)
+    jd_end = swe.julday(args.end, 1, 1, 0.0)
+
+    def progress(obj_key, n_segments):
+        print(f"Fitting {obj_key} ({n_segments} segments)...")
+
+    write_store(path, jd_start, jd_end, progress=progress)
+    print(f"\nWrote {path} ({path.stat().st_size // 1024} KiB)")
+
+    print_validation(ChebyshevStore(path), args.samples)
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,28 @@
+import os
+import signal
+import sys
+from ephem.server import ChartServer, warm_up
+
+
+def main(args):
+    path = args.socket or os.environ.get("EPHEM_SOCKET")
+    if not path:
+        raise ValueError("Give a socket path with --socket or $EPHEM_SOCKET")
+
+    warm_up()
+    # unwind through the with block on SIGTERM so the socket is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with ChartServer(path) as server:
+        print(f"Serving charts on {path} (pid {os.getpid()})", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def run(args):
+    try:
+        main(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
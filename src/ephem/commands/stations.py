@@ -0,0 +1,39 @@
+from ephem.constants import OBJECTS
+from ephem.sweph import get_planets_batch
+from ephem.sweph.planets import make_position
+from ephem.sweph.julian import date_to_jd, jd_to_datetime
+from ephem.sweph.search import find_stations
+import sys
+
+
+def format_station(jd, obj_key, direction, ascii_mode=False):
+    # no speed passed on: rx is meaningless at the moment of a station
+    lng = get_planets_batch(jd, keys=[obj_key])["lng"][0, 0]
+    position = make_position(obj_key, lng)
+
+    if ascii_mode:
+        obj_name = OBJECTS[obj_key].name.ljust(8)
+        placement = position.short
+    else:
+        obj_name = OBJECTS[obj_key].glyph
+        placement = position.full
+
+    return f"{jd_to_datetime(jd)} UTC  {obj_name} {direction}  {placement}"
+
+
+def main(args):
+    jd_start = date_to_jd(args.start)
+    jd_end = date_to_jd(args.end)
+    if jd_end <= jd_start:
+        raise ValueError(f"END must be after START, got {args.start} to {args.end}")
+
+    for jd, obj_key, direction in find_stations(jd_start, jd_end):
+        print(format_station(jd, obj_key, direction, args.ascii))
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
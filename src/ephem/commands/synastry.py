@@ -0,0 +1,155 @@
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ephem.sweph.aspects import synastry_scores
+from ephem.sweph.stored import load_longitudes
+from ephem.utils.output import stdout_stream
+
+# charts per side of a tile; each tile compares TILE_SIZE² chart pairs
+# with arrays of TILE_SIZE² * len(BODIES)² floats, about 4 MB at 64
+TILE_SIZE = 64
+
+EDGE_FIELDS = ["chart_a", "chart_b", "aspects", "score"]
+
+# longitudes of every chart, set once per worker process
+LONGITUDES = None
+
+
+def get_tiles(n, rows=None, tile_size=TILE_SIZE):
+    """
+    (row start, row end, column start, column end) blocks covering every
+    pair once: the upper triangle of the n × n matrix when rows is None,
+    otherwise the given row indexes against all n charts.
+    """
+    if rows is None:
+        for a in range(0, n, tile_size):
+            for b in range(a, n, tile_size):
+                yield a, min(a + tile_size, n), b, min(b + tile_size, n)
+        return
+
+    for a in range(0, len(rows), tile_size):
+        for b in range(0, n, tile_size):
+            yield a, min(a + tile_size, len(rows)), b, min(b + tile_size, n)
+
+
+def set_longitudes(lngs, rows):
+    global LONGITUDES
+    # each chart's place among the requested rows, past the end for the
+    # rest, so a pair of two requested charts is scored only once
+    rank = None
+    if rows is not None:
+        rank = np.full(len(lngs), len(rows))
+        rank[rows] = np.arange(len(rows))
+    LONGITUDES = (lngs, rows, rank)
+
+
+def score_tile(tile, min_aspects=1, min_score=0.0):
+    """Edges (row index, column index, count, score) of one tile."""
+    lngs, rows, rank = LONGITUDES
+    a0, a1, b0, b1 = tile
+    if rows is None:
+        row_index = np.arange(a0, a1)
+    else:
+        row_index = rows[a0:a1]
+    counts, scores = synastry_scores(lngs[row_index], lngs[b0:b1])
+
+    keep = (counts >= min_aspects) & (scores >= min_score)
+    col_index = np.arange(b0, b1)
+    # a chart is never paired with itself, and each pair is listed once:
+    # with --all from the lower index, with IDs from the one given first
+    if rows is None:
+        keep &= row_index[:, None] < col_index[None, :]
+    else:
+        keep &= np.arange(a0, a1)[:, None] < rank[b0:b1][None, :]
+
+    i, j = np.nonzero(keep)
+    return row_index[i], col_index[j], counts[i, j], scores[i, j]
+
+
+def score_tiles(tiles, min_aspects, min_score, jobs, lngs, rows):
+    if jobs == 1:
+        set_longitudes(lngs, rows)
+        for tile in tiles:
+            yield score_tile(tile, min_aspects, min_score)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=set_longitudes, initargs=(lngs, rows)
+    ) as executor:
+        yield from executor.map(
+            score_tile,
+            tiles,
+            itertools.repeat(min_aspects),
+            itertools.repeat(min_score),
+            chunksize=4,
+        )
+
+
+def write_edges(results, ids, out):
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(EDGE_FIELDS)
+    written = 0
+    for row_index, col_index, counts, scores in results:
+        writer.writerows(
+            zip(
+                ids[row_index].tolist(),
+                ids[col_index].tolist(),
+                counts.tolist(),
+                np.round(scores, 3).tolist(),
+            )
+        )
+        written += len(counts)
+    return written
+
+
+def main(args):
+    if not args.all and not args.ids:
+        raise ValueError("Give chart IDs to compare, or --all for every pair")
+    if args.all and args.ids:
+        raise ValueError("Chart IDs can't be combined with --all")
+
+    ids, lngs = load_longitudes()
+    if not len(ids):
+        raise ValueError(
+            "No charts with stored positions. Run `ephem data backfill` first."
+        )
+
+    rows = None
+    if args.ids:
+        index = {chart_id: i for i, chart_id in enumerate(ids.tolist())}
+        missing = [chart_id for chart_id in args.ids if chart_id not in index]
+        if missing:
+            raise ValueError(
+                f"No stored positions for chart(s) {', '.join(map(str, missing))}"
+            )
+        requested = dict.fromkeys(args.ids)
+        rows = np.array([index[chart_id] for chart_id in requested])
+
+    tiles = get_tiles(len(ids), rows)
+    results = score_tiles(
+        tiles,
+        args.min_aspects,
+        args.min_score,
+        args.jobs or os.cpu_count(),
+        lngs,
+        rows,
+    )
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            written = write_edges(results, ids, f)
+        print(f"Wrote {written} pair(s) to {args.output}", file=sys.stderr)
+    else:
+        with stdout_stream() as out:
+            write_edges(results, ids, out)
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
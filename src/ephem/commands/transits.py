@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import datetime
+from ephem import sweph
+from ephem.constants import ASPECTS, OBJECTS
+from ephem.db import get_chart
+from ephem.sweph.chebyshev import ChebyshevStore
+from ephem.sweph.julian import date_to_jd, jd_to_datetime
+from ephem.sweph.search import find_transits
+import sys
+
+MOVING_KEYS = ["ae", "ag", "hg", "cu", "fe", "sn", "pb", "ura", "nep", "plu"]
+
+
+def get_moving_keys(args):
+    keys = list(MOVING_KEYS)
+    if args.classical:
+        keys = [k for k in keys if k not in ("ura", "nep", "plu")]
+    if args.no_moon:
+        keys.remove("ag")
+    keys.append("true_node" if args.node == "true" else "mean_node")
+    return keys
+
+
+def get_natal_points(chart, args):
+    dt_utc = datetime.fromisoformat(chart["timestamp_utc"])
+    jd_natal, _ = sweph.get_julian_days(dt_utc, None)
+
+    skipped_node = "mean_node" if args.node == "true" else "true_node"
+    natal = {
+        position.obj.key: position.lng
+        for position in sweph.get_planets(jd_natal)
+        if position.obj.key != skipped_node
+    }
+    if args.classical:
+        for key in ("ura", "nep", "plu"):
+            del natal[key]
+
+    if chart["latitude"] is not None and chart["longitude"] is not None:
+        for angle in sweph.get_angles(jd_natal, chart["latitude"], chart["longitude"]):
+            natal[angle.obj.key] = angle.lng
+
+    return natal
+
+
+def format_transit(jd, moving_key, natal_key, aspect_key, forward, ascii_mode=False):
+    rx_marker = " r" if not forward else ""
+    aspect = ASPECTS[aspect_key]
+
+    if ascii_mode:
+        moving = OBJECTS[moving_key].name.ljust(9)
+        symbol = aspect.name.ljust(11)
+        natal = OBJECTS[natal_key].name
+    else:
+        moving = OBJECTS[moving_key].glyph.ljust(2)
+        symbol = aspect.glyph
+        natal = OBJECTS[natal_key].glyph
+
+    return f"{jd_to_datetime(jd)} UTC  {moving} {symbol} natal {natal}{rx_marker}"
+
+
+def main(args):
+    try:
+        chart = get_chart(args.id)
+    except sqlite3.OperationalError as e:
+        if "no such table: charts" in str(e):
+            print(
+                "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
+            )
+            return
+        raise e
+
+    if not chart:
+        print(f"No chart found with ID {args.id}")
+        return
+
+    jd_start = date_to_jd(args.start)
+    jd_end = date_to_jd(args.end)
+    if jd_end <= jd_start:
+        raise ValueError(f"END must be after START, got {args.start} to {args.end}")
+
+    store = ChebyshevStore() if args.precomputed else None
+    natal = get_natal_points(chart, args)
+    for transit in find_transits(
+        natal, get_moving_keys(args), jd_start, jd_end, store=store
+    ):
+        print(format_transit(*transit, ascii_mode=args.ascii), flush=True)
+
+
+def run(args):
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
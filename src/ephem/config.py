@@ -54,6 +54,7 @@ FIELD_PARSERS = {
     ("display", "classical"): parse_bool_field,
     ("display", "ascii"): parse_bool_field,
     ("display", "no-color"): parse_bool_field,
+    ("display", "speed"): parse_bool_field,
 }
 
 
@@ -65,18 +66,30 @@ CLI_TO_CONFIG_MAPPING = {
     "ascii": ("display", "ascii"),
     "node": ("display", "node"),
     "theme": ("display", "theme"),
+    "speed": ("display", "speed"),
     "lat": ("location", "lat"),
     "lng": ("location", "lng"),
     "offset": ("zodiac", "offset"),
 }
 
 
+# parsed defaults keyed by config path, reused by long-lived processes like
+# `ephem serve` until the file changes on disk
+DEFAULTS_CACHE: Dict[Path, tuple] = {}
+
+
 def load_config_defaults():
     path = get_config_path()
 
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return {}
 
+    cached = DEFAULTS_CACHE.get(path)
+    if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return dict(cached[1])
+
     try:
         with open(path, "rb") as f:
             config = tomllib.load(f)
@@ -102,7 +115,8 @@ def load_config_defaults():
                 )
                 defaults[cli_key] = parsed_value
 
-    return defaults
+    DEFAULTS_CACHE[path] = ((stat.st_mtime_ns, stat.st_size), defaults)
+    return dict(defaults)
 
 
 def validate_config_values(lat: Optional[float], lng: Optional[float]):
@@ -117,10 +131,14 @@ def should_save_value(attr: str, value: Any) -> bool:
         return False
 
     # boolean flags: save if True
-    bool_flags = {"no_geo", "no_angles", "classical", "ascii", "no_color"}
+    bool_flags = {"no_geo", "no_angles", "classical", "ascii", "no_color", "speed"}
     if attr in bool_flags:
         return bool(value)
 
+    # comparing every ayanamsa is a one-off view, not a zodiac setting
+    if attr == "offset" and value == "all":
+        return False
+
     # choice options: save if not default
     choice_defaults = {"node": "true", "theme": "sect"}
     if attr in choice_defaults:
@@ -194,6 +212,7 @@ def run_save(args):
     try:
         with open(path, "wb") as f:
             tomli_w.dump(config, f)
+        DEFAULTS_CACHE.pop(path, None)
 
         saved_sections = list(section_updates.keys())
         section_names = {
@@ -262,6 +281,7 @@ def run_show(args):
             "no-color": "Disable ANSI colors",
             "classical": "Classical planets only",
             "ascii": "ASCII mode (no Unicode glyphs)",
+            "speed": "Show daily speed",
         }
         for key, description in bool_flags.items():
             if key in display and display[key]:
@@ -1,5 +1,5 @@
 import swisseph as swe
-from ephem.models import Sign, CelestialObject
+from ephem.models import Sign, CelestialObject, Aspect
 
 SIGNS = {
     "Aries": Sign("Aries", "Ari", "♈︎", "fire", "cardinal"),
@@ -35,6 +35,14 @@ OBJECTS = {
     "mc": CelestialObject("mc", "Midheaven", "MC"),
 }
 
+ASPECTS = {
+    "con": Aspect("con", "Conjunction", "☌", 0, 8),
+    "sex": Aspect("sex", "Sextile", "⚹", 60, 4),
+    "sqr": Aspect("sqr", "Square", "□", 90, 7),
+    "tri": Aspect("tri", "Trine", "△", 120, 7),
+    "opp": Aspect("opp", "Opposition", "☍", 180, 8),
+}
+
 AYANAMSAS = {
     "Fagan-Bradley": swe.SIDM_FAGAN_BRADLEY,  # 0
     "Lahiri": swe.SIDM_LAHIRI,  # 1
@@ -1,7 +1,26 @@
+import atexit
+import hashlib
+import itertools
+import json
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 
+# seconds to wait on a lock held by another ephem process before failing
+BUSY_TIMEOUT = 5.0
+
+# prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 256
+
+# one open connection per (database, process, thread), reused by every call
+CONNECTIONS = {}
+
+# kept in PRAGMA user_version; raise it whenever create_schema changes
+SCHEMA_VERSION = 1
+
 
 def get_db_path():
     env_path = os.environ.get("EPHEM_DB")
@@ -12,87 +31,666 @@ def get_db_path():
     return Path(xdg_data) / "ephem" / "ephem.db"
 
 
+def get_similar_path():
+    return get_db_path().with_suffix(".similar")
+
+
+class Connection(sqlite3.Connection):
+    # how many transaction() blocks are open; only the outermost commits
+    depth = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (func, args) to call once the outermost transaction() commits
+        self.pending = []
+
+
+def open_connection(db_path):
+    os.makedirs(db_path.parent, exist_ok=True)
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        factory=Connection,
+    )
+    # WAL lets readers run alongside a writer, and with synchronous=NORMAL
+    # a commit no longer waits for an fsync
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if schema_version(conn) < SCHEMA_VERSION:
+        upgrade_schema(conn)
+    return conn
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def upgrade_schema(conn):
+    """
+    Create the tables of a new database, or add what a database saved by
+    an older version is missing, once, when it is first opened. Commands
+    can then read without migrating first.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # another process may have upgraded it while we waited for the lock
+        if schema_version(conn) < SCHEMA_VERSION:
+            create_schema(conn)
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
 def get_connection():
+    """
+    The shared connection for the current database. A forked child or
+    another thread gets its own, since sqlite3 connections can't cross
+    either boundary.
+    """
     db_path = get_db_path()
-    os.makedirs(db_path.parent, exist_ok=True)
-    return sqlite3.connect(db_path)
+    key = (str(db_path), os.getpid(), threading.get_ident())
+    conn = CONNECTIONS.get(key)
+    if conn is None:
+        conn = CONNECTIONS[key] = open_connection(db_path)
+    return conn
+
+
+@atexit.register
+def close_connections():
+    pid = os.getpid()
+    for key, conn in list(CONNECTIONS.items()):
+        del CONNECTIONS[key]
+        if key[1] == pid:
+            conn.close()
+
+
+@contextmanager
+def transaction():
+    """
+    Group writes into a single commit. Nested blocks join the outermost
+    one, which commits on success and rolls everything back on error.
+    """
+    conn = get_connection()
+    if conn.depth:
+        conn.depth += 1
+        try:
+            yield conn
+        finally:
+            conn.depth -= 1
+        return
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        conn.pending.clear()
+        raise
+    else:
+        conn.commit()
+    finally:
+        conn.depth = 0
+
+    pending, conn.pending = conn.pending, []
+    for func, args in pending:
+        func(*args)
+
+
+def after_commit(conn, func, *args):
+    """Call func(*args) once the open transaction() commits, if it does."""
+    if (func, args) not in conn.pending:
+        conn.pending.append((func, args))
 
 
 def create_tables():
-    with get_connection() as conn:
+    with transaction() as conn:
+        create_schema(conn)
+
+
+def create_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS charts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            timestamp_utc TEXT NOT NULL,
+            timestamp_input TEXT NOT NULL,
+            latitude REAL,
+            longitude REAL,
+            content_hash TEXT
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS charts_timestamp_utc ON charts (timestamp_utc)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS charts_latitude ON charts (latitude)")
+    conn.execute("CREATE INDEX IF NOT EXISTS charts_longitude ON charts (longitude)")
+    create_content_index(conn)
+    create_name_index(conn)
+    create_position_index(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def chart_hash(name, timestamp_utc, timestamp_input, latitude=None, longitude=None):
+    """
+    Digest of the fields that make two charts the same chart. Coordinates
+    are compared as floats, so 52 and 52.0 hash alike.
+    """
+    latitude, longitude = (
+        None if value is None else float(value) for value in (latitude, longitude)
+    )
+    content = json.dumps(
+        [name, timestamp_utc, timestamp_input, latitude, longitude], default=str
+    )
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def create_content_index(conn):
+    """
+    Index charts by chart_hash, so a chart can be looked up by its content.
+    Databases saved before it existed gain the column here. It isn't
+    UNIQUE: saving the same chart twice has always been allowed.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(charts)")]
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE charts ADD COLUMN content_hash TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS charts_content_hash ON charts (content_hash)"
+    )
+    # edits made outside ephem can't compute the hash; clear it for
+    # fill_content_hashes to redo
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS charts_content_update
+        AFTER UPDATE OF name, timestamp_utc, timestamp_input, latitude, longitude
+        ON charts BEGIN
+            UPDATE charts SET content_hash = NULL WHERE id = new.id;
+        END
+    """)
+    fill_content_hashes(conn)
+
+
+def fill_content_hashes(conn):
+    """Hash the charts that have none, such as those saved by older versions."""
+    conn.create_function("chart_hash", 5, chart_hash, deterministic=True)
+    conn.execute("""
+        UPDATE charts SET content_hash = chart_hash(
+            name, timestamp_utc, timestamp_input, latitude, longitude
+        ) WHERE content_hash IS NULL
+    """)
+
+
+def content_hashes():
+    """The set of chart_hash values of every saved chart."""
+    with transaction() as conn:
+        fill_content_hashes(conn)
+        return {row[0] for row in conn.execute("SELECT content_hash FROM charts")}
+
+
+NAME_INDEX_TRIGGERS = [
+    """
+    CREATE TRIGGER charts_fts_insert AFTER INSERT ON charts BEGIN
+        INSERT INTO charts_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER charts_fts_delete AFTER DELETE ON charts BEGIN
+        INSERT INTO charts_fts (charts_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER charts_fts_update AFTER UPDATE OF name ON charts BEGIN
+        INSERT INTO charts_fts (charts_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO charts_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+
+def has_table(conn, name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def has_name_index(conn):
+    return has_table(conn, "charts_fts")
+
+
+def has_position_index(conn):
+    return has_table(conn, "chart_positions")
+
+
+def create_name_index(conn):
+    """
+    Full-text index on chart names, kept in step with charts by triggers.
+    The trigram tokenizer matches any substring of three or more letters.
+    Builds without FTS5 go without it, and search falls back to LIKE.
+    """
+    if has_name_index(conn):
+        return
+    try:
         conn.execute("""
-            CREATE TABLE IF NOT EXISTS charts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                timestamp_utc TEXT NOT NULL,
-                timestamp_input TEXT NOT NULL,
-                latitude REAL,
-                longitude REAL
+            CREATE VIRTUAL TABLE charts_fts USING fts5(
+                name, content='charts', content_rowid='id', tokenize='trigram'
             )
         """)
-        conn.commit()
+    except sqlite3.OperationalError:
+        return
+
+    # executescript() would commit the surrounding transaction
+    for trigger in NAME_INDEX_TRIGGERS:
+        conn.execute(trigger)
+    # index the charts saved before this version
+    conn.execute("INSERT INTO charts_fts (charts_fts) VALUES ('rebuild')")
+
+
+POSITION_INDEX = [
+    """
+    CREATE TABLE IF NOT EXISTS chart_positions (
+        chart_id INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        jd REAL NOT NULL,
+        longitude REAL NOT NULL,
+        sign INTEGER NOT NULL,
+        rx INTEGER NOT NULL,
+        PRIMARY KEY (chart_id, body)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS chart_positions_sign ON chart_positions (body, sign)",
+    """
+    CREATE INDEX IF NOT EXISTS chart_positions_longitude
+    ON chart_positions (body, longitude)
+    """,
+    "CREATE INDEX IF NOT EXISTS chart_positions_rx ON chart_positions (body, rx)",
+    "CREATE INDEX IF NOT EXISTS chart_positions_jd ON chart_positions (jd)",
+    """
+    CREATE TRIGGER IF NOT EXISTS chart_positions_delete AFTER DELETE ON charts
+    BEGIN
+        DELETE FROM chart_positions WHERE chart_id = old.id;
+    END
+    """,
+    # a new time makes the positions stale until the next backfill
+    """
+    CREATE TRIGGER IF NOT EXISTS chart_positions_update
+    AFTER UPDATE OF timestamp_utc ON charts BEGIN
+        DELETE FROM chart_positions WHERE chart_id = old.id;
+    END
+    """,
+]
+
+
+def create_position_index(conn):
+    """
+    Tropical positions of every saved chart, one row per body, so that
+    placement questions are index lookups rather than a recast of every
+    chart. Charts saved before it existed are filled by backfill_positions.
+    """
+    for statement in POSITION_INDEX:
+        conn.execute(statement)
+
+
+# charts whose positions are computed per get_planets_batch call
+POSITION_CHUNK = 2048
+
+# writes of at least this many charts spread the work over a process pool
+POSITION_POOL_MIN = 20_000
+
+
+def position_rows(charts, pool=None):
+    """
+    chart_positions rows for (chart id, timestamp_utc) pairs, leaving out
+    charts whose timestamp can't be parsed or cast. Timestamps without an
+    offset are taken as UTC.
+    """
+    import swisseph as swe
+    from ephem import sweph
+    from ephem.sweph.planets import PLANET_KEYS
+
+    chart_ids, jds = [], []
+    for chart_id, timestamp_utc in charts:
+        try:
+            dt_utc = datetime.fromisoformat(timestamp_utc)
+            if dt_utc.tzinfo is None:
+                dt_utc = dt_utc.replace(tzinfo=timezone.utc)
+            jd_now, _ = sweph.get_julian_days(dt_utc.astimezone(timezone.utc), None)
+        except (TypeError, ValueError, swe.Error):
+            continue
+        chart_ids.append(chart_id)
+        jds.append(jd_now)
+    if not jds:
+        return []
+
+    if pool is not None:
+        batch = pool.planets_batch(jds, None)
+    else:
+        batch = sweph.get_planets_batch(jds)
+    lngs = batch["lng"].tolist()
+    retrograde = (batch["speed"] < 0).tolist()
+
+    return [
+        (chart_id, obj_key, jd_now, lng, int(lng // 30) % 12, int(rx))
+        for chart_id, jd_now, row_lngs, row_rx in zip(chart_ids, jds, lngs, retrograde)
+        for obj_key, lng, rx in zip(PLANET_KEYS, row_lngs, row_rx)
+    ]
+
+
+def insert_positions(conn, charts, pool=None):
+    """
+    Index (chart id, timestamp_utc) pairs, consumed lazily and computed
+    in bulk, POSITION_CHUNK charts at a time.
+    """
+    charts = iter(charts)
+    chunk_size = POSITION_CHUNK * (8 if pool is not None else 1)
+    while chunk := list(itertools.islice(charts, chunk_size)):
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO chart_positions
+            (chart_id, body, jd, longitude, sign, rx) VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            position_rows(chunk, pool),
+        )
+
+
+def backfill_positions(chunk_size=1000, progress=None):
+    """
+    Index the positions of charts that have none, one transaction per
+    chunk so an interrupted run keeps its progress. Returns how many
+    charts were looked at.
+    """
+    done, last_id = 0, 0
+    while True:
+        with transaction() as conn:
+            charts = conn.execute(
+                """
+                SELECT id, timestamp_utc FROM charts
+                WHERE id > ? AND NOT EXISTS (
+                    SELECT 1 FROM chart_positions WHERE chart_id = charts.id
+                )
+                ORDER BY id LIMIT ?
+            """,
+                (last_id, chunk_size),
+            ).fetchall()
+            if not charts:
+                return done
+            insert_positions(conn, charts)
+
+        done += len(charts)
+        last_id = charts[-1][0]
+        if progress:
+            progress(done)
 
 
 def add_chart(
     name: str, timestamp_utc: str, timestamp_input: str, latitude=None, longitude=None
 ):
-    with get_connection() as conn:
+    chart = (name, timestamp_utc, timestamp_input, latitude, longitude)
+    with transaction() as conn:
         cursor = conn.execute(
             """
-            INSERT INTO charts (name, timestamp_utc, timestamp_input, latitude, longitude)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO charts
+            (name, timestamp_utc, timestamp_input, latitude, longitude, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
         """,
-            (name, timestamp_utc, timestamp_input, latitude, longitude),
+            (*chart, chart_hash(*chart)),
         )
-        conn.commit()
+        if has_position_index(conn):
+            insert_positions(conn, [(cursor.lastrowid, timestamp_utc)])
+            after_commit(conn, update_similar_index)
         return cursor.lastrowid
 
 
-def get_chart(chart_id: int):
-    with get_connection() as conn:
-        cursor = conn.execute(
+def add_charts(charts):
+    """
+    Insert (name, timestamp_utc, timestamp_input, latitude, longitude)
+    tuples from any iterable, consumed lazily, in a single transaction.
+    Returns how many were inserted.
+    """
+    with transaction() as conn:
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM charts")
+        last_id = last_id.fetchone()[0]
+
+        indexed = has_name_index(conn)
+        if indexed:
+            # one bulk insert into the name index is several times faster
+            # than the trigger firing per row; the transaction keeps it atomic
+            conn.execute("DROP TRIGGER charts_fts_insert")
+
+        cursor = conn.executemany(
             """
-            SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude 
-            FROM charts WHERE id = ?
+            INSERT INTO charts
+            (name, timestamp_utc, timestamp_input, latitude, longitude, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
         """,
-            (chart_id,),
+            ((*chart, chart_hash(*chart)) for chart in charts),
         )
-        row = cursor.fetchone()
-        if row:
-            return {
-                "id": row[0],
-                "name": row[1],
-                "timestamp_utc": row[2],
-                "timestamp_input": row[3],
-                "latitude": row[4],
-                "longitude": row[5],
-            }
+
+        if indexed:
+            conn.execute(
+                "INSERT INTO charts_fts (rowid, name) "
+                "SELECT id, name FROM charts WHERE id > ?",
+                (last_id,),
+            )
+            conn.execute(NAME_INDEX_TRIGGERS[0])
+
+        inserted = cursor.rowcount
+        if has_position_index(conn):
+            added = conn.execute(
+                "SELECT id, timestamp_utc FROM charts WHERE id > ?", (last_id,)
+            )
+            if inserted >= POSITION_POOL_MIN and (os.cpu_count() or 1) > 1:
+                from ephem.sweph.pool import EphemerisPool
+
+                with EphemerisPool() as pool:
+                    insert_positions(conn, added, pool)
+            else:
+                insert_positions(conn, added)
+            after_commit(conn, update_similar_index)
+        return inserted
+
+
+CHART_COLUMNS = (
+    "id",
+    "name",
+    "timestamp_utc",
+    "timestamp_input",
+    "latitude",
+    "longitude",
+)
+
+
+def chart_from_row(row):
+    return dict(zip(CHART_COLUMNS, row))
+
+
+def get_chart(chart_id: int):
+    # reads skip `with conn`, which would commit an open transaction()
+    conn = get_connection()
+    cursor = conn.execute(
+        """
+        SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude 
+        FROM charts WHERE id = ?
+    """,
+        (chart_id,),
+    )
+    row = cursor.fetchone()
+    if row:
+        return chart_from_row(row)
     return None
 
 
 def view_charts():
-    with get_connection() as conn:
-        cursor = conn.execute("""
-            SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude 
-            FROM charts ORDER BY id
-        """)
-        rows = cursor.fetchall()
-        return [
-            {
-                "id": row[0],
-                "name": row[1],
-                "timestamp_utc": row[2],
-                "timestamp_input": row[3],
-                "latitude": row[4],
-                "longitude": row[5],
-            }
-            for row in rows
-        ]
+    return list(iter_charts())
+
+
+def iter_charts(limit=None, offset=0, after_id=None):
+    """
+    Yield charts in ID order straight from the cursor, so memory stays flat
+    however large the table is. after_id starts after a given chart, which
+    unlike offset costs nothing however deep the page is.
+    """
+    conn = get_connection()
+    cursor = conn.execute(
+        """
+        SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude
+        FROM charts WHERE id > ? ORDER BY id LIMIT ? OFFSET ?
+    """,
+        (
+            after_id if after_id is not None else -1,
+            limit if limit is not None else -1,
+            offset or 0,
+        ),
+    )
+    for row in cursor:
+        yield chart_from_row(row)
+
+
+def search_charts(name=None, start=None, end=None, bbox=None, limit=None):
+    """
+    Charts whose name contains `name`, with timestamp_utc in [start, end)
+    and a location inside bbox, a (south, west, north, east) tuple whose
+    west edge may lie east of its east edge to cross the antimeridian.
+    Every filter is optional.
+    """
+    conn = get_connection()
+    clauses, params = [], []
+
+    if name:
+        # trigrams need three characters; shorter names scan with LIKE
+        if len(name) >= 3 and has_name_index(conn):
+            clauses.append(
+                "id IN (SELECT rowid FROM charts_fts WHERE charts_fts MATCH ?)"
+            )
+            params.append('"' + name.replace('"', '""') + '"')
+        else:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+    if start:
+        clauses.append("timestamp_utc >= ?")
+        params.append(start)
+    if end:
+        clauses.append("timestamp_utc < ?")
+        params.append(end)
+
+    if bbox:
+        south, west, north, east = bbox
+        clauses.append("latitude BETWEEN ? AND ?")
+        params += [south, north]
+        if west <= east:
+            clauses.append("longitude BETWEEN ? AND ?")
+            params += [west, east]
+        else:
+            clauses.append("(longitude >= ? OR longitude <= ?)")
+            params += [west, east]
+
+    query = """
+        SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude
+        FROM charts
+    """
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    return [chart_from_row(row) for row in conn.execute(query, params)]
+
+
+def find_charts(where, params=(), limit=None):
+    """Yield charts matching a SQL condition on the charts table, by ID."""
+    conn = get_connection()
+    query = f"""
+        SELECT id, name, timestamp_utc, timestamp_input, latitude, longitude
+        FROM charts WHERE {where} ORDER BY id LIMIT ?
+    """
+    params = [*params, limit if limit is not None else -1]
+    for row in conn.execute(query, params):
+        yield chart_from_row(row)
+
+
+def iter_positions(bodies, after_id=0):
+    """
+    Yield (chart_id, body, longitude) for the given bodies, by chart ID,
+    for charts after after_id.
+    """
+    conn = get_connection()
+    marks = ", ".join("?" * len(bodies))
+    cursor = conn.execute(
+        f"""
+        SELECT chart_id, body, longitude FROM chart_positions
+        WHERE chart_id > ? AND body IN ({marks}) ORDER BY chart_id
+    """,
+        [after_id, *bodies],
+    )
+    yield from cursor
+
+
+# every indexed chart has a Sun row; this reads it from an index alone
+POSITION_CHART_IDS = "SELECT chart_id FROM chart_positions WHERE body = 'ae'"
+
+
+def position_chart_ids():
+    """IDs of the charts with stored positions, in no particular order."""
+    conn = get_connection()
+    return [row[0] for row in conn.execute(POSITION_CHART_IDS)]
+
+
+def position_chart_checksum():
+    """
+    (count, sum, sum of squares) of the IDs position_chart_ids returns,
+    which tells whether that set changed without reading it.
+    """
+    conn = get_connection()
+    row = conn.execute(f"""
+        SELECT COUNT(*), COALESCE(SUM(chart_id), 0),
+               COALESCE(SUM(chart_id * chart_id), 0)
+        FROM ({POSITION_CHART_IDS})
+    """).fetchone()
+    return tuple(row)
+
+
+def count_unindexed_charts():
+    conn = get_connection()
+    row = conn.execute("""
+        SELECT COUNT(*) FROM charts WHERE NOT EXISTS (
+            SELECT 1 FROM chart_positions WHERE chart_id = charts.id
+        )
+    """).fetchone()
+    return row[0]
+
+
+def position_jd_range():
+    """Earliest and latest indexed Julian day, or None if nothing is indexed."""
+    conn = get_connection()
+    # separate subqueries, as SQLite only reads min or max off an index alone
+    row = conn.execute("""
+        SELECT (SELECT MIN(jd) FROM chart_positions),
+               (SELECT MAX(jd) FROM chart_positions)
+    """).fetchone()
+    return None if row[0] is None else row
 
 
 def delete_chart(chart_id: int):
-    with get_connection() as conn:
+    with transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM charts WHERE id = ?", (chart_id,))
-        conn.commit()
+        if cursor.rowcount:
+            after_commit(conn, update_similar_index, (chart_id,))
         return cursor.rowcount > 0
+
+
+def update_similar_index(removed=()):
+    """Keep the similar-chart index, once `data similar` has built it, current."""
+    if get_similar_path().exists():
+        from ephem.similar import update_index
+
+        update_index(removed)
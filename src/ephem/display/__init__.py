@@ -1,3 +1,3 @@
-from .chart import format_chart
+from .chart import format_chart, format_comparison, write_chart_data
 
-__all__ = ["format_chart"]
+__all__ = ["format_chart", "format_comparison", "write_chart_data"]
@@ -1,7 +1,8 @@
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from ephem.constants import AYANAMSAS, Colors
+import sys
+from functools import lru_cache
+from ephem.constants import AYANAMSAS, OBJECTS, Colors
+from ephem.export import chart_to_dict, horoscope_to_dict, write_charts
+from ephem.sweph.planets import is_stationary
 
 
 def get_chart_title(title=None, approx_time=False, approx_locale=False, offset=None):
@@ -12,6 +13,8 @@ def get_chart_title(title=None, approx_time=False, approx_locale=False, offset=N
 
     if offset is None:
         zodiac_info = "Tropical"
+    elif offset == "all":
+        zodiac_info = "Tropical and all sidereal"
     else:
         if isinstance(offset, int) or (isinstance(offset, str) and offset.isdigit()):
             idx = int(offset)
@@ -66,6 +69,17 @@ def get_mercury_sect_color(planets, default_color):
         return default_color
 
 
+def get_hidden_keys(args, approx_time=False, approx_locale=False):
+    """Keys the display flags leave out of a chart."""
+    hidden = set()
+    if args.classical:
+        hidden |= {"ura", "nep", "plu"}
+    if approx_time or approx_locale or args.no_angles:
+        hidden |= {"asc", "mc", "for"}
+    hidden.add("mean_node" if args.node == "true" else "true_node")
+    return hidden
+
+
 def get_spheres(horoscope, args, planets, approx_time, approx_locale):
     ELEMENT_COLORS = {
         "fire": "red",
@@ -114,20 +128,26 @@ def get_spheres(horoscope, args, planets, approx_time, approx_locale):
                 color = color_map.get(position.sign.quad)
             spheres.append((key, color))
 
-    # apply filtering flags
-    if args.classical:
-        spheres = [(k, c) for k, c in spheres if k not in ("ura", "nep", "plu")]
-    if approx_time or approx_locale or args.no_angles:
-        spheres = [(k, c) for k, c in spheres if k not in ("asc", "mc", "for")]
-    if args.node == "true":
-        spheres = [(k, c) for k, c in spheres if k != "mean_node"]
-    else:
-        spheres = [(k, c) for k, c in spheres if k != "true_node"]
+    hidden = get_hidden_keys(args, approx_time, approx_locale)
+    return [(k, c) for k, c in spheres if k not in hidden]
+
 
-    return spheres
+def format_speed(position, ascii_mode=False):
+    if position.speed is None:
+        return ""
+
+    total = round(abs(position.speed) * 3600)
+    deg, rem = divmod(total, 3600)
+    mnt, sec = divmod(rem, 60)
+    sign = "-" if position.speed < 0 else "+"
+    deg_mark = "d" if ascii_mode else "°"
+    station = " S" if is_stationary(position.obj.key, position.speed) else ""
+
+    return f"{sign}{deg:2d}{deg_mark}{mnt:02d}'{sec:02d}\"{station}"
 
 
 def render_sphere_lines(spheres, horoscope, args, colors):
+    show_speed = getattr(args, "speed", False)
     lines = []
     for key, color in spheres:
         position = horoscope.get(key)
@@ -142,13 +162,22 @@ def render_sphere_lines(spheres, horoscope, args, colors):
             placement = position.full
 
         line = f"{obj_name} {placement}"
+        if show_speed:
+            width = 14 if args.ascii else 22
+            speed = format_speed(position, args.ascii)
+            line = f"{obj_name} {placement.ljust(width)} {speed}".rstrip()
         if colors and color:
             line = colors.colorize(line, color)
         lines.append(line)
     return lines
 
 
-console = Console()
+@lru_cache(maxsize=None)
+def get_console():
+    # rich is only needed for colored output, so it loads on first use
+    from rich.console import Console
+
+    return Console()
 
 
 def format_chart(
@@ -191,7 +220,11 @@ def format_chart(
         return lines
 
     else:
+        from rich.table import Table
+        from rich.text import Text
+
         colors = Colors()
+        console = get_console()
 
         # print warnings in yellow
         warnings = get_warnings(args, approx_time, approx_locale, config_locale)
@@ -219,6 +252,9 @@ def format_chart(
         else:
             table.add_column("Object", justify="right", style="bold")
         table.add_column("Placement", justify="left")
+        show_speed = getattr(args, "speed", False)
+        if show_speed:
+            table.add_column("Speed", justify="left")
 
         spheres = get_spheres(horoscope, args, planets, approx_time, approx_locale)
         for key, color in spheres:
@@ -236,6 +272,149 @@ def format_chart(
             if colors and color:
                 obj_name = colors.colorize(obj_name, color)
 
-            table.add_row(obj_name, placement)
+            if show_speed:
+                table.add_row(obj_name, placement, format_speed(position, args.ascii))
+            else:
+                table.add_row(obj_name, placement)
 
         console.print(table)
+
+
+def format_compact(position, ascii_mode=False):
+    sign = position.sign.trunc if ascii_mode else position.sign.glyph
+    return f"{position.deg:>2}{sign}{position.mnt:02d}"
+
+
+def get_comparison_rows(horoscopes, spheres, ascii_mode=False):
+    rows = []
+    for idx, (label, horoscope) in enumerate(horoscopes):
+        # the first horoscope is tropical and has no offset index
+        index = f"{idx - 1:2}" if idx else "  "
+        cells = [
+            format_compact(horoscope[key], ascii_mode)
+            for key, _ in spheres
+            if key in horoscope
+        ]
+        rows.append((f"{index} {label}", cells))
+    return rows
+
+
+def format_comparison(
+    args,
+    title,
+    lat,
+    lng,
+    dt_local,
+    dt_utc,
+    horoscopes,
+    planets,
+    approx_time,
+    approx_locale,
+    config_locale,
+):
+    """
+    Render one row per zodiac from a list of (label, horoscope) pairs, the
+    tropical horoscope first, followed by each ayanamsa in index order.
+    """
+    no_color = getattr(args, "no_color", False)
+    tropical = horoscopes[0][1]
+    spheres = get_spheres(tropical, args, planets, approx_time, approx_locale)
+    spheres = [(k, c) for k, c in spheres if k in tropical]
+
+    if args.ascii:
+        headers = [OBJECTS[key].name for key, _ in spheres]
+    else:
+        headers = [OBJECTS[key].glyph for key, _ in spheres]
+
+    rows = get_comparison_rows(horoscopes, spheres, args.ascii)
+    chart_title = get_chart_title(title, approx_time, approx_locale, "all")
+    time_str, location_str = get_chart_subtitle(
+        dt_local, dt_utc, lat, lng, args, approx_locale
+    )
+    subtitle_line = time_str
+    if location_str:
+        subtitle_line += " " + location_str
+
+    if no_color:
+        lines = get_warnings(args, approx_time, approx_locale, config_locale)
+        lines.append(chart_title)
+        lines.append(subtitle_line)
+
+        label_width = max(len(label) for label, _ in rows)
+        widths = [
+            max(len(header), *(len(cells[i]) for _, cells in rows))
+            for i, header in enumerate(headers)
+        ]
+        header_cells = [h.ljust(w) for h, w in zip(headers, widths)]
+        lines.append(" ".join(["".ljust(label_width)] + header_cells).rstrip())
+        for label, cells in rows:
+            row_cells = [c.ljust(w) for c, w in zip(cells, widths)]
+            lines.append(" ".join([label.ljust(label_width)] + row_cells).rstrip())
+
+        return lines
+
+    from rich.table import Table
+    from rich.text import Text
+
+    colors = Colors()
+    console = get_console()
+    for warning in get_warnings(args, approx_time, approx_locale, config_locale):
+        console.print(Text(warning, style="yellow"))
+
+    console.print(Text(f" {chart_title}", style="bold"))
+    console.print(Text(f" {subtitle_line}", style="bold"))
+    console.print()
+
+    # keep every column even when the terminal is narrower than the table
+    label_width = max(len(label) for label, _ in rows)
+    widths = [max(len(header), 7) for header in headers]
+    table_width = label_width + sum(widths) + 2 * len(widths) + 4
+
+    table = Table(box=None, pad_edge=True)
+    table.add_column("", justify="left", style="bold", no_wrap=True)
+    for header, width, (_, color) in zip(headers, widths, spheres):
+        # element and mode colors follow the sign, which differs per row
+        if args.theme == "sect" and color:
+            header = colors.colorize(header, color)
+        table.add_column(header, justify="left", no_wrap=True, min_width=width)
+    for label, cells in rows:
+        table.add_row(label, *cells)
+
+    console.print(table, width=max(console.width, table_width), crop=False)
+
+
+def write_chart_data(
+    args,
+    output_format,
+    title,
+    lat,
+    lng,
+    dt_local,
+    dt_utc,
+    horoscopes,
+    approx_time=False,
+    approx_locale=False,
+    config_locale=False,
+):
+    """
+    Write (zodiac, horoscope) pairs as JSON, NDJSON or CSV, keeping the
+    bodies the display flags select. Warnings go to stderr.
+    """
+    for warning in get_warnings(args, approx_time, approx_locale, config_locale):
+        print(warning, file=sys.stderr)
+
+    hidden = get_hidden_keys(args, approx_time, approx_locale)
+    charts = [
+        chart_to_dict(
+            title,
+            dt_local,
+            dt_utc,
+            approx_time,
+            lat,
+            lng,
+            zodiac,
+            horoscope_to_dict(horoscope, hidden),
+        )
+        for zodiac, horoscope in horoscopes
+    ]
+    write_charts(charts, output_format)
@@ -3,46 +3,17 @@ from rich.console import Console
 from rich.table import Table, box
 from rich.align import Align
 from rich.text import Text
-from ephem.constants import OBJECTS, AYANAMSAS, SIGNS
-from ephem.sweph import get_planets, build_horoscope
-from ephem.utils.signs import sign_from_index
-from ephem.utils.year import validate_year
-import swisseph as swe
+from ephem.constants import OBJECTS, AYANAMSAS
+from ephem.sweph.calendar import get_calendar_rows
+from ephem.sweph.chebyshev import ChebyshevStore
 
 
-def get_sidereal_time(jd):
-    gst = swe.sidtime(jd) % 24
-    total_seconds = int(round(gst * 3600))
-    hours = (total_seconds // 3600) % 24
-    minutes = (total_seconds % 3600) // 60
-    seconds = total_seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-
-def get_moon_positions(jd_midnight, jd_noon, offset=None, ascii_mode=False):
-    calc_flag = swe.FLG_SWIEPH
-    if offset is not None:
-        try:
-            sid_mode = list(AYANAMSAS.values())[offset]
-            swe.set_sid_mode(sid_mode, 0, 0)
-            calc_flag |= swe.FLG_SIDEREAL
-        except IndexError:
-            pass
-
-    moon_0hr = swe.calc_ut(jd_midnight, 1, calc_flag)[0][0]
-    moon_noon = swe.calc_ut(jd_noon, 1, calc_flag)[0][0]
-
-    def format_moon_pos(lng):
-        dms = swe.split_deg(lng, 8)
-        sign_name, _ = sign_from_index(dms[4])
-        sign = SIGNS[sign_name]
-
-        if ascii_mode:
-            return f"{dms[0]:2d} {sign.trunc:<3} {dms[1]:02d} {dms[2]:02d}"
-        else:
-            return f"{dms[0]:2d} {sign.glyph:<3} {dms[1]:02d} {dms[2]:02d}"
-
-    return format_moon_pos(moon_0hr), format_moon_pos(moon_noon)
+def format_stations(changes, ascii_mode=False):
+    marks = []
+    for key, station in changes:
+        name = OBJECTS[key].name if ascii_mode else OBJECTS[key].glyph
+        marks.append(f"{name} {station}")
+    return " ".join(marks)
 
 
 def format_planet_position(position, ascii_mode=False):
@@ -64,18 +35,13 @@ def format_planet_position(position, ascii_mode=False):
 
 
 def format_calendar(args):
-    validate_year(args.year)
-
     offset = getattr(args, "offset", None)
     ascii_mode = getattr(args, "ascii", False)
+    show_stations = getattr(args, "stations", False)
+    store = ChebyshevStore() if getattr(args, "precomputed", False) else None
 
+    rows = get_calendar_rows(args.year, args.month, offset, store)
     first_day = datetime(args.year, args.month, 1)
-    next_month = (
-        datetime(args.year + 1, 1, 1)
-        if args.month == 12
-        else datetime(args.year, args.month + 1, 1)
-    )
-    days_in_month = (next_month - first_day).days
 
     console = Console()
     month_name = first_day.strftime("%B %Y")
@@ -109,6 +75,8 @@ def format_calendar(args):
         ("nep", "left", None),  # Neptune
         ("plu", "left", None),  # Pluto
     ]
+    if show_stations:
+        EPHEMERIS_COLUMNS.append(("Stations", "left", None))
 
     table = Table(show_header=True, box=box.SQUARE)
     for col_name, cell_justify, style in EPHEMERIS_COLUMNS:
@@ -132,30 +100,19 @@ def format_calendar(args):
 
     day_abbrevs = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
 
-    for day in range(1, days_in_month + 1):
-        current_date = datetime(args.year, args.month, day)
-        day_abbrev = day_abbrevs[current_date.weekday()]
-
-        jd_midnight = swe.julday(args.year, args.month, day, 0.0)
-        jd_noon = swe.julday(args.year, args.month, day, 12.0)
-        jd_prev = jd_midnight - 1 / 1440
+    for row in rows:
+        horoscope = row["positions"]
+        day_abbrev = day_abbrevs[row["date"].weekday()]
+        day_str = f"{row['date'].day:2d} {day_abbrev}"
 
-        sid_time = get_sidereal_time(jd_midnight)
-        planets = get_planets(jd_midnight, jd_prev, offset)
-        horoscope = build_horoscope(planets, [], [])
-
-        moon_0hr, moon_noon = get_moon_positions(
-            jd_midnight, jd_noon, offset, ascii_mode=ascii_mode
-        )
-
-        day_str = f"{day:2d} {day_abbrev}"
-
-        row_data = [day_str, sid_time]
+        row_data = [day_str, row["sidereal_time"]]
         for col_name, _, _ in EPHEMERIS_COLUMNS[2:]:
-            if col_name == "ag":
-                row_data.append(moon_0hr)
-            elif col_name == "ag_noon":
-                row_data.append(moon_noon)
+            if col_name == "ag_noon":
+                row_data.append(
+                    format_planet_position(row["noon_moon"], ascii_mode=ascii_mode)
+                )
+            elif col_name == "Stations":
+                row_data.append(format_stations(row["stations"], ascii_mode))
             elif col_name in horoscope:
                 row_data.append(
                     format_planet_position(horoscope[col_name], ascii_mode=ascii_mode)
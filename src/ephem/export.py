@@ -0,0 +1,129 @@
+import csv
+import json
+import sys
+from ephem.constants import AYANAMSAS
+
+FORMATS = ["json", "ndjson", "csv"]
+
+# one CSV row per body; charts and calendar days add their own leading columns
+POSITION_FIELDS = ["key", "name", "lng", "sign", "deg", "mnt", "sec", "rx", "speed"]
+
+
+def position_to_dict(position):
+    return {
+        "name": position.obj.name,
+        "lng": position.lng,
+        "sign": position.sign.name,
+        "deg": position.deg,
+        "mnt": position.mnt,
+        "sec": position.sec,
+        "rx": position.rx,
+        "speed": position.speed,
+    }
+
+
+def horoscope_to_dict(horoscope, hidden=()):
+    return {
+        key: position_to_dict(position)
+        for key, position in horoscope.items()
+        if key not in hidden
+    }
+
+
+def get_zodiac_name(offset=None):
+    return "Tropical" if offset is None else list(AYANAMSAS)[offset]
+
+
+def chart_to_dict(title, dt_local, dt_utc, approx_time, lat, lng, zodiac, positions):
+    return {
+        "title": title,
+        "timestamp_utc": dt_utc.isoformat(),
+        "timestamp_input": dt_local.isoformat(),
+        "approx_time": approx_time,
+        "latitude": lat,
+        "longitude": lng,
+        "zodiac": zodiac,
+        "positions": positions,
+    }
+
+
+def calendar_row_to_dict(row):
+    return {
+        "date": row["date"].isoformat(),
+        "sidereal_time": row["sidereal_time"],
+        "positions": horoscope_to_dict(row["positions"]),
+        "noon_moon": position_to_dict(row["noon_moon"]),
+        "stations": [
+            {"key": key, "station": station} for key, station in row["stations"]
+        ],
+    }
+
+
+def position_rows(positions):
+    for key, position in positions.items():
+        yield {"key": key, **position}
+
+
+def write_csv(rows, fields, out):
+    writer = csv.DictWriter(out, fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def chart_csv_rows(charts):
+    for chart in charts:
+        for row in position_rows(chart["positions"]):
+            yield {
+                "title": chart["title"],
+                "timestamp_utc": chart["timestamp_utc"],
+                "zodiac": chart["zodiac"],
+                **row,
+            }
+
+
+def write_charts(charts, fmt, out=None):
+    """
+    Print chart dicts as one JSON value (a list when comparing zodiacs),
+    one NDJSON line per chart, or CSV with one row per body.
+    """
+    out = out or sys.stdout
+    if fmt == "json":
+        value = charts[0] if len(charts) == 1 else charts
+        out.write(json.dumps(value, ensure_ascii=False, indent=2) + "\n")
+    elif fmt == "ndjson":
+        for chart in charts:
+            out.write(json.dumps(chart, ensure_ascii=False) + "\n")
+    else:
+        fields = ["title", "timestamp_utc", "zodiac"] + POSITION_FIELDS
+        write_csv(chart_csv_rows(charts), fields, out)
+
+
+def calendar_csv_rows(days, zodiac):
+    for day in days:
+        stations = {s["key"]: s["station"] for s in day["stations"]}
+        positions = {**day["positions"], "ag_noon": day["noon_moon"]}
+        for row in position_rows(positions):
+            yield {
+                "date": day["date"],
+                "sidereal_time": day["sidereal_time"],
+                "zodiac": zodiac,
+                **row,
+                "station": stations.get(row["key"], ""),
+            }
+
+
+def write_calendar(days, zodiac, fmt, out=None):
+    """
+    Print calendar_row_to_dict days as one JSON object, one NDJSON line per
+    day, or CSV with one row per body per day; the noon Moon is `ag_noon`.
+    """
+    out = out or sys.stdout
+    if fmt == "json":
+        value = {"zodiac": zodiac, "days": days}
+        out.write(json.dumps(value, ensure_ascii=False, indent=2) + "\n")
+    elif fmt == "ndjson":
+        for day in days:
+            out.write(json.dumps({"zodiac": zodiac, **day}, ensure_ascii=False) + "\n")
+    else:
+        fields = ["date", "sidereal_time", "zodiac"] + POSITION_FIELDS + ["station"]
+        write_csv(calendar_csv_rows(days, zodiac), fields, out)
@@ -14,14 +14,33 @@ class CelestialObject:
         self.glyph = glyph
 
 
+class Aspect:
+    def __init__(self, key, name, glyph, angle, orb):
+        self.key = key
+        self.name = name
+        self.glyph = glyph
+        self.angle = angle
+        self.orb = orb
+
+
+class AspectMatch:
+    def __init__(self, first, second, aspect, orb, applying=None):
+        self.first = first
+        self.second = second
+        self.aspect = aspect
+        self.orb = orb  # degrees from exact
+        self.applying = applying  # None when either body has no speed
+
+
 class Position:
-    def __init__(self, obj, sign, deg, mnt, sec, rx=False):
+    def __init__(self, obj, sign, deg, mnt, sec, rx=False, speed=None):
         self.obj = obj
         self.sign = sign
         self.deg = deg
         self.mnt = mnt
         self.sec = sec
         self.rx = rx
+        self.speed = speed  # degrees per day, None for angles and lots
 
     @property
     def full(self):
@@ -0,0 +1,255 @@
+import importlib.abc
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# (stage, "module:function") pairs timed under --profile, in report order.
+# Times are inclusive, so a stage also counts the stages it calls.
+TARGETS = [
+    ("config", "ephem.config:load_config_defaults"),
+    ("config", "ephem.config:run_save"),
+    ("locale", "ephem.utils.locale:get_locale"),
+    ("julian", "ephem.sweph.julian:get_julian_days"),
+    ("sweph", "ephem.sweph.core:cast_horoscope"),
+    ("sweph", "ephem.sweph.planets:get_planets"),
+    ("sweph", "ephem.sweph.angles:get_angles"),
+    ("sweph", "ephem.sweph.fortuna:get_pars_fortunae"),
+    ("sweph", "ephem.sweph.core:build_horoscope"),
+    ("sweph", "ephem.sweph.sidereal:get_sidereal_horoscopes"),
+    ("sweph", "ephem.sweph.batch:get_planets_batch"),
+    ("sweph", "ephem.sweph.batch:positions_from_batch"),
+    ("sweph", "ephem.sweph.calendar:get_calendar_rows"),
+    ("sweph", "ephem.sweph.planets:make_position"),
+    ("swisseph", "swisseph:calc_ut"),
+    ("swisseph", "swisseph:houses_ex"),
+    ("swisseph", "swisseph:split_deg"),
+    ("swisseph", "swisseph:julday"),
+    ("swisseph", "swisseph:sidtime"),
+    ("swisseph", "swisseph:set_sid_mode"),
+    ("swisseph", "swisseph:get_ayanamsa_ex_ut"),
+    ("render", "ephem.display.chart:format_chart"),
+    ("render", "ephem.display.chart:format_comparison"),
+    ("render", "ephem.display.chart:write_chart_data"),
+    ("render", "ephem.display.month:format_calendar"),
+    ("render", "ephem.display.month:format_planet_position"),
+    ("render", "ephem.export:write_charts"),
+    ("render", "ephem.export:write_calendar"),
+    ("db", "ephem.db:create_tables"),
+    ("db", "ephem.db:add_chart"),
+    ("db", "ephem.db:get_chart"),
+    ("db", "ephem.db:view_charts"),
+    ("db", "ephem.db:search_charts"),
+    ("db", "ephem.db:delete_chart"),
+    ("db", "ephem.db:backfill_positions"),
+    ("db", "ephem.yaml_sync:full_sync"),
+]
+
+
+class Profiler:
+    """
+    Times calls to the functions in TARGETS by swapping in wrappers
+    wherever ephem modules hold a reference, then restores them. Target
+    modules that aren't loaded yet are patched as they are imported, so
+    profiling doesn't import anything the command wouldn't.
+    """
+
+    def __init__(self, targets=TARGETS):
+        self.targets = targets
+        self.origin = time.perf_counter_ns()
+        self.events = []  # (name, start ns, duration ns, thread id)
+        self.patched = []
+        self.pending = {}  # module name -> [(stage, function name)]
+        self.finder = PatchOnImport(self)
+
+    def record(self, name, start, end):
+        self.events.append(
+            (name, start - self.origin, end - start, threading.get_ident())
+        )
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns())
+
+    def wrap(self, name, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, start, time.perf_counter_ns())
+
+        return timed
+
+    def install(self):
+        self.pending = {}
+        for stage, target in self.targets:
+            module_name, func_name = target.split(":")
+            self.pending.setdefault(module_name, []).append((stage, func_name))
+        for module_name in list(self.pending):
+            module = sys.modules.get(module_name)
+            if module is not None:
+                self.patch_module(module)
+        if self.pending:
+            sys.meta_path.insert(0, self.finder)
+
+    def patch_module(self, module):
+        for stage, func_name in self.pending.pop(module.__name__, []):
+            original = getattr(module, func_name, None)
+            if original is None:
+                continue
+
+            timed = self.wrap(f"{stage}.{func_name}", original)
+            # __main__ is ephem.cli under `python -m ephem.cli`
+            holders = [module] + [
+                mod
+                for name, mod in list(sys.modules.items())
+                if (name.startswith("ephem") or name == "__main__")
+                and mod is not module
+            ]
+            for holder in holders:
+                for attr, value in list(vars(holder).items()):
+                    if value is original:
+                        setattr(holder, attr, timed)
+                        self.patched.append((holder, attr, original))
+
+    def uninstall(self):
+        if self.finder in sys.meta_path:
+            sys.meta_path.remove(self.finder)
+        self.pending = {}
+        for holder, attr, original in reversed(self.patched):
+            setattr(holder, attr, original)
+        self.patched = []
+
+    def summary(self):
+        """Return [(name, calls, total ns)] in TARGETS order, then the rest."""
+        totals = {}
+        for name, _, duration, _ in self.events:
+            calls, total = totals.get(name, (0, 0))
+            totals[name] = (calls + 1, total + duration)
+
+        order = ["total"]
+        order += [f"{stage}.{target.split(':')[1]}" for stage, target in self.targets]
+        names = sorted(
+            totals, key=lambda n: order.index(n) if n in order else len(order)
+        )
+        return [(name, *totals[name]) for name in names]
+
+    def format_summary(self, wall_ns):
+        lines = [
+            f"\nProfile: {wall_ns / 1e6:.1f} ms wall, inclusive times\n",
+            f"{'stage':<38} {'calls':>7} {'total ms':>10} {'mean µs':>10} {'wall':>6}",
+        ]
+        for name, calls, total in self.summary():
+            lines.append(
+                f"{name:<38} {calls:>7} {total / 1e6:>10.2f} "
+                f"{total / calls / 1e3:>10.1f} {total / wall_ns:>6.1%}"
+            )
+        return lines
+
+    def write_trace(self, path):
+        """Write events in the Chrome trace format read by Perfetto."""
+        pid = os.getpid()
+        trace = {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": name.split(".")[0],
+                    "ph": "X",
+                    "ts": start / 1e3,
+                    "dur": duration / 1e3,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, duration, tid in self.events
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+
+
+class PatchOnImport(importlib.abc.MetaPathFinder):
+    """
+    Import hook that hands each module with pending targets to the
+    profiler once it has run, before anything importing it sees its names.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, name, path, target=None):
+        if name not in self.profiler.pending:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None:
+            spec.loader = PatchingLoader(spec.loader, self.profiler.patch_module)
+        return spec
+
+
+class PatchingLoader(importlib.abc.Loader):
+    def __init__(self, loader, patch_module):
+        self.loader = loader
+        self.patch_module = patch_module
+
+    def __getattr__(self, name):
+        # get_source and the like, for tracebacks
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.loader.exec_module(module)
+        self.patch_module(module)
+
+
+def pop_profile_option(argv):
+    """Split --profile or --profile=FILE out of argv, which may hold either."""
+    target = None
+    rest = []
+    for arg in argv:
+        if arg == "--profile":
+            target = "-"
+        elif arg.startswith("--profile="):
+            target = arg.split("=", 1)[1] or "-"
+        else:
+            rest.append(arg)
+    return target, rest
+
+
+def run_profiled(target, func):
+    """
+    Run func with every stage timed, then print a breakdown to stderr, or
+    write a Chrome trace when target is a file name.
+    """
+    profiler = Profiler()
+    profiler.install()
+    start = time.perf_counter_ns()
+    try:
+        with profiler.stage("total"):
+            func()
+    finally:
+        wall_ns = time.perf_counter_ns() - start
+        profiler.uninstall()
+        if target == "-":
+            for line in profiler.format_summary(wall_ns):
+                print(line, file=sys.stderr)
+        else:
+            profiler.write_trace(target)
+            print(f"Wrote profile trace to {target}", file=sys.stderr)
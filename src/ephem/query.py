@@ -0,0 +1,217 @@
+import re
+from ephem.constants import OBJECTS, SIGNS
+
+# bodies stored in chart_positions, by the names a query may use
+BODIES = {
+    "sun": "ae",
+    "moon": "ag",
+    "mercury": "hg",
+    "venus": "cu",
+    "mars": "fe",
+    "jupiter": "sn",
+    "saturn": "pb",
+    "uranus": "ura",
+    "neptune": "nep",
+    "pluto": "plu",
+    "node": "true_node",
+    "true node": "true_node",
+    "mean node": "mean_node",
+}
+BODIES.update({key: key for key in BODIES.values()})
+
+# sign sets a query can name: each sign by name or abbreviation, and each
+# triplicity and quadruplicity as SIGNS records them
+SIGN_SETS = {}
+for index, sign in enumerate(SIGNS.values()):
+    SIGN_SETS[sign.name.lower()] = [index]
+    SIGN_SETS[sign.trunc.lower()] = [index]
+    SIGN_SETS.setdefault(sign.trip, []).append(index)
+    SIGN_SETS.setdefault(sign.quad, []).append(index)
+
+RETROGRADE = {"rx": 1, "retrograde": 1, "direct": 0}
+
+# degrees added to each side of a sidereal prefilter range, to cover
+# nutation and rounding in the ayanamsa bounds
+AYANAMSA_MARGIN = 0.1
+
+TOKEN = re.compile(r"[()]|[^\s()]+")
+
+
+class Query:
+    """
+    A placement query such as "sun in aries and moon in water and mars rx",
+    compiled to a SQL condition on the charts table. Terms combine with
+    `and`, `or`, `not` and parentheses.
+
+    For a sidereal offset, the stored tropical longitudes are shifted by
+    each chart's ayanamsa. An index range over the widest ayanamsa in
+    ayanamsa_range picks out candidates, and sidereal_sign(longitude, jd),
+    which the caller registers, settles each one exactly.
+    """
+
+    def __init__(self, text, offset=None, ayanamsa_range=None):
+        self.offset = offset
+        self.ayanamsa_range = ayanamsa_range
+        self.tokens = TOKEN.findall(text.lower())
+        self.pos = 0
+        if not self.tokens:
+            raise ValueError("Empty query")
+
+        self.sql, self.params = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.pos]}'")
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError("Query ends too early")
+        self.pos += 1
+        return token
+
+    def parse_or(self):
+        sql, params = self.parse_and()
+        while self.peek() == "or":
+            self.take()
+            right, right_params = self.parse_and()
+            sql, params = f"({sql} OR {right})", params + right_params
+        return sql, params
+
+    def parse_and(self):
+        sql, params = self.parse_not()
+        while self.peek() == "and":
+            self.take()
+            right, right_params = self.parse_not()
+            sql, params = f"({sql} AND {right})", params + right_params
+        return sql, params
+
+    def parse_not(self):
+        if self.peek() == "not":
+            self.take()
+            sql, params = self.parse_not()
+            return f"NOT {sql}", params
+        return self.parse_term()
+
+    def parse_term(self):
+        if self.peek() == "(":
+            self.take()
+            sql, params = self.parse_or()
+            if self.take() != ")":
+                raise ValueError("Missing ')'")
+            return sql, params
+
+        body = self.parse_body()
+        token = self.take()
+        if token in RETROGRADE:
+            return position_condition("rx = ?", [body, RETROGRADE[token]])
+        if token != "in":
+            raise ValueError(
+                f"Expected 'in', 'rx' or 'direct' after a body, got '{token}'"
+            )
+
+        target = self.take()
+        if target not in SIGN_SETS:
+            groups = ", ".join(
+                name for name, signs in SIGN_SETS.items() if len(signs) > 1
+            )
+            raise ValueError(
+                f"Unknown sign, element or modality '{target}'; "
+                f"after 'in' use a sign or one of: {groups}"
+            )
+        return self.sign_condition(body, SIGN_SETS[target])
+
+    def parse_body(self):
+        token = self.take()
+        # two-word names such as "mean node"
+        pair = f"{token} {self.peek()}"
+        if pair in BODIES:
+            self.take()
+            return BODIES[pair]
+        if token not in BODIES:
+            keys = dict.fromkeys(BODIES.values())
+            names = ", ".join(OBJECTS[key].name.lower() for key in keys)
+            raise ValueError(f"Unknown body '{token}'; try one of: {names}")
+        return BODIES[token]
+
+    def sign_condition(self, body, signs):
+        marks = ", ".join("?" * len(signs))
+        if self.offset is None:
+            return position_condition(f"sign IN ({marks})", [body, *signs])
+
+        low, high = self.ayanamsa_range
+        spread = high - low + 2 * AYANAMSA_MARGIN
+        candidates, certain = [], []
+        for sign in signs:
+            start = sign * 30 + low - AYANAMSA_MARGIN
+            candidates += wrapped_ranges(start % 360, 30 + spread)
+            # away from the sign's edges every ayanamsa in range agrees
+            if spread < 30:
+                certain += wrapped_ranges((start + spread) % 360, 30 - spread)
+
+        params = [body]
+        for ranges in (candidates, certain):
+            params += [bound for r in ranges for bound in r]
+        params += signs
+        return position_condition(
+            f"({between(candidates)}) AND "
+            f"({between(certain)} OR sidereal_sign(longitude, jd) IN ({marks}))",
+            params,
+        )
+
+
+def position_condition(condition, params):
+    return (
+        "id IN (SELECT chart_id FROM chart_positions "
+        f"WHERE body = ? AND {condition})",
+        params,
+    )
+
+
+def between(ranges):
+    return " OR ".join(["longitude BETWEEN ? AND ?"] * len(ranges)) or "0"
+
+
+def wrapped_ranges(start, width):
+    """Split an arc starting at start into ranges that don't cross 0°."""
+    if width >= 360:
+        return [(0.0, 360.0)]
+    end = start + width
+    if end <= 360:
+        return [(start, end)]
+    return [(start, 360.0), (0.0, end - 360)]
+
+
+def sidereal_sign_function(offset):
+    """sidereal_sign(longitude, jd) for SQLite, with offset fixed."""
+    from ephem.sweph.ayanamsas import get_ayanamsa
+
+    def sidereal_sign(longitude, jd):
+        return int((longitude - get_ayanamsa(jd, offset)) % 360 // 30)
+
+    return sidereal_sign
+
+
+def query_charts(text, offset=None, limit=None):
+    """Yield the saved charts matching a placement query, in ID order."""
+    from ephem import db
+    from ephem.sweph.ayanamsas import get_ayanamsa
+
+    ayanamsa_range = None
+    if offset is not None:
+        # with nothing indexed any range will do; no row can match
+        jd_range = db.position_jd_range() or (2451545.0, 2451545.0)
+        ayanamsas = [get_ayanamsa(jd, offset) for jd in jd_range]
+        ayanamsa_range = (min(ayanamsas), max(ayanamsas))
+        db.get_connection().create_function(
+            "sidereal_sign", 2, sidereal_sign_function(offset), deterministic=True
+        )
+
+    query = Query(text, offset, ayanamsa_range)
+    # charts with no stored positions match nothing, even under `not`
+    where = (
+        f"{query.sql} AND EXISTS "
+        "(SELECT 1 FROM chart_positions WHERE chart_id = charts.id)"
+    )
+    yield from db.find_charts(where, query.params, limit)
@@ -0,0 +1,195 @@
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# subcommands a client may hand to the daemon with the "run" op
+RUN_COMMANDS = ("now", "cast", "cal")
+
+# terminal settings rich reads from the environment
+TERMINAL_ENV = ("TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR", "COLUMNS")
+
+
+@contextmanager
+def client_terminal(tty=False, columns=None, env=None):
+    """
+    Make rich render for the client's terminal rather than the daemon's,
+    which usually has no terminal at all.
+    """
+    from ephem.display.chart import get_console
+
+    env = {key: value for key, value in (env or {}).items() if key in TERMINAL_ENV}
+    env.pop("FORCE_COLOR", None)
+    if tty:
+        env["FORCE_COLOR"] = "1"
+    if columns:
+        env["COLUMNS"] = str(columns)
+
+    saved = {key: os.environ.get(key) for key in TERMINAL_ENV}
+    for key in TERMINAL_ENV:
+        os.environ.pop(key, None)
+    os.environ.update(env)
+    get_console.cache_clear()
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        get_console.cache_clear()
+
+
+def run_command(argv, tty=False, columns=None, env=None):
+    """Run an `ephem` subcommand in-process and capture what it prints."""
+    from ephem.cli import dispatch, parse_arguments
+
+    if not argv or argv[0] not in RUN_COMMANDS:
+        raise ValueError(f"The daemon only runs {', '.join(RUN_COMMANDS)}")
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    with (
+        client_terminal(tty, columns, env),
+        redirect_stdout(stdout),
+        redirect_stderr(stderr),
+    ):
+        try:
+            dispatch(parse_arguments(argv))
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+
+    return {"exit": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def parse_offset(value):
+    """A single ayanamsa index from a request field; empty means tropical."""
+    from ephem.cli import offset_type
+
+    if value is None or value == "":
+        return None
+    try:
+        offset = offset_type(str(value))
+    except argparse.ArgumentTypeError as e:
+        raise ValueError(str(e))
+    if offset == "all":
+        raise ValueError("Requests take a single offset, not 'all'")
+    return offset
+
+
+def chart(request):
+    """Cast one chart from request fields; a missing date means now."""
+    from ephem.commands.cast_batch import cast_fields
+
+    row = dict(request)
+    if not row.get("date"):
+        tz = ZoneInfo(row.get("tz") or "UTC")
+        moment = datetime.now(tz)
+        row["date"] = moment.strftime("%Y-%m-%d")
+        row["time"] = moment.strftime("%H:%M:%S")
+
+    return {"chart": cast_fields(row, parse_offset(row.get("offset")))}
+
+
+def handle_request(request):
+    from ephem.commands.cast_batch import CHART_ERRORS, error_message
+
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "Expected a JSON object"}
+
+    op = request.get("op")
+    try:
+        if op == "ping":
+            result = {"pid": os.getpid()}
+        elif op == "chart":
+            result = chart(request)
+        elif op == "run":
+            result = run_command(
+                request.get("argv") or [],
+                request.get("tty", False),
+                request.get("columns"),
+                request.get("env"),
+            )
+        else:
+            return {"ok": False, "error": f"Unknown op: {op!r}"}
+    except CHART_ERRORS as e:
+        return {"ok": False, "error": error_message(e)}
+    except Exception as e:  # keep the daemon alive for the next client
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    return {"ok": True, **result}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = handle_request(json.loads(line))
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Invalid JSON: {e.msg}"}
+
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+            self.wfile.flush()
+
+
+class ChartServer(socketserver.UnixStreamServer):
+    """
+    Serves requests one at a time. Chart work is CPU-bound and the sidereal
+    mode is process state, so a single thread is both fastest and safe.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        remove_stale_socket(self.path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(self.path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise ValueError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def warm_up():
+    """Import the chart pipeline and load the ephemeris before the first client."""
+    from ephem import db  # noqa: F401
+    from ephem.commands import cal, cast, now  # noqa: F401
+    from ephem.config import load_config_defaults
+    from ephem.display.chart import get_console
+
+    chart({})
+    get_console()
+    load_config_defaults()
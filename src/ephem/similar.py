@@ -0,0 +1,181 @@
+import json
+import os
+import struct
+import numpy as np
+from ephem.db import (
+    get_similar_path,
+    position_chart_checksum,
+    position_chart_ids,
+)
+from ephem.sweph.stored import BODIES, load_longitudes
+
+MAGIC = b"EPHSIM01"
+
+# one record per chart: its ID, 0 once deleted, and the cosines then
+# sines of its body longitudes
+RECORD = np.dtype([("id", "<i8"), ("features", "<f4", (2 * len(BODIES),))])
+
+
+def embed(lngs):
+    """
+    Map (n, bodies) longitudes onto the unit circle, so that the distance
+    between two rows grows with how far apart each body is, the short
+    way round the zodiac.
+    """
+    radians = np.radians(np.asarray(lngs, dtype=np.float64))
+    return np.hstack([np.cos(radians), np.sin(radians)]).astype(np.float32)
+
+
+def read_header(f):
+    """Return where the records start, or None for a stale or foreign file."""
+    if f.read(len(MAGIC)) != MAGIC:
+        return None
+    (header_len,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(header_len))
+    if header["bodies"] != BODIES:
+        return None
+    return len(MAGIC) + 4 + header_len
+
+
+def read_index(path=None):
+    """The index records, or None when there is no usable index file."""
+    path = path or get_similar_path()
+    try:
+        with open(path, "rb") as f:
+            offset = read_header(f)
+    except (OSError, ValueError, struct.error):
+        return None
+    if offset is None:
+        return None
+
+    count = (os.path.getsize(path) - offset) // RECORD.itemsize
+    if not count:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", offset=offset, shape=(count,))
+
+
+def write_index(path, records):
+    header = json.dumps({"bodies": BODIES}).encode()
+    # pad so the records start 8-byte aligned for memmap
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+    # written aside and renamed, so readers never see half a file
+    partial = path.with_name(path.name + ".tmp")
+    with open(partial, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(records.tobytes())
+    os.replace(partial, path)
+
+
+def make_records(ids, lngs):
+    records = np.zeros(len(ids), dtype=RECORD)
+    records["id"] = ids
+    records["features"] = embed(lngs)
+    return records
+
+
+def build_index(path=None):
+    """Embed every chart with stored positions and write a fresh index."""
+    path = path or get_similar_path()
+    write_index(path, make_records(*load_longitudes(BODIES)))
+    return read_index(path)
+
+
+def update_index(removed=()):
+    """
+    Mark removed chart IDs as deleted and append charts saved since the
+    index was last written. Any failure leaves the index for load_index
+    to repair.
+    """
+    path = get_similar_path()
+    records = read_index(path)
+    if records is None:
+        return
+
+    try:
+        rows = np.flatnonzero(np.isin(records["id"], removed)) if removed else []
+        # records are written in ID order, so the last is usually the newest
+        ids = records["id"]
+        last_id = int(ids[-1] if len(ids) and ids[-1] else ids.max(initial=0))
+        added = make_records(*load_longitudes(BODIES, last_id))
+        offset = records.offset if len(records) else os.path.getsize(path)
+        with open(path, "r+b") as f:
+            for row in rows:
+                f.seek(offset + int(row) * RECORD.itemsize)
+                f.write(struct.pack("<q", 0))
+            f.seek(0, os.SEEK_END)
+            f.write(added.tobytes())
+    except OSError:
+        pass
+
+
+def checksum(ids):
+    """(count, sum, sum of squares), as position_chart_checksum gives it."""
+    ids = ids.astype(np.int64)
+    return (len(ids), int(ids.sum()), int((ids * ids).sum()))
+
+
+def load_index():
+    """
+    Return the index records, in step with the stored positions. The
+    index is built the first time, kept current by add_chart,
+    add_charts and delete_chart, and repaired here after any change
+    made around them, such as a backfill.
+    """
+    path = get_similar_path()
+    records = read_index(path)
+    if records is None:
+        return build_index(path)
+
+    expected = position_chart_checksum()
+    live = records["id"][records["id"] > 0]
+    if checksum(live) != expected:
+        stored = np.array(position_chart_ids(), dtype=np.int64)
+        missing = np.setdiff1d(stored, live)
+        # update_index only appends charts newer than the last indexed one
+        if len(missing) and missing.min() <= live.max(initial=0):
+            return build_index(path)
+        update_index(np.setdiff1d(live, stored).tolist())
+        records = read_index(path)
+        live = records["id"][records["id"] > 0]
+        if checksum(live) != expected:
+            return build_index(path)
+
+    # drop deleted records once they outnumber live ones
+    if len(live) * 2 < len(records):
+        write_index(path, np.array(records[records["id"] > 0]))
+        records = read_index(path)
+    return records
+
+
+def similar_charts(chart_id, k=10):
+    """
+    The k charts whose planets sit closest to those of chart_id, as
+    (chart ID, similarity) pairs, most similar first. Similarity is the
+    mean over bodies of (1 + cos(separation)) / 2: 1 when every body
+    matches, 0 when every one is opposed.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}.")
+    records = load_index()
+    ids = np.asarray(records["id"])
+    (rows,) = np.nonzero(ids == chart_id)
+    if not len(rows):
+        raise ValueError(
+            f"No stored positions for chart {chart_id}. "
+            "Check the ID, or run `ephem data backfill`."
+        )
+
+    features = np.asarray(records["features"])
+    closeness = features @ features[rows[0]]
+    closeness[(ids <= 0) | (ids == chart_id)] = -np.inf
+
+    k = min(k, int(np.count_nonzero(ids > 0)) - 1)
+    if k <= 0:
+        return []
+    nearest = np.argpartition(-closeness, k - 1)[:k]
+    nearest = nearest[np.argsort(-closeness[nearest], kind="stable")]
+    similarity = 0.5 + closeness[nearest] / (2 * len(BODIES))
+    return list(zip(ids[nearest].tolist(), similarity.tolist()))
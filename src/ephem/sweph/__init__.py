@@ -2,10 +2,25 @@ from .julian import get_julian_days
 from .planets import get_planets
 from .angles import get_angles
 from .fortuna import get_pars_fortunae
-from .core import build_horoscope
+from .core import build_horoscope, cast_horoscope
+from .sidereal import get_sidereal_horoscopes
 
-__all__ = ["get_julian_days"]
-__all__ = ["get_planets"]
-__all__ = ["get_angles"]
-__all__ = ["get_pars_fortunae"]
-__all__ = ["build_horoscope"]
+__all__ = [
+    "get_julian_days",
+    "get_planets",
+    "get_planets_batch",
+    "get_angles",
+    "get_pars_fortunae",
+    "build_horoscope",
+    "cast_horoscope",
+    "get_sidereal_horoscopes",
+]
+
+
+def __getattr__(name):
+    # batch work needs numpy, which single charts never load
+    if name == "get_planets_batch":
+        from .batch import get_planets_batch
+
+        return get_planets_batch
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
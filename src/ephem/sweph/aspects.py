@@ -0,0 +1,159 @@
+import numpy as np
+from ephem.constants import ASPECTS
+from ephem.models import AspectMatch
+from .search import wrap_degrees
+
+NO_ASPECT = -1
+
+
+def get_aspect_table(aspects=None, orbs=None):
+    """
+    Resolve an aspect set and orb overrides into parallel arrays.
+    `aspects` is a list of ASPECTS keys, `orbs` maps keys to degrees.
+    """
+    keys = list(aspects) if aspects is not None else list(ASPECTS)
+    orbs = orbs or {}
+    for key in keys:
+        if key not in ASPECTS:
+            raise ValueError(f"Unknown aspect: {key}")
+
+    angles = np.array([ASPECTS[k].angle for k in keys], dtype=np.float64)
+    orb_values = np.array([orbs.get(k, ASPECTS[k].orb) for k in keys], dtype=np.float64)
+    return keys, angles, orb_values
+
+
+def separation_matrix(lngs, others=None):
+    """
+    Signed separation from every body to every other, wrapped to
+    [-180, 180). Inputs are (..., n) and (..., m) arrays, so a stack of
+    charts yields a (..., n, m) stack of matrices in one pass.
+    """
+    lngs = np.asarray(lngs, dtype=np.float64)
+    others = lngs if others is None else np.asarray(others, dtype=np.float64)
+    return wrap_degrees(others[..., None, :] - lngs[..., :, None])
+
+
+def aspect_matrix(
+    lngs, speeds=None, others=None, other_speeds=None, aspects=None, orbs=None
+):
+    """
+    Find the closest aspect within orb for every pair of bodies.
+
+    Returns (kinds, deviation, applying), each shaped (..., n, m):
+    kinds indexes into the resolved aspect keys (NO_ASPECT where nothing
+    is in orb), deviation is the distance from exact in degrees, and
+    applying is True where the pair is moving towards exactness. Pairs
+    without speeds (NaN) are never applying.
+    """
+    keys, angles, orb_values = get_aspect_table(aspects, orbs)
+
+    delta = separation_matrix(lngs, others)
+    separation = np.abs(delta)
+
+    offsets = separation[..., None] - angles  # (..., n, m, k)
+    deviation = np.abs(offsets)
+    in_orb = deviation <= orb_values
+
+    closest = np.where(in_orb, deviation, np.inf).argmin(axis=-1)
+    kinds = np.where(in_orb.any(axis=-1), closest, NO_ASPECT)
+    best_offset = np.take_along_axis(offsets, closest[..., None], axis=-1)[..., 0]
+
+    if speeds is None:
+        applying = np.zeros(kinds.shape, dtype=bool)
+    else:
+        speeds = np.asarray(speeds, dtype=np.float64)
+        if other_speeds is not None:
+            other_speeds = np.asarray(other_speeds, dtype=np.float64)
+        elif others is None:
+            other_speeds = speeds
+        else:
+            other_speeds = np.full(np.shape(others), np.nan)
+        # rate at which the unsigned separation grows
+        relative = other_speeds[..., None, :] - speeds[..., :, None]
+        widening = np.sign(delta) * relative
+        with np.errstate(invalid="ignore"):
+            applying = (best_offset * widening < 0) & (kinds != NO_ASPECT)
+
+    return kinds, np.abs(best_offset), applying
+
+
+def count_aspects(lngs, others=None, aspects=None, orbs=None):
+    """
+    Number of aspected pairs per chart. For a single set of longitudes
+    each unordered pair is counted once; against `others` every cross
+    pair counts.
+    """
+    kinds, _, _ = aspect_matrix(lngs, others=others, aspects=aspects, orbs=orbs)
+    hits = kinds != NO_ASPECT
+    if others is None:
+        n = hits.shape[-1]
+        hits = hits & np.triu(np.ones((n, n), dtype=bool), k=1)
+    return hits.sum(axis=(-2, -1))
+
+
+def synastry_scores(lngs, others, aspects=None, orbs=None):
+    """
+    Compare every chart in one stack with every chart in another.
+
+    lngs is (n, b) and others is (m, c), one row of body longitudes per
+    chart. Returns (counts, scores), each (n, m): how many body pairs
+    between the two charts are within orb of an aspect, and the sum of
+    their tightness, 1 when exact and 0 at the edge of the orb. Working
+    memory is O(n * m * b * c), so callers tile large stacks.
+    """
+    _, angles, orb_values = get_aspect_table(aspects, orbs)
+
+    # float32 and in-place passes: this runs over billions of body pairs
+    lngs = np.asarray(lngs, dtype=np.float32)
+    others = np.asarray(others, dtype=np.float32)
+    separation = others[None, :, None, :] - lngs[:, None, :, None]
+    np.abs(separation, out=separation)
+    np.minimum(separation, 360 - separation, out=separation)
+
+    n, m = separation.shape[:2]
+    counts = np.zeros((n, m), dtype=np.int32)
+    scores = np.zeros((n, m), dtype=np.float64)
+    tightness = np.empty_like(separation)
+    for angle, orb in zip(angles, orb_values):
+        # 1 - |separation - angle| / orb, floored at 0 outside the orb
+        np.subtract(separation, np.float32(angle), out=tightness)
+        np.abs(tightness, out=tightness)
+        np.multiply(tightness, np.float32(-1 / orb), out=tightness)
+        tightness += 1
+        np.maximum(tightness, 0, out=tightness)
+        counts += np.count_nonzero(tightness.reshape(n, m, -1), axis=-1)
+        scores += tightness.sum(axis=(-2, -1), dtype=np.float64)
+
+    return counts, scores
+
+
+def get_aspects(horoscope, aspects=None, orbs=None, keys=None):
+    """List the aspects between the positions of one horoscope dict."""
+    if keys is None:
+        keys = list(horoscope)
+
+    aspect_keys, _, _ = get_aspect_table(aspects, orbs)
+    positions = [horoscope[k] for k in keys]
+    lngs = np.array([p.lng for p in positions])
+    speeds = np.array(
+        [np.nan if p.speed is None else p.speed for p in positions], dtype=np.float64
+    )
+
+    kinds, deviation, applying = aspect_matrix(lngs, speeds, aspects=aspects, orbs=orbs)
+
+    matches = []
+    for i, j in zip(*np.triu_indices(len(keys), k=1)):
+        if kinds[i, j] == NO_ASPECT:
+            continue
+        has_speeds = positions[i].speed is not None and positions[j].speed is not None
+        matches.append(
+            AspectMatch(
+                first=positions[i],
+                second=positions[j],
+                aspect=ASPECTS[aspect_keys[kinds[i, j]]],
+                orb=float(deviation[i, j]),
+                applying=bool(applying[i, j]) if has_speeds else None,
+            )
+        )
+
+    return matches
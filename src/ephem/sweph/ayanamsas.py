@@ -1,18 +1,63 @@
+import threading
+from contextlib import contextmanager
 import swisseph as swe
 from ephem.constants import AYANAMSAS
 
+# the sidereal mode is global to the Swiss Ephemeris, so it must not change
+# between setting it and the calculations that rely on it
+SID_MODE_LOCK = threading.RLock()
+
+
+def get_sid_mode(offset):
+    try:
+        return list(AYANAMSAS.values())[offset]
+    except IndexError:
+        raise ValueError(f"Sidereal offset index out of range: {offset}")
+
 
 def get_calc_flag(offset):
+    """
+    Set the sidereal mode for offset and return the matching calc flag.
+    The mode stays set until the next call, so callers that may share the
+    process with other threads should use `ephemeris` instead.
+    """
     calc_flag = swe.FLG_SWIEPH
 
     if offset is None:
         return calc_flag
 
-    try:
-        sid_mode = list(AYANAMSAS.values())[offset]
-    except IndexError:
-        raise ValueError(f"Sidereal offset index out of range: {offset}")
-
-    swe.set_sid_mode(sid_mode, 0, 0)
+    swe.set_sid_mode(get_sid_mode(offset), 0, 0)
     calc_flag |= swe.FLG_SIDEREAL
     return calc_flag
+
+
+@contextmanager
+def ephemeris(offset=None):
+    """
+    Yield the calc flag for offset while holding the sidereal mode steady.
+    Sidereal blocks are serialized across threads; tropical calculations
+    do not read the sidereal mode and run without locking.
+    """
+    if offset is None:
+        yield swe.FLG_SWIEPH
+        return
+
+    with SID_MODE_LOCK:
+        yield get_calc_flag(offset)
+
+
+def get_ayanamsa(jd, offset):
+    """Ayanamsa in degrees, matching what FLG_SIDEREAL subtracts."""
+    with SID_MODE_LOCK:
+        get_calc_flag(offset)
+        return swe.get_ayanamsa_ex_ut(jd, swe.FLG_SWIEPH)[1]
+
+
+def get_all_ayanamsas(jd):
+    """Ayanamsa in degrees for every entry of AYANAMSAS, in index order."""
+    ayanamsas = []
+    with SID_MODE_LOCK:
+        for sid_mode in AYANAMSAS.values():
+            swe.set_sid_mode(sid_mode, 0, 0)
+            ayanamsas.append(swe.get_ayanamsa_ex_ut(jd, swe.FLG_SWIEPH)[1])
+    return ayanamsas
@@ -0,0 +1,92 @@
+import numpy as np
+import swisseph as swe
+from .ayanamsas import ephemeris, get_ayanamsa
+from .planets import PLANET_KEYS, make_position
+
+# one record per (julian day, body)
+POSITION_DTYPE = np.dtype(
+    [
+        ("lng", "f8"),
+        ("lat", "f8"),
+        ("dist", "f8"),
+        ("speed", "f8"),
+    ]
+)
+
+
+# each Swiss Ephemeris file covers 600 years, e.g. sepl_18.se1 1800-2400 CE
+FILE_SPAN = 600 * 365.25
+FILE_ORIGIN = 2378496.5  # 1800-01-01
+# dates this close to the end of a file are always left to calc_ut to place
+FILE_MARGIN = 30.0
+
+
+def file_span(jd):
+    """The ephemeris file covering jd, as a span index, or None near an end."""
+    span, day = divmod(jd - FILE_ORIGIN, FILE_SPAN)
+    if day < FILE_MARGIN or day > FILE_SPAN - FILE_MARGIN:
+        return None
+    return int(span)
+
+
+def get_planets_batch(jds, offset=None, keys=None, store=None):
+    """
+    Compute positions for many Julian days in one pass.
+
+    Returns a structured array of shape (len(jds), len(keys)) with
+    lng, lat, dist and speed fields; columns follow `keys`, which
+    defaults to PLANET_KEYS. With a ChebyshevStore, longitudes and speeds
+    are interpolated instead of calculated and lat/dist are NaN.
+    """
+    if keys is None:
+        keys = PLANET_KEYS
+
+    jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+
+    if store is not None:
+        out = store.batch(jds, keys)
+        if offset is not None:
+            ayanamsas = np.array([get_ayanamsa(jd, offset) for jd in jds.tolist()])
+            out["lng"] = (out["lng"] - ayanamsas[:, None]) % 360
+        return out
+
+    planet_ids = [PLANET_KEYS.index(obj_key) for obj_key in keys]
+    jd_list = jds.tolist()
+    with ephemeris(offset) as calc_flag:
+        calc_flag |= swe.FLG_SPEED
+        moshier = (calc_flag & ~swe.FLG_SWIEPH) | swe.FLG_MOSEPH
+        # The first calculation of a body within an ephemeris file tells
+        # whether that file is missing. The rest of the file's dates then
+        # ask for the Moshier ephemeris outright; calc_ut would otherwise
+        # look for the file on every call before falling back to it.
+        flags = {}
+        rows = []
+        # day by day, so the Swiss Ephemeris reuses what it caches per
+        # Julian day (nutation, the Earth's position) across the bodies
+        for jd in jd_list:
+            span = file_span(jd)
+            row = []
+            for planet_id in planet_ids:
+                flag = flags.get((span, planet_id), calc_flag)
+                # (values, returned flag), plus a message on a fallback
+                result = swe.calc_ut(jd, planet_id, flag)
+                if span is not None and (span, planet_id) not in flags:
+                    fallback = result[1] & swe.FLG_MOSEPH
+                    flags[span, planet_id] = moshier if fallback else calc_flag
+                row.append(result[0][:4])
+            rows.append(row)
+
+    values = np.array(rows, dtype=np.float64).reshape(len(jds), len(keys), 4)
+    out = values.view(POSITION_DTYPE)[..., 0]
+    return out
+
+
+def positions_from_batch(row, keys=None):
+    """Build Position objects for one row of a get_planets_batch result."""
+    if keys is None:
+        keys = PLANET_KEYS
+
+    return [
+        make_position(obj_key, record["lng"], speed=record["speed"])
+        for obj_key, record in zip(keys, row)
+    ]
@@ -0,0 +1,73 @@
+from calendar import monthrange
+from datetime import date
+import swisseph as swe
+from ephem.utils.year import validate_year
+from .batch import get_planets_batch, positions_from_batch
+from .core import build_horoscope
+from .planets import PLANET_KEYS
+from .search import STATION_KEYS
+
+
+def get_sidereal_time(jd):
+    gst = swe.sidtime(jd) % 24
+    total_seconds = int(round(gst * 3600))
+    hours = (total_seconds // 3600) % 24
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def get_station_changes(today, tomorrow):
+    """
+    Return (key, "SR" or "SD") for bodies whose speed changes sign between
+    two consecutive rows of a get_planets_batch result, i.e. that station
+    during the day.
+    """
+    changes = []
+    for key in STATION_KEYS:
+        col = PLANET_KEYS.index(key)
+        before = today[col]["speed"]
+        after = tomorrow[col]["speed"]
+
+        if before >= 0 > after:
+            changes.append((key, "SR"))
+        elif before < 0 <= after:
+            changes.append((key, "SD"))
+
+    return changes
+
+
+def get_calendar_rows(year, month, offset=None, store=None):
+    """
+    One dict per day of the month with its date, sidereal time at 0hr,
+    0hr positions, the noon Moon and the stations during the day.
+    """
+    validate_year(year)
+    days_in_month = monthrange(year, month)[1]
+
+    # one batched sweep for the whole month instead of per-day calls,
+    # plus the following midnight so stations on the last day show up
+    jd_midnights = [
+        swe.julday(year, month, day, 0.0) for day in range(1, days_in_month + 2)
+    ]
+    jd_noons = [jd + 0.5 for jd in jd_midnights[:-1]]
+    month_positions = get_planets_batch(jd_midnights, offset, store=store)
+    noon_moons = get_planets_batch(jd_noons, offset, keys=["ag"], store=store)
+
+    rows = []
+    for day in range(1, days_in_month + 1):
+        planets = positions_from_batch(month_positions[day - 1])
+        (noon_moon,) = positions_from_batch(noon_moons[day - 1], keys=["ag"])
+        rows.append(
+            {
+                "date": date(year, month, day),
+                "sidereal_time": get_sidereal_time(jd_midnights[day - 1]),
+                "positions": build_horoscope(planets, [], []),
+                "noon_moon": noon_moon,
+                "stations": get_station_changes(
+                    month_positions[day - 1], month_positions[day]
+                ),
+            }
+        )
+
+    return rows
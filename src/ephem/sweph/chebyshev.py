@@ -0,0 +1,170 @@
+import json
+import struct
+import numpy as np
+from ephem.db import get_db_path
+from .batch import POSITION_DTYPE, get_planets_batch
+from .planets import PLANET_KEYS
+
+MAGIC = b"EPHCHEB1"
+
+# (days per segment, coefficients per segment), sized so that every body
+# stays within 1 arcsecond of swe.calc_ut while more than 5° from the Sun.
+# Closer in, the light-deflection correction changes faster than any
+# segment can follow; over 1900–2100 the worst error there is 7 arcseconds.
+SEGMENTS = {
+    "ae": (32, 14),
+    "ag": (8, 16),
+    "hg": (8, 16),
+    "cu": (16, 16),
+    "fe": (16, 14),
+    "sn": (32, 14),
+    "pb": (32, 14),
+    "ura": (32, 12),
+    "nep": (32, 12),
+    "plu": (32, 12),
+    "mean_node": (64, 10),
+    "true_node": (8, 16),
+}
+
+
+def get_store_path():
+    return get_db_path().parent / "ephem.cheb"
+
+
+def fit_body(obj_key, jd_start, n_segments):
+    """Fit tropical longitude of one body over consecutive segments."""
+    span, n_coeffs = SEGMENTS[obj_key]
+
+    # sample each segment at its Chebyshev nodes
+    k = np.arange(n_coeffs)
+    theta = np.pi * (k + 0.5) / n_coeffs
+    seg_starts = jd_start + np.arange(n_segments) * span
+    jds = seg_starts[:, None] + (np.cos(theta)[None, :] + 1) * span / 2
+
+    samples = get_planets_batch(jds.ravel(), keys=[obj_key])["lng"]
+    samples = np.unwrap(samples.reshape(n_segments, n_coeffs), period=360, axis=1)
+
+    coeffs = samples @ np.cos(np.outer(theta, k)) * (2 / n_coeffs)
+    coeffs[:, 0] /= 2
+    return coeffs
+
+
+def write_store(path, jd_start, jd_end, keys=None, progress=None):
+    if keys is None:
+        keys = PLANET_KEYS
+
+    bodies = []
+    blocks = []
+    data_offset = 0
+    for obj_key in keys:
+        span, n_coeffs = SEGMENTS[obj_key]
+        n_segments = int(np.ceil((jd_end - jd_start) / span))
+        if progress:
+            progress(obj_key, n_segments)
+
+        coeffs = fit_body(obj_key, jd_start, n_segments)
+        blocks.append(coeffs)
+        bodies.append(
+            {
+                "key": obj_key,
+                "span": span,
+                "n_coeffs": n_coeffs,
+                "n_segments": n_segments,
+                "offset": data_offset,
+            }
+        )
+        data_offset += coeffs.size
+
+    header = json.dumps(
+        {"jd_start": jd_start, "jd_end": jd_end, "bodies": bodies}
+    ).encode()
+    # pad so the coefficient block starts 8-byte aligned for memmap
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for coeffs in blocks:
+            f.write(np.ascontiguousarray(coeffs, dtype="<f8").tobytes())
+
+    return path
+
+
+def chebval_rows(coeffs, t):
+    """Clenshaw evaluation where every t has its own coefficient row."""
+    b1 = np.zeros_like(t)
+    b2 = np.zeros_like(t)
+    for j in range(coeffs.shape[1] - 1, 0, -1):
+        b1, b2 = 2 * t * b1 - b2 + coeffs[:, j], b1
+    return t * b1 - b2 + coeffs[:, 0]
+
+
+class ChebyshevStore:
+    def __init__(self, path=None):
+        self.path = path or get_store_path()
+        if not self.path.exists():
+            raise ValueError(
+                f"No precomputed ephemeris at {self.path}. Run `ephem precompute` first."
+            )
+
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a precomputed ephemeris file: {self.path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+
+        self.jd_start = header["jd_start"]
+        self.jd_end = header["jd_end"]
+        self.bodies = {body["key"]: body for body in header["bodies"]}
+        self.data = np.memmap(
+            self.path, dtype="<f8", mode="r", offset=len(MAGIC) + 4 + header_len
+        )
+
+    def coefficients(self, obj_key):
+        body = self.bodies[obj_key]
+        size = body["n_segments"] * body["n_coeffs"]
+        block = self.data[body["offset"] : body["offset"] + size]
+        return block.reshape(body["n_segments"], body["n_coeffs"]), body["span"]
+
+    def longitudes(self, obj_key, jds):
+        """Return (longitude, speed) arrays for one body."""
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        if jds.min() < self.jd_start or jds.max() > self.jd_end:
+            raise ValueError(
+                f"Julian day outside precomputed range {self.jd_start}–{self.jd_end}"
+            )
+
+        coeffs, span = self.coefficients(obj_key)
+        seg = np.minimum(((jds - self.jd_start) // span).astype(int), len(coeffs) - 1)
+        rows = coeffs[seg]
+        t = 2 * (jds - self.jd_start - seg * span) / span - 1
+
+        lng = chebval_rows(rows, t) % 360
+        speed = chebval_rows(np.polynomial.chebyshev.chebder(rows, axis=1), t)
+        return lng, speed * 2 / span
+
+    def batch(self, jds, keys=None):
+        """Same layout as get_planets_batch; lat and dist are not stored."""
+        if keys is None:
+            keys = PLANET_KEYS
+
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        out = np.empty((len(jds), len(keys)), dtype=POSITION_DTYPE)
+        out["lat"] = np.nan
+        out["dist"] = np.nan
+        for col, obj_key in enumerate(keys):
+            out["lng"][:, col], out["speed"][:, col] = self.longitudes(obj_key, jds)
+        return out
+
+    def validate(self, n_samples=2000, seed=0):
+        """Worst-case longitude error in arcseconds per body against calc_ut."""
+        rng = np.random.default_rng(seed)
+        jds = rng.uniform(self.jd_start, self.jd_end, n_samples)
+        keys = list(self.bodies)
+
+        stored = self.batch(jds, keys)["lng"]
+        truth = get_planets_batch(jds, keys=keys)["lng"]
+        diff = np.abs((stored - truth + 180) % 360 - 180) * 3600
+        return dict(zip(keys, diff.max(axis=0).tolist()))
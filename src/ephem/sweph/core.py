@@ -1,3 +1,8 @@
+from .angles import get_angles
+from .fortuna import get_pars_fortunae
+from .planets import get_planets
+
+
 def build_horoscope(planets, angles, part_of_fortune):
     horoscope = {}
     all_positions = planets + angles + part_of_fortune
@@ -6,3 +11,14 @@ def build_horoscope(planets, angles, part_of_fortune):
         horoscope[position.obj.key] = position
 
     return horoscope
+
+
+def cast_horoscope(jd_now, lat=None, lng=None, offset=None):
+    """Planets for a moment, plus angles and part of fortune if the place is known."""
+    planets = get_planets(jd_now, offset)
+    if lat is None or lng is None:
+        return build_horoscope(planets, [], [])
+
+    angles = get_angles(jd_now, lat, lng, offset)
+    part_of_fortune = get_pars_fortunae(angles, planets)
+    return build_horoscope(planets, angles, part_of_fortune)
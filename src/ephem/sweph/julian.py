@@ -1,6 +1,7 @@
 from datetime import datetime, timezone, timedelta
 import re
 import swisseph as swe
+from ephem.utils.year import validate_year
 
 
 def parse_shift_to_timedelta(shift_str):
@@ -42,9 +43,19 @@ def get_julian_days(dt_utc, args):
         dt_shifted.minute,
         dt_shifted.second + dt_shifted.microsecond / 1000000.0,
     )[1]
-    jd_then = jd_now - (1 / 1440)
 
-    return jd_now, jd_then, dt_shifted  # return shifted datetime for display too
+    return jd_now, dt_shifted  # return shifted datetime for display too
+
+
+def date_to_jd(date_str):
+    try:
+        year, month, day = map(int, date_str.split("-"))
+        datetime(year, month, day)
+    except ValueError:
+        raise ValueError(f"Date must be in YYYY-MM-DD format, got '{date_str}'")
+
+    validate_year(year)
+    return swe.julday(year, month, day, 0.0)
 
 
 def jd_to_datetime(jd_now):
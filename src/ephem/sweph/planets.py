@@ -2,7 +2,7 @@ import swisseph as swe
 from ephem.utils.signs import sign_from_index
 from ephem.constants import OBJECTS, SIGNS
 from ephem.models import Position
-from .ayanamsas import get_calc_flag
+from .ayanamsas import ephemeris
 
 PLANET_KEYS = [
     "ae",
@@ -19,28 +19,82 @@ PLANET_KEYS = [
     "true_node",
 ]
 
+# mean daily motion in degrees, used to decide when a body is stationary
+MEAN_SPEEDS = {
+    "ae": 0.9856,
+    "ag": 13.1764,
+    "hg": 0.9856,
+    "cu": 0.9856,
+    "fe": 0.5240,
+    "sn": 0.0831,
+    "pb": 0.0335,
+    "ura": 0.0117,
+    "nep": 0.0060,
+    "plu": 0.0040,
+    "mean_node": 0.0530,
+    "true_node": 0.0530,
+}
 
-def get_planets(jd_now, jd_then, offset=None):
-    calc_flag = get_calc_flag(offset)
-    positions = []
+STATION_RATIO = 0.05
+
+# upper bound on geocentric daily motion in degrees, with some margin
+MAX_SPEEDS = {
+    "ae": 1.03,
+    "ag": 15.5,
+    "hg": 2.25,
+    "cu": 1.27,
+    "fe": 0.8,
+    "sn": 0.25,
+    "pb": 0.14,
+    "ura": 0.07,
+    "nep": 0.045,
+    "plu": 0.045,
+    "mean_node": 0.055,
+    "true_node": 0.4,
+}
+
+
+def make_position(obj_key, lng, speed=None):
+    lng = float(lng)
+    if speed is not None:
+        speed = float(speed)
+    dms = swe.split_deg(lng, 8)
+    sign_name, _ = sign_from_index(dms[4])
+
+    position = Position(
+        obj=OBJECTS[obj_key],
+        sign=SIGNS[sign_name],
+        deg=dms[0],
+        mnt=dms[1],
+        sec=dms[2],
+        rx=speed is not None and speed < 0,
+        speed=speed,
+    )
+    position.lng = lng
 
-    for planet_id, obj_key in enumerate(PLANET_KEYS):
-        dd_now = swe.calc_ut(jd_now, planet_id, calc_flag)[0][0]
-        dd_then = swe.calc_ut(jd_then, planet_id, calc_flag)[0][0]
-        dms = swe.split_deg(dd_now, 8)
+    return position
 
-        sign_name, _ = sign_from_index(dms[4])
 
-        position = Position(
-            obj=OBJECTS[obj_key],
-            sign=SIGNS[sign_name],
-            deg=dms[0],
-            mnt=dms[1],
-            sec=dms[2],
-            rx=dd_then > dd_now,
-        )
-        position.lng = dd_now
+def is_stationary(obj_key, speed):
+    if speed is None or obj_key not in MEAN_SPEEDS:
+        return False
+    return abs(speed) < MEAN_SPEEDS[obj_key] * STATION_RATIO
 
-        positions.append(position)
+
+def get_planets(jd_now, offset=None, store=None):
+    if store is not None:
+        from .batch import get_planets_batch, positions_from_batch
+
+        return positions_from_batch(get_planets_batch(jd_now, offset, store=store)[0])
+
+    with ephemeris(offset) as calc_flag:
+        results = [
+            swe.calc_ut(jd_now, planet_id, calc_flag | swe.FLG_SPEED)[0]
+            for planet_id in range(len(PLANET_KEYS))
+        ]
+
+    positions = []
+    for obj_key, xx in zip(PLANET_KEYS, results):
+        positions.append(make_position(obj_key, xx[0], speed=xx[3]))
 
     return positions
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .batch import POSITION_DTYPE, get_planets_batch
+from .planets import PLANET_KEYS
+
+# Julian days per task; large enough to amortize pickling, small enough to
+# spread one long series over every worker
+CHUNK_SIZE = 512
+
+
+def shard_by_offset(offsets):
+    """Map each distinct offset to the indices of the requests that use it."""
+    shards = {}
+    for index, offset in enumerate(offsets):
+        shards.setdefault(offset, []).append(index)
+    return shards
+
+
+class EphemerisPool:
+    """
+    Process pool for batch work across many ayanamsas. Every worker has its
+    own Swiss Ephemeris state, and every task covers a single offset, so no
+    two calculations ever share a sidereal mode.
+    """
+
+    def __init__(self, max_workers=None, chunk_size=CHUNK_SIZE):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.chunk_size = chunk_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def planets_batch(self, jds, offsets, keys=None):
+        """
+        Like get_planets_batch, but each Julian day carries its own offset.
+        `offsets` is a single offset for every row or one per row; rows come
+        back in input order.
+        """
+        if keys is None:
+            keys = PLANET_KEYS
+
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        if offsets is None or isinstance(offsets, int):
+            offsets = [offsets] * len(jds)
+        if len(offsets) != len(jds):
+            raise ValueError(
+                f"Got {len(offsets)} offsets for {len(jds)} Julian days"
+            )
+
+        tasks = []
+        for offset, indices in shard_by_offset(offsets).items():
+            indices = np.asarray(indices)
+            for start in range(0, len(indices), self.chunk_size):
+                chunk = indices[start : start + self.chunk_size]
+                future = self.executor.submit(
+                    get_planets_batch, jds[chunk], offset, keys
+                )
+                tasks.append((chunk, future))
+
+        out = np.empty((len(jds), len(keys)), dtype=POSITION_DTYPE)
+        for chunk, future in tasks:
+            out[chunk] = future.result()
+        return out
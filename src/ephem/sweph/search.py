@@ -0,0 +1,352 @@
+import numpy as np
+import swisseph as swe
+from .batch import get_planets_batch
+from .ayanamsas import ephemeris
+from .planets import PLANET_KEYS, MAX_SPEEDS
+
+EPSILON = np.finfo(float).eps
+
+# smallest step of the adaptive search, and the precision of bisection
+MIN_STEP = 1 / 1440
+BISECT_TOL = 1 / 86400
+
+STATION_KEYS = ["hg", "cu", "fe", "sn", "pb", "ura", "nep", "plu"]
+
+# sampling step in days, shorter than the briefest retrograde of each body
+STATION_STEPS = {
+    "hg": 5,
+    "cu": 10,
+    "fe": 10,
+    "sn": 20,
+    "pb": 20,
+    "ura": 20,
+    "nep": 20,
+    "plu": 20,
+}
+
+# sampling step in days for transit searches; short enough that no body
+# turns twice between samples and cubic interpolation lands within minutes
+TRANSIT_STEPS = {
+    "ae": 8,
+    "ag": 1,
+    "hg": 2,
+    "cu": 4,
+    "fe": 4,
+    "sn": 8,
+    "pb": 8,
+    "ura": 16,
+    "nep": 16,
+    "plu": 16,
+    "mean_node": 16,
+    "true_node": 0.5,
+}
+
+# days searched before results of a transit search are emitted
+TRANSIT_WINDOW = 365
+
+
+def brent(f, a, b, fa=None, fb=None, tol=1e-6, max_iter=100):
+    """Find a root of f in [a, b], where f(a) and f(b) differ in sign."""
+    fa = f(a) if fa is None else fa
+    fb = f(b) if fb is None else fb
+    if fa * fb > 0:
+        raise ValueError("Root is not bracketed")
+
+    c, fc = b, fb
+    d = e = b - a
+    for _ in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol1 = 2 * EPSILON * abs(b) + tol / 2
+        xm = (c - b) / 2
+        if abs(xm) <= tol1 or fb == 0:
+            return b
+
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            # inverse quadratic interpolation, or secant when a == c
+            s = fb / fa
+            if a == c:
+                p = 2 * xm * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * xm * q - abs(tol1 * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = xm
+        else:
+            d = e = xm
+
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else (tol1 if xm > 0 else -tol1)
+        fb = f(b)
+
+    return b
+
+
+def get_speed(jd, obj_key, calc_flag=swe.FLG_SWIEPH):
+    planet_id = PLANET_KEYS.index(obj_key)
+    return swe.calc_ut(jd, planet_id, calc_flag | swe.FLG_SPEED)[0][3]
+
+
+def find_stations(jd_start, jd_end, keys=None):
+    """
+    Return (jd, obj_key, direction) for every station between two Julian
+    days, where direction is "SR" (turning retrograde) or "SD" (turning
+    direct). Speed is sampled coarsely to bracket sign changes, and each
+    bracket is refined with Brent's method.
+    """
+    if keys is None:
+        keys = STATION_KEYS
+
+    stations = []
+    for obj_key in keys:
+        step = STATION_STEPS[obj_key]
+        jds = np.arange(jd_start, jd_end + step, step, dtype=np.float64)
+        jds[-1] = min(jds[-1], jd_end)
+        speeds = get_planets_batch(jds, keys=[obj_key])["speed"][:, 0]
+
+        changes = np.nonzero(np.signbit(speeds[:-1]) != np.signbit(speeds[1:]))[0]
+        for i in changes.tolist():
+            jd = brent(
+                lambda t: get_speed(t, obj_key),
+                jds[i],
+                jds[i + 1],
+                speeds[i],
+                speeds[i + 1],
+            )
+            if jd_start <= jd <= jd_end:
+                direction = "SR" if speeds[i] >= 0 else "SD"
+                stations.append((jd, obj_key, direction))
+
+    stations.sort()
+    return stations
+
+
+def wrap_degrees(value):
+    """Signed difference in degrees, wrapped to [-180, 180)."""
+    return (value + 180) % 360 - 180
+
+
+def bisect_crossing(lng_at, target, jd_a, jd_b, diff_a):
+    """Narrow [jd_a, jd_b] around the moment lng_at(jd) passes target."""
+    while jd_b - jd_a > BISECT_TOL:
+        jd_mid = (jd_a + jd_b) / 2
+        diff_mid = wrap_degrees(lng_at(jd_mid) - target)
+        if (diff_mid < 0) == (diff_a < 0):
+            jd_a, diff_a = jd_mid, diff_mid
+        else:
+            jd_b = jd_mid
+    return (jd_a + jd_b) / 2
+
+
+def find_crossings(obj_key, targets, jd_start, jd_end, offset=None):
+    """
+    Yield (jd, target, forward) each time a body passes one of the target
+    longitudes. Steps adapt to the distance from the nearest target: a
+    body cannot cover that distance faster than MAX_SPEEDS allows, so no
+    crossing is skipped while slow bodies advance in large jumps. Each
+    crossing is refined by bisection.
+    """
+    targets = np.sort(np.asarray(targets, dtype=np.float64) % 360)
+    planet_id = PLANET_KEYS.index(obj_key)
+    max_speed = MAX_SPEEDS[obj_key]
+
+    # the generator may pause between steps, so the mode is held per call
+    def lng_at(jd):
+        with ephemeris(offset) as calc_flag:
+            return swe.calc_ut(jd, planet_id, calc_flag)[0][0]
+
+    jd, lng = jd_start, lng_at(jd_start)
+    while jd < jd_end:
+        diffs = wrap_degrees(lng - targets)
+        nearest = np.argmin(np.abs(diffs))
+        target, diff = targets[nearest], diffs[nearest]
+
+        step = max(abs(diff) / max_speed, MIN_STEP)
+        jd_next = min(jd + step, jd_end)
+        lng_next = lng_at(jd_next)
+        diff_next = wrap_degrees(lng_next - target)
+
+        if (diff < 0) != (diff_next < 0) and abs(diff_next - diff) < 180:
+            forward = bool(diff < 0)
+            yield bisect_crossing(lng_at, target, jd, jd_next, diff), target, forward
+
+        jd, lng = jd_next, lng_next
+
+
+def find_ingresses(obj_key, jd_start, jd_end, offset=None):
+    """Yield (jd, sign_index, forward) whenever a body enters a new sign."""
+    for jd, target, forward in find_crossings(
+        obj_key, np.arange(0, 360, 30), jd_start, jd_end, offset
+    ):
+        boundary = int(round(target / 30)) % 12
+        sign_index = boundary if forward else (boundary - 1) % 12
+        yield jd, sign_index, forward
+
+
+def sample_motion(obj_key, jd_start, jd_end, store=None):
+    """
+    Sample longitude and speed of one body on a grid coarse enough for its
+    speed, with stations inserted so longitude is monotonic between samples.
+    """
+
+    def sample(jds):
+        return get_planets_batch(jds, keys=[obj_key], store=store)[:, 0]
+
+    step = TRANSIT_STEPS[obj_key]
+    jds = np.arange(jd_start, jd_end + step, step, dtype=np.float64)
+    jds[-1] = min(jds[-1], jd_end)
+    jds = np.unique(jds)
+    data = sample(jds)
+    lng, speed = data["lng"], data["speed"]
+
+    changes = np.nonzero(np.signbit(speed[:-1]) != np.signbit(speed[1:]))[0]
+    if len(changes):
+        stations = np.array(
+            [
+                brent(
+                    lambda t: sample(t)["speed"][0],
+                    jds[i],
+                    jds[i + 1],
+                    speed[i],
+                    speed[i + 1],
+                    tol=MIN_STEP,
+                )
+                for i in changes.tolist()
+            ]
+        )
+        extra = sample(stations)
+        order = np.argsort(np.concatenate([jds, stations]), kind="stable")
+        jds = np.concatenate([jds, stations])[order]
+        lng = np.concatenate([lng, extra["lng"]])[order]
+        speed = np.concatenate([speed, extra["speed"]])[order]
+
+    return jds, lng, speed
+
+
+def hermite_roots(p0, p1, m0, m1, level, iterations=30):
+    """
+    Solve the cubic Hermite segment through (p0, m0) and (p1, m1) for the
+    fraction of the interval where it reaches level, for many segments at
+    once. Each segment must bracket its level.
+    """
+    lo = np.zeros_like(p0)
+    hi = np.ones_like(p0)
+    rising = p1 > p0
+    for _ in range(iterations):
+        s = (lo + hi) / 2
+        s2, s3 = s * s, s * s * s
+        value = (
+            (2 * s3 - 3 * s2 + 1) * p0
+            + (s3 - 2 * s2 + s) * m0
+            + (-2 * s3 + 3 * s2) * p1
+            + (s3 - s2) * m1
+        )
+        below = (value < level) == rising
+        lo = np.where(below, s, lo)
+        hi = np.where(below, hi, s)
+    return (lo + hi) / 2
+
+
+def grid_crossings(obj_key, targets, jd_start, jd_end, store=None):
+    """
+    Return (jds, target indices, forward) of every crossing of one body over
+    the targets, unsorted. Crossings are located on the sampled grid by
+    counting laps past each target, placed by Hermite interpolation of
+    longitude and speed, then polished with one Newton step.
+    """
+    jds, lng, speed = sample_motion(obj_key, jd_start, jd_end, store)
+    unwrapped = np.unwrap(lng, period=360)
+
+    # laps completed past each target; a change between samples is a crossing
+    laps = np.floor((unwrapped[:, None] - targets[None, :]) / 360)
+    rows, hit_targets = np.nonzero(laps[1:] != laps[:-1])
+    if not len(rows):
+        return np.empty(0), hit_targets, np.empty(0, dtype=bool)
+
+    span = jds[rows + 1] - jds[rows]
+    level = targets[hit_targets] + 360 * np.maximum(
+        laps[rows, hit_targets], laps[rows + 1, hit_targets]
+    )
+    s = hermite_roots(
+        unwrapped[rows],
+        unwrapped[rows + 1],
+        speed[rows] * span,
+        speed[rows + 1] * span,
+        level,
+    )
+    hit_jds = jds[rows] + s * span
+    forward = unwrapped[rows + 1] > unwrapped[rows]
+
+    # one Newton step, kept inside the bracket, brings the interpolated
+    # time within seconds
+    polished = get_planets_batch(hit_jds, keys=[obj_key], store=store)[:, 0]
+    moving = np.abs(polished["speed"]) > EPSILON
+    correction = np.zeros_like(hit_jds)
+    correction[moving] = (
+        wrap_degrees(polished["lng"][moving] - targets[hit_targets[moving]])
+        / polished["speed"][moving]
+    )
+    hit_jds = np.clip(hit_jds - correction, jds[rows], jds[rows + 1])
+
+    return hit_jds, hit_targets, forward
+
+
+def find_transits(
+    natal, moving_keys, jd_start, jd_end, aspects=None, orbs=None, store=None
+):
+    """
+    Yield (jd, moving_key, natal_key, aspect_key, forward) for every exact
+    aspect from a moving body to a natal longitude, in time order. `natal`
+    maps natal keys to longitudes. The range is searched in windows of
+    TRANSIT_WINDOW days so results stream out while later years are still
+    pending; within a window each body is sampled once at a step suited to
+    its speed and checked against all aspect points together. With a
+    ChebyshevStore, samples are interpolated instead of calculated.
+    """
+    from .aspects import get_aspect_table
+
+    aspect_keys, angles, _ = get_aspect_table(aspects, orbs)
+
+    # several natal points and aspects can share one target longitude
+    hits = {}
+    for natal_key, lng in natal.items():
+        for aspect_key, angle in zip(aspect_keys, angles.tolist()):
+            # conjunctions and oppositions name the same point both ways
+            points = {lng + angle, lng - angle}
+            for target in {round(float(p) % 360, 9) % 360 for p in points}:
+                hits.setdefault(target, []).append((natal_key, aspect_key))
+    targets = np.array(list(hits), dtype=np.float64)
+    groups = list(hits.values())
+
+    window_start = jd_start
+    while window_start < jd_end:
+        window_end = min(window_start + TRANSIT_WINDOW, jd_end)
+        found = []
+        for moving_key in moving_keys:
+            hit_jds, hit_targets, forward = grid_crossings(
+                moving_key, targets, window_start, window_end, store
+            )
+            # windows share their boundary sample, so a crossing there falls
+            # in exactly one of them
+            for jd, index, fwd in zip(
+                hit_jds.tolist(), hit_targets.tolist(), forward.tolist()
+            ):
+                for natal_key, aspect_key in groups[index]:
+                    found.append((jd, moving_key, natal_key, aspect_key, fwd))
+
+        found.sort()
+        yield from found
+        window_start = window_end
@@ -0,0 +1,30 @@
+from ephem.constants import AYANAMSAS
+from .ayanamsas import get_all_ayanamsas
+from .core import build_horoscope
+from .fortuna import get_pars_fortunae
+from .planets import make_position
+
+
+def shift_positions(positions, ayanamsa):
+    """Rebuild tropical positions in a sidereal zodiac offset by ayanamsa."""
+    return [
+        make_position(position.obj.key, (position.lng - ayanamsa) % 360, position.speed)
+        for position in positions
+    ]
+
+
+def get_sidereal_horoscopes(jd_now, planets, angles):
+    """
+    Return (ayanamsa name, horoscope) for every entry of AYANAMSAS, derived
+    from one set of tropical planets and angles. Sidereal longitudes are
+    tropical ones minus the ayanamsa, so no body is calculated again.
+    """
+    horoscopes = []
+    for name, ayanamsa in zip(AYANAMSAS, get_all_ayanamsas(jd_now)):
+        sidereal_planets = shift_positions(planets, ayanamsa)
+        sidereal_angles = shift_positions(angles, ayanamsa)
+        part_of_fortune = get_pars_fortunae(sidereal_angles, sidereal_planets)
+        horoscopes.append(
+            (name, build_horoscope(sidereal_planets, sidereal_angles, part_of_fortune))
+        )
+    return horoscopes
@@ -0,0 +1,29 @@
+import itertools
+import numpy as np
+from ephem.db import iter_positions
+from .planets import PLANET_KEYS
+
+# bodies compared between saved charts; the mean node would double up
+# with the true node
+BODIES = [key for key in PLANET_KEYS if key != "mean_node"]
+
+
+def load_longitudes(bodies=BODIES, after_id=0):
+    """
+    Return chart IDs and an (n, len(bodies)) array of their longitudes,
+    read from the stored positions of charts after after_id. Charts
+    missing any body are left out.
+    """
+    column = {body: i for i, body in enumerate(bodies)}
+    ids, rows = [], []
+    for chart_id, positions in itertools.groupby(
+        iter_positions(bodies, after_id), key=lambda row: row[0]
+    ):
+        row = np.full(len(bodies), np.nan)
+        for _, body, lng in positions:
+            row[column[body]] = lng
+        if not np.isnan(row).any():
+            ids.append(chart_id)
+            rows.append(row)
+
+    return np.array(ids, dtype=np.int64), np.array(rows).reshape(-1, len(bodies))
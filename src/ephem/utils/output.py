@@ -0,0 +1,18 @@
+import os
+import sys
+from contextlib import contextmanager
+
+
+@contextmanager
+def stdout_stream():
+    """
+    Wrap a loop that streams to stdout. If the reader quits early, e.g.
+    `| head`, the loop stops there and what is left of stdout, including
+    the flush at exit, goes to devnull instead of raising again.
+    """
+    try:
+        yield sys.stdout
+        sys.stdout.flush()
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
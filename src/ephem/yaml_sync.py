@@ -5,7 +5,18 @@ from pathlib import Path
 from datetime import datetime
 import re
 from typing import Dict, List, Optional
-from .db import get_db_path, view_charts, add_chart, create_tables
+from .db import (
+    add_chart,
+    chart_hash,
+    content_hashes,
+    create_tables,
+    get_db_path,
+    transaction,
+    view_charts,
+)
+
+# libyaml's parser when PyYAML was built with it, several times faster
+SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def slugify(text: str) -> str:
@@ -80,7 +91,7 @@ def export_chart_to_yaml(chart: Dict) -> Path:
 def load_yaml_chart(filepath: Path) -> Optional[Dict]:
     try:
         with open(filepath, "r") as f:
-            yaml_dict = yaml.safe_load(f)
+            yaml_dict = yaml.load(f, Loader=SAFE_LOADER)
         return yaml_dict_to_chart(yaml_dict, filepath.name)
     except Exception as e:
         print(f"Error loading {filepath}: {e}")
@@ -129,34 +140,37 @@ def sync_yaml_to_db() -> Dict[str, List[str]]:
     results = {"added": [], "conflicts": [], "errors": []}
 
     yaml_files = find_yaml_files()
-    db_charts = view_charts()
+    # a file is in the DB when its content hash is; no scan of the charts
+    db_hashes = content_hashes()
 
     print(f"Syncing {len(yaml_files)} YAML files...")
 
-    for yaml_path in yaml_files:
-        try:
-            yaml_chart = load_yaml_chart(yaml_path)
-            if not yaml_chart:
-                continue
-
-            # look for existing chart in DB
-            existing = find_chart_by_content(yaml_chart, db_charts)
-            if not existing:
-                add_chart(
-                    yaml_chart["name"],
-                    yaml_chart["timestamp_utc"],
-                    yaml_chart["timestamp_input"],
-                    yaml_chart["latitude"],
-                    yaml_chart["longitude"],
-                )
-                results["added"].append(yaml_path.name)
-                print(f"Added to DB: {yaml_path.name}")
-            else:
-                print(f"Already in DB: {yaml_path.name}")
-
-        except Exception as e:
-            results["errors"].append(f"{yaml_path.name}: {e}")
-            print(f"Error processing {yaml_path.name}: {e}")
+    # one commit for the whole sync instead of one per chart
+    with transaction():
+        for yaml_path in yaml_files:
+            try:
+                yaml_chart = load_yaml_chart(yaml_path)
+                if not yaml_chart:
+                    continue
+
+                digest = chart_hash(**yaml_chart)
+                if digest not in db_hashes:
+                    db_hashes.add(digest)
+                    add_chart(
+                        yaml_chart["name"],
+                        yaml_chart["timestamp_utc"],
+                        yaml_chart["timestamp_input"],
+                        yaml_chart["latitude"],
+                        yaml_chart["longitude"],
+                    )
+                    results["added"].append(yaml_path.name)
+                    print(f"Added to DB: {yaml_path.name}")
+                else:
+                    print(f"Already in DB: {yaml_path.name}")
+
+            except Exception as e:
+                results["errors"].append(f"{yaml_path.name}: {e}")
+                print(f"Error processing {yaml_path.name}: {e}")
 
     return results
 
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+import unittest
+from ephem.api import ChartAPI
+
+BATCH = """date,time,lat,lng,tz,title
+1990-06-15,12:00,51.5,-0.12,Europe/London,First
+2000-13-01,10:00,1,2,,Bad date
+"""
+
+
+class TestChartAPI(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = ChartAPI(workers=2)
+        started = asyncio.Event()
+
+        def ready(server):
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+
+        self.serving = asyncio.create_task(self.api.serve("127.0.0.1", 0, ready))
+        await started.wait()
+
+    async def asyncTearDown(self):
+        self.serving.cancel()
+        try:
+            await self.serving
+        except asyncio.CancelledError:
+            pass
+        self.api.close()
+
+    async def request(self, method, target, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+        head, _, payload = response.partition(b"\r\n\r\n")
+        status = int(head.split()[1])
+        return status, payload.decode()
+
+    async def test_cast(self):
+        status, payload = await self.request(
+            "GET", "/cast?date=2000-01-01&time=12:00&lat=51.5&lng=-0.12&offset=1"
+        )
+        self.assertEqual(status, 200)
+        chart = json.loads(payload)["chart"]
+        self.assertEqual(chart["zodiac"], "Lahiri")
+        self.assertEqual(chart["positions"]["ae"]["sign"], "Sagittarius")
+
+    async def test_now(self):
+        status, payload = await self.request("GET", "/now")
+        self.assertEqual(status, 200)
+        self.assertIn("ae", json.loads(payload)["chart"]["positions"])
+
+    async def test_cal(self):
+        status, payload = await self.request("GET", "/cal?year=2024&month=Apr")
+        self.assertEqual(status, 200)
+        days = json.loads(payload)["days"]
+        self.assertEqual(len(days), 30)
+        self.assertEqual(days[0]["date"], "2024-04-01")
+        self.assertIn({"key": "hg", "station": "SR"}, days[0]["stations"])
+
+    async def test_batch(self):
+        status, payload = await self.request("POST", "/batch", BATCH.encode())
+        self.assertEqual(status, 200)
+        results = [json.loads(line) for line in payload.splitlines()]
+        self.assertEqual(results[0]["title"], "First")
+        self.assertEqual(results[1], {"line": 3, "error": "month must be in 1..12"})
+
+    async def test_errors(self):
+        self.assertEqual((await self.request("GET", "/cast"))[0], 400)
+        self.assertEqual((await self.request("GET", "/cast?date=x&offset=99"))[0], 400)
+        self.assertEqual((await self.request("GET", "/nope"))[0], 404)
+        self.assertEqual((await self.request("POST", "/now"))[0], 405)
+
+    async def test_identical_requests_share_one_computation(self):
+        calls = []
+        release = threading.Event()
+
+        def slow_chart(fields):
+            calls.append(fields)
+            release.wait(5)
+            return {"chart": None}
+
+        async def get_now(query):
+            return await self.api.run(slow_chart, query)
+
+        self.api.get_now = get_now
+        pending = [
+            asyncio.create_task(self.request("GET", "/now?lat=1&lng=2"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.2)
+        release.set()
+
+        responses = await asyncio.gather(*pending)
+        self.assertEqual([status for status, _ in responses], [200] * 5)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,12 @@ from io import StringIO
 import unittest
 from unittest.mock import patch, MagicMock, ANY
 from argparse import Namespace
+from ephem.cli import parse_arguments
 from ephem.commands import cal
+from ephem.display.month import format_stations
+from ephem.sweph import get_planets_batch
+from ephem.sweph.calendar import get_station_changes
+import swisseph as swe
 
 
 class TestCal(unittest.TestCase):
@@ -47,7 +52,9 @@ class TestCal(unittest.TestCase):
             year=2025,
             month=1,
             offset=None,
-            ascii=False
+            ascii=False,
+            stations=False,
+            precomputed=False,
         )
         cal.run(args)
         MockConsole.assert_called_once()
@@ -58,5 +65,68 @@ class TestCal(unittest.TestCase):
         )
         mock_console_instance.print.assert_any_call(ANY)
 
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_run_csv(self, mock_stdout):
+        """--format csv prints one row per body per day, noon Moon included."""
+        args = Namespace(year=2024, month=4, offset=None, format="csv")
+        cal.run(args)
+
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(
+            lines[0],
+            "date,sidereal_time,zodiac,key,name,lng,sign,deg,mnt,sec,rx,speed,station",
+        )
+        self.assertEqual(len(lines), 1 + 30 * 13)
+        self.assertTrue(lines[3].startswith("2024-04-01,12:39:23,Tropical,hg,"))
+        self.assertTrue(lines[3].endswith(",SR"))
+        self.assertTrue(lines[13].startswith("2024-04-01,12:39:23,Tropical,ag_noon,"))
+
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_stations_flag(self, _):
+        """-S/--stations is off unless asked for."""
+        self.assertTrue(parse_arguments(["cal", "2024", "4", "-S"]).stations)
+        self.assertFalse(parse_arguments(["cal", "2024", "4"]).stations)
+
+    def test_get_station_changes(self):
+        """Mercury stations retrograde on 1 April 2024 and direct on 25 April."""
+        jds = [swe.julday(2024, 4, day, 0.0) for day in (1, 2, 25, 26, 10, 11)]
+        rows = get_planets_batch(jds)
+
+        self.assertEqual(get_station_changes(rows[0], rows[1]), [("hg", "SR")])
+        self.assertEqual(get_station_changes(rows[2], rows[3]), [("hg", "SD")])
+        self.assertEqual(get_station_changes(rows[4], rows[5]), [])
+
+    def test_format_stations(self):
+        changes = [("hg", "SR"), ("pb", "SD")]
+        self.assertEqual(
+            format_stations(changes, ascii_mode=True), "Mercury SR Saturn SD"
+        )
+        self.assertEqual(format_stations(changes), "☿ SR ♄ SD")
+        self.assertEqual(format_stations([]), "")
+
+    @patch("ephem.display.month.Console")
+    def test_run_with_stations(self, MockConsole):
+        """The stations column is added and filled on the days a body stations."""
+        args = Namespace(year=2024, month=4, offset=None, ascii=True, stations=True)
+        cal.run(args)
+
+        table = MockConsole.return_value.print.call_args_list[-1].args[0].renderable
+        column = table.columns[-1]
+        self.assertEqual(str(column.header), "Stations")
+        cells = list(column.cells)
+        self.assertEqual(len(cells), 30)
+        self.assertEqual(cells[0], "Mercury SR")
+        self.assertEqual(cells[24], "Mercury SD")
+        self.assertEqual(cells[9], "")
+
+    @patch("ephem.display.month.Console")
+    def test_run_without_stations(self, MockConsole):
+        args = Namespace(year=2024, month=4, offset=None, ascii=True, stations=False)
+        cal.run(args)
+
+        table = MockConsole.return_value.print.call_args_list[-1].args[0].renderable
+        self.assertNotIn("Stations", [str(column.header) for column in table.columns])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,10 @@
+import io
+import json
 import unittest
+from argparse import Namespace
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
+from ephem.cli import parse_arguments
 from ephem.commands import cast
 
 
@@ -34,6 +39,86 @@ class TestCast(unittest.TestCase):
         self.assertEqual(dt_utc, dt_local)  # Should be same since both UTC
         self.assertFalse(approx)
 
+    def test_format_json(self):
+        """--format json prints the chart dict, filtered by the display flags."""
+        args = Namespace(
+            event=["2000-01-01", "12:00", "Test"],
+            lat=51.5,
+            lng=-0.12,
+            timezone=None,
+            offset=None,
+            save=False,
+            batch=None,
+            format="json",
+            classical=True,
+            no_angles=False,
+            node="true",
+        )
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            cast.main(args)
+
+        chart = json.loads(stdout.getvalue())
+        self.assertEqual(chart["title"], "Test")
+        self.assertEqual(chart["zodiac"], "Tropical")
+        self.assertEqual(chart["positions"]["ae"]["sign"], "Capricorn")
+        self.assertIn("asc", chart["positions"])
+        for key in ("ura", "mean_node"):
+            self.assertNotIn(key, chart["positions"])
+
+    def test_format_ndjson_compare(self):
+        """-o all prints one NDJSON line per zodiac."""
+        args = Namespace(
+            event=["2000-01-01", "12:00"],
+            lat=None,
+            lng=None,
+            timezone=None,
+            offset="all",
+            save=False,
+            batch=None,
+            format="ndjson",
+            classical=False,
+            no_angles=False,
+            node="true",
+        )
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            cast.main(args)
+
+        charts = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(charts[0]["zodiac"], "Tropical")
+        self.assertEqual(charts[2]["zodiac"], "Lahiri")
+
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_speed_column(self, _):
+        """-S/--speed adds daily motion and marks Mercury's station."""
+        args = parse_arguments(
+            ["cast", "2024-04-01", "22:14", "-y", "51.5", "-x", "-0.12"]
+            + ["-S", "--no-color", "--ascii"]
+        )
+        self.assertTrue(args.speed)
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            cast.main(args)
+
+        lines = stdout.getvalue().splitlines()
+        sun = next(line for line in lines if line.startswith("Sun "))
+        mercury = next(line for line in lines if line.startswith("Mercury "))
+        self.assertTrue(sun.endswith("+ 0d59'11\""))
+        self.assertTrue(mercury.endswith(" S"))
+
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_no_speed_column(self, _):
+        args = parse_arguments(
+            ["cast", "2024-04-01", "22:14", "-y", "51.5", "-x", "-0.12"]
+            + ["--no-color", "--ascii"]
+        )
+        self.assertFalse(args.speed)
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            cast.main(args)
+
+        lines = stdout.getvalue().splitlines()
+        mercury = next(line for line in lines if line.startswith("Mercury "))
+        self.assertNotIn("'00\"", mercury)
+        self.assertFalse(mercury.endswith(" S"))
+
 
 if __name__ == "__main__":
     unittest.main()
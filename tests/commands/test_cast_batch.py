@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+from ephem.commands import cast, cast_batch
+
+CSV_ROWS = """date,time,lat,lng,tz,title
+1990-06-15,12:00,51.5,-0.12,Europe/London,First
+2000-01-01,,,,,No time
+2000-13-01,10:00,1,2,,Bad date
+"""
+
+
+class TestReadRows(unittest.TestCase):
+    def test_csv_with_header(self):
+        rows = list(cast_batch.read_rows(io.StringIO(CSV_ROWS)))
+        self.assertEqual([line for line, _ in rows], [2, 3, 4])
+        self.assertEqual(rows[0][1]["tz"], "Europe/London")
+        self.assertEqual(rows[0][1]["title"], "First")
+
+    def test_csv_without_header(self):
+        """Columns default to DATE, TIME, LAT, LNG, TZ, TITLE."""
+        rows = list(cast_batch.read_rows(io.StringIO("2000-01-01,6:30,10,20,UTC,X\n")))
+        self.assertEqual(rows[0][1]["time"], "6:30")
+        self.assertEqual(rows[0][1]["lng"], "20")
+
+    def test_ndjson(self):
+        text = '{"DATE": "2000-01-01", "lat": 10, "lng": 20}\n\nnot json\n[1]\n'
+        rows = list(cast_batch.read_rows(io.StringIO(text)))
+        self.assertEqual(rows[0], (1, {"date": "2000-01-01", "lat": 10, "lng": 20}))
+        self.assertIn("Invalid JSON", rows[1][1]["error"])
+        self.assertEqual(rows[2][1]["error"], "Expected a JSON object")
+
+
+class TestCastRows(unittest.TestCase):
+    def test_cast_row(self):
+        result = cast_batch.cast_row(
+            (
+                2,
+                {
+                    "date": "1990-06-15",
+                    "time": "12:00",
+                    "lat": "51.5",
+                    "lng": "-0.12",
+                    "tz": "Europe/London",
+                },
+            )
+        )
+        self.assertEqual(result["timestamp_utc"], "1990-06-15T11:00:00+00:00")
+        self.assertIn("asc", result["positions"])
+        self.assertEqual(result["positions"]["ae"]["sign"], "Gemini")
+
+    def test_no_time_has_no_angles(self):
+        result = cast_batch.cast_row(
+            (1, {"date": "2000-01-01", "lat": "1", "lng": "2"})
+        )
+        self.assertTrue(result["approx_time"])
+        self.assertNotIn("asc", result["positions"])
+
+    def test_errors_are_reported_per_row(self):
+        self.assertEqual(
+            cast_batch.cast_row((7, {"date": "2000-01-01", "lat": "1"})),
+            {
+                "line": 7,
+                "error": "Both latitude and longitude must be provided together",
+            },
+        )
+        result = cast_batch.cast_row((8, {"date": "2000-01-01", "tz": "Mars/Base"}))
+        self.assertIn("Mars/Base", result["error"])
+        result = cast_batch.cast_row((9, {"date": "2000-01-01", "time": "noon"}))
+        self.assertIn("got 'noon'", result["error"])
+
+    def test_pool_keeps_input_order(self):
+        rows = [(i, {"date": f"2000-01-{i:02d}", "time": "6:00"}) for i in range(1, 20)]
+        pooled = list(cast_batch.cast_rows(rows, offset=1, jobs=2))
+        serial = list(cast_batch.cast_rows(rows, offset=1, jobs=1))
+        self.assertEqual(pooled, serial)
+        self.assertEqual([r["line"] for r in pooled], list(range(1, 20)))
+        self.assertEqual(pooled[0]["zodiac"], "Lahiri")
+
+    @patch("ephem.commands.cast_batch.CHUNKS_AHEAD", 1)
+    @patch("ephem.commands.cast_batch.CHUNK_SIZE", 2)
+    def test_pool_reads_rows_as_needed(self):
+        """Input is read a bounded number of chunks ahead of the output."""
+        read = []
+
+        def rows():
+            for i in range(1, 100):
+                read.append(i)
+                yield i, {"date": "2000-01-01"}
+
+        results = cast_batch.cast_rows(rows(), jobs=2)
+        self.assertEqual(next(results)["line"], 1)
+        self.assertEqual(len(read), 4)
+        results.close()
+
+
+class TestCastBatchCommand(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as f:
+            f.write(CSV_ROWS)
+        self.args = Namespace(batch=self.path, jobs=1, offset=None, save=False)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    @patch("sys.stderr", new_callable=io.StringIO)
+    @patch("sys.stdout", new_callable=io.StringIO)
+    def test_run_writes_ndjson(self, mock_stdout, mock_stderr):
+        cast.run(self.args)
+        results = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+        self.assertEqual([r["line"] for r in results], [2, 3, 4])
+        self.assertEqual(results[0]["title"], "First")
+        self.assertIn("error", results[2])
+        self.assertIn("1 row(s) could not be cast", mock_stderr.getvalue())
+
+    @patch("sys.stderr", new_callable=io.StringIO)
+    def test_missing_file(self, mock_stderr):
+        self.args.batch = self.path + ".missing"
+        with self.assertRaises(SystemExit):
+            cast.run(self.args)
+        self.assertIn("Can't read batch file", mock_stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from unittest.mock import patch
 import argparse
@@ -68,30 +69,87 @@ class TestDataCommands(unittest.TestCase):
                 "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
             )
 
-    @patch("ephem.commands.data.view_charts")
-    @patch("pydoc.pager")
-    def test_print_charts_success(self, mock_pager, mock_view_charts):
+    @patch("ephem.commands.data.iter_charts")
+    @patch("ephem.commands.data.page")
+    def test_print_charts_success(self, mock_page, mock_iter_charts):
         """Test successful chart listing."""
-        mock_view_charts.return_value = [self.sample_chart]
-        data.print_charts() 
+        mock_iter_charts.return_value = iter([self.sample_chart])
+        pages = []
+        mock_page.side_effect = lambda lines: pages.append("\n".join(lines))
+        data.print_charts()
         expected_output = (
             "[1] Test Chart\n"
             "   UTC:     2025-09-10T12:00:00\n"
             "   Local:   2025-09-10 08:00:00-04:00\n"
             "   Lat:     40.7128, Lng: -74.006\n"
         )
-        mock_pager.assert_called_once_with(expected_output)
+        self.assertEqual(pages, [expected_output])
 
-    @patch("ephem.commands.data.view_charts")
-    @patch("pydoc.pager")
-    def test_print_charts_empty(self, mock_pager, mock_view_charts):
+    @patch("ephem.commands.data.iter_charts")
+    def test_print_charts_empty(self, mock_iter_charts):
         """Test empty chart database."""
-        mock_view_charts.return_value = []
-        data.print_charts() 
-        mock_pager.assert_called_once_with(
-            "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
+        mock_iter_charts.return_value = iter([])
+        with patch("builtins.print") as mock_print:
+            data.print_charts()
+            mock_print.assert_called_once_with(
+                "✨ No charts saved yet! Run `ephem cast --save` to add your first chart."
+            )
+
+    @patch("ephem.commands.data.iter_charts")
+    @patch("ephem.commands.data.page", lambda lines: list(lines))
+    def test_print_charts_pages(self, mock_iter_charts):
+        """Test that a full page points at the next one by ID."""
+        mock_iter_charts.return_value = iter([self.sample_chart])
+        args = argparse.Namespace(limit=1, skip=None, after_id=None)
+        with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            data.print_charts(args)
+        mock_iter_charts.assert_called_once_with(limit=1, offset=None, after_id=None)
+        self.assertEqual(
+            stderr.getvalue(), "Next page: ephem data view --limit 1 --after-id 1\n"
         )
 
+    @patch("ephem.utils.output.os.dup2")
+    def test_page_broken_pipe(self, mock_dup2):
+        """A reader that quits early stops the output without a traceback."""
+
+        class ClosedPipe(io.StringIO):
+            def write(self, text):
+                raise BrokenPipeError
+
+        read = []
+
+        def lines():
+            for i in range(100):
+                read.append(i)
+                yield f"line {i}"
+
+        with patch("sys.stdout", new_callable=ClosedPipe) as stdout:
+            stdout.fileno = lambda: 1
+            data.page(lines())
+
+        self.assertEqual(read, [0])
+        self.assertEqual(mock_dup2.call_args.args[1], 1)
+
+    @patch("ephem.commands.data.search_charts")
+    def test_search(self, mock_search):
+        """Test that date bounds cover whole years, months and days."""
+        mock_search.return_value = [self.sample_chart]
+        args = argparse.Namespace(
+            name="test", start="1980", end="1990-02", bbox=None, limit=None
+        )
+
+        with patch("builtins.print") as mock_print:
+            data.search_cmd(args)
+        mock_search.assert_called_once_with(
+            "test", "1980-01-01", "1990-03-01", None, None
+        )
+        self.assertIn("[1] Test Chart", mock_print.call_args[0][0])
+
+        self.assertEqual(data.date_bounds("2024-12"), ("2024-12-01", "2025-01-01"))
+        self.assertEqual(data.date_bounds("2024-02-29"), ("2024-02-29", "2024-03-01"))
+        with self.assertRaises(ValueError):
+            data.date_bounds("2024-1-1-1")
+
     @patch("ephem.commands.data.delete_chart")
     def test_delete_chart_success(self, mock_delete):
         """Test successful chart deletion."""
@@ -0,0 +1,87 @@
+import argparse
+import io
+import os
+import unittest
+from unittest.mock import patch
+from ephem import db
+from ephem.commands import data_import
+from tests.helpers import TempDatabaseMixin
+
+CSV = """date,time,lat,lng,tz,title
+1990-06-15,12:00,51.5,-0.12,Europe/London,First
+2000-13-01,10:00,1,2,,Bad date
+1957-09-22,12:20,-36.25,142.416667,Australia/Melbourne,Nick Cave
+"""
+
+NDJSON = """{"name": "Jean Cremers", "timestamp_utc": "1957-03-14T19:55:00+01:00", "timestamp_input": "1957-03-14T19:55:00+01:00", "latitude": 52.0, "longitude": 6.0}
+{"name": "No zone", "timestamp_utc": "1957-03-14T19:55:00"}
+"""
+
+YAML = """name: Kevin DeCapite
+timestamp_utc: 1976-11-29T17:32:00+00:00
+timestamp_input: 1976-11-29T12:32:00-05:00
+latitude: 41.3919
+longitude: -81.7286
+---
+- not a chart
+---
+date: 1998-08-26
+time: "17:20"
+tz: Asia/Seoul
+name: Jeon Soyeon
+"""
+
+
+class TestDataImport(TempDatabaseMixin, unittest.TestCase):
+    create_tables = False
+
+    def import_text(self, text, fmt):
+        with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            counts = data_import.import_charts(io.StringIO(text), fmt)
+        return counts, stderr.getvalue()
+
+    def test_csv(self):
+        counts, errors = self.import_text(CSV, "csv")
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(errors, "line 3: month must be in 1..12\n")
+
+        first, cave = db.view_charts()
+        self.assertEqual(first["timestamp_utc"], "1990-06-15T11:00:00+00:00")
+        self.assertEqual(first["timestamp_input"], "1990-06-15T12:00:00+01:00")
+        self.assertEqual(cave["name"], "Nick Cave")
+        self.assertEqual(cave["longitude"], 142.416667)
+
+    def test_ndjson(self):
+        counts, errors = self.import_text(NDJSON, "ndjson")
+        self.assertEqual(counts, (1, 1))
+        self.assertIn("line 2: timestamp_utc needs a UTC offset", errors)
+        (chart,) = db.view_charts()
+        self.assertEqual(chart["timestamp_utc"], "1957-03-14T18:55:00+00:00")
+
+    def test_yaml(self):
+        counts, errors = self.import_text(YAML, "yaml")
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(errors, "document 2: Expected a mapping\n")
+        self.assertEqual(
+            [chart["name"] for chart in db.search_charts("deca")], ["Kevin DeCapite"]
+        )
+        self.assertEqual(
+            db.search_charts("soyeon")[0]["timestamp_utc"], "1998-08-26T08:20:00+00:00"
+        )
+
+    def test_format_from_extension(self):
+        path = os.path.join(self.tmpdir.name, "charts.csv")
+        with open(path, "w") as f:
+            f.write(CSV)
+
+        args = argparse.Namespace(file=path, format=None)
+        with patch("builtins.print") as mock_print:
+            data_import.main(args)
+        mock_print.assert_any_call("✅ Imported 2 chart(s)")
+
+        with self.assertRaises(ValueError):
+            data_import.detect_format("charts.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
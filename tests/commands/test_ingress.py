@@ -0,0 +1,66 @@
+import unittest
+from argparse import Namespace
+from io import StringIO
+from unittest.mock import patch
+from ephem.commands import ingress
+from ephem.sweph.julian import date_to_jd
+from ephem.sweph.search import find_ingresses
+
+
+class TestIngress(unittest.TestCase):
+    def setUp(self):
+        self.args = Namespace(
+            start="2025-03-15",
+            end="2025-04-01",
+            offset=None,
+            ascii=True,
+            classical=False,
+            node="true",
+            no_moon=True,
+        )
+
+    def test_equinox(self):
+        """The Sun enters Aries at the March 2025 equinox."""
+        found = list(
+            find_ingresses("ae", date_to_jd("2025-03-01"), date_to_jd("2025-04-01"))
+        )
+        self.assertEqual(len(found), 1)
+        jd, sign_index, forward = found[0]
+        self.assertEqual(sign_index, 0)
+        self.assertTrue(forward)
+        expected = date_to_jd("2025-03-20") + (9 + 1 / 60) / 24
+        self.assertAlmostEqual(jd, expected, delta=2 / 1440)
+
+    def test_retrograde_ingress(self):
+        """Venus backs into Pisces during its 2025 retrograde."""
+        found = list(
+            find_ingresses("cu", date_to_jd("2025-03-01"), date_to_jd("2025-04-01"))
+        )
+        self.assertEqual([(s, f) for _, s, f in found], [(11, False)])
+
+    def test_moon_count(self):
+        """The Moon changes signs roughly every two and a half days."""
+        found = list(
+            find_ingresses("ag", date_to_jd("2025-01-01"), date_to_jd("2025-02-01"))
+        )
+        self.assertIn(len(found), range(12, 15))
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_run_sorted_output(self, mock_stdout):
+        ingress.run(self.args)
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(lines, sorted(lines))
+        self.assertIn("2025-03-20 09:01 UTC  Sun       enters Aries", lines)
+        self.assertIn("2025-03-27 08:40 UTC  Venus     enters Pisces r", lines)
+
+    def test_ingress_keys(self):
+        self.args.classical = True
+        self.args.node = "mean"
+        keys = ingress.get_ingress_keys(self.args)
+        self.assertNotIn("plu", keys)
+        self.assertNotIn("ag", keys)
+        self.assertEqual(keys[-1], "mean_node")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import io
 import unittest
 from datetime import datetime
+from unittest.mock import patch
 from zoneinfo import ZoneInfo
+from ephem.cli import parse_arguments
 from ephem.commands import now
 
 
@@ -38,6 +41,20 @@ class TestNow(unittest.TestCase):
         # Should never be approximate time
         self.assertFalse(approx)
 
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_speed_column(self, _):
+        """-S/--speed adds a signed daily motion to every body."""
+        args = parse_arguments(["now", "-y", "51.5", "-x", "-0.12", "-S", "--no-color"])
+        self.assertTrue(args.speed)
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            now.main(args)
+
+        lines = stdout.getvalue().splitlines()
+        sun = next(line for line in lines if line.startswith("☉"))
+        moon = next(line for line in lines if line.startswith("☽"))
+        self.assertRegex(sun, r"\+ (0°5[7-9]|1°0[01])'\d\d\"$")
+        self.assertRegex(moon, r"\+1[1-5]°\d\d'\d\d\"$")
+
 
 if __name__ == "__main__":
     unittest.main()
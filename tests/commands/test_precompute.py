@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+from ephem.commands import precompute
+from ephem.sweph import get_planets, get_planets_batch
+from ephem.sweph.chebyshev import ChebyshevStore
+from ephem.sweph.planets import PLANET_KEYS
+
+
+class TestPrecompute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = Path(cls.tmpdir.name) / "ephem.cheb"
+        args = Namespace(
+            start=2000, end=2001, file=str(cls.path), validate=False, samples=50
+        )
+        with patch("builtins.print"):
+            precompute.run(args)
+        cls.store = ChebyshevStore(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.store
+        cls.tmpdir.cleanup()
+
+    def test_store_matches_swiss_ephemeris(self):
+        """Interpolated longitudes stay within 7 arcseconds."""
+        errors = self.store.validate(200)
+        self.assertLess(max(errors.values()), 7.0)
+
+    def test_within_one_arcsecond_away_from_sun(self):
+        """More than 5° from the Sun, every body is within 1 arcsecond."""
+        jds = np.linspace(self.store.jd_start, self.store.jd_end, 500)
+        truth = get_planets_batch(jds)["lng"]
+        stored = self.store.batch(jds)["lng"]
+        sun = truth[:, PLANET_KEYS.index("ae")]
+        elongation = np.abs((truth - sun[:, None] + 180) % 360 - 180)
+        errors = np.abs((stored - truth + 180) % 360 - 180) * 3600
+        self.assertLess(errors[elongation > 5].max(), 1.0)
+
+    def test_get_planets_from_store(self):
+        """get_planets reads the store and keeps retrograde flags from speed."""
+        jd = 2451700.25
+        computed = get_planets(jd)
+        stored = get_planets(jd, store=self.store)
+        for a, b in zip(computed, stored):
+            self.assertAlmostEqual(a.lng, b.lng, delta=5 / 3600)
+            self.assertEqual(a.rx, b.rx)
+
+    def test_sidereal_from_store(self):
+        """Sidereal positions are shifted by the ayanamsa."""
+        jds = [2451600.5, 2451800.5]
+        computed = get_planets_batch(jds, offset=1, keys=["ae"])["lng"]
+        stored = get_planets_batch(jds, offset=1, keys=["ae"], store=self.store)
+        for a, b in zip(computed.ravel(), stored["lng"].ravel()):
+            self.assertAlmostEqual(a, b, delta=5 / 3600)
+
+    def test_out_of_range(self):
+        """Julian days outside the fitted span are rejected."""
+        with self.assertRaises(ValueError):
+            self.store.batch([2460000.5])
+
+    def test_missing_store(self):
+        """A missing store file surfaces as a ValueError."""
+        with self.assertRaises(ValueError):
+            ChebyshevStore(Path(self.tmpdir.name) / "missing.cheb")
+
+
+if __name__ == "__main__":
+    unittest.main()
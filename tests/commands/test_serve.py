@@ -0,0 +1,108 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from ephem import client
+from ephem.server import ChartServer, handle_request
+
+
+class TestHandleRequest(unittest.TestCase):
+    def test_chart(self):
+        response = handle_request(
+            {
+                "op": "chart",
+                "date": "2000-01-01",
+                "time": "12:00",
+                "lat": 51.5,
+                "lng": -0.12,
+                "offset": 1,
+            }
+        )
+        self.assertTrue(response["ok"])
+        chart = response["chart"]
+        self.assertEqual(chart["zodiac"], "Lahiri")
+        self.assertEqual(chart["positions"]["ae"]["sign"], "Sagittarius")
+        self.assertIn("asc", chart["positions"])
+
+    def test_chart_defaults_to_now(self):
+        response = handle_request({"op": "chart"})
+        self.assertTrue(response["ok"])
+        self.assertIn("ae", response["chart"]["positions"])
+
+    def test_errors(self):
+        self.assertEqual(
+            handle_request({"op": "chart", "date": "2000-13-01"})["error"],
+            "month must be in 1..12",
+        )
+        self.assertFalse(handle_request({"op": "chart", "offset": 99})["ok"])
+        self.assertEqual(handle_request({"op": "nope"})["error"], "Unknown op: 'nope'")
+        self.assertFalse(handle_request({"op": "run", "argv": ["serve"]})["ok"])
+
+    def test_run_captures_output_and_exit(self):
+        response = handle_request(
+            {"op": "run", "argv": ["cast", "2000-01-01", "12:00", "Test", "-C"]}
+        )
+        self.assertEqual(response["exit"], 0)
+        self.assertIn("Test hyp. (Tropical)", response["stdout"])
+
+        response = handle_request({"op": "run", "argv": ["cast", "2000-13-01", "-C"]})
+        self.assertEqual(response["exit"], 1)
+        self.assertIn("month must be in 1..12", response["stderr"])
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "ephem.sock")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def start_server(self):
+        server = ChartServer(self.path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.addCleanup(stop)
+        return server
+
+    def test_client_round_trip(self):
+        self.start_server()
+        self.assertEqual(client.request(self.path, {"op": "ping"})["pid"], os.getpid())
+
+        response = client.request(
+            self.path, {"op": "chart", "date": "1990-06-15", "tz": "Europe/London"}
+        )
+        self.assertTrue(response["chart"]["approx_time"])
+
+    def test_second_daemon_is_refused(self):
+        self.start_server()
+        with self.assertRaises(ValueError):
+            ChartServer(self.path)
+
+    def test_stale_socket_is_replaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+
+        self.start_server()
+        self.assertTrue(client.request(self.path, {"op": "ping"})["ok"])
+
+    def test_run_remote_falls_back_without_daemon(self):
+        self.assertIsNone(client.run_remote(self.path, ["now"]))
+
+
+class TestFindSocket(unittest.TestCase):
+    def test_find_socket(self):
+        self.assertEqual(client.find_socket(["now", "--socket", "/a"]), "/a")
+        self.assertEqual(client.find_socket(["now", "--socket=/b"]), "/b")
+
+
+if __name__ == "__main__":
+    unittest.main()
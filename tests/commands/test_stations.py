@@ -0,0 +1,45 @@
+import unittest
+from argparse import Namespace
+from io import StringIO
+from unittest.mock import patch
+from ephem.commands import stations
+from ephem.sweph.julian import date_to_jd
+from ephem.sweph.search import brent, find_stations
+
+
+class TestStations(unittest.TestCase):
+    def test_brent(self):
+        """Brent's method converges on a bracketed root."""
+        root = brent(lambda x: x * x - 2, 0, 2, tol=1e-12)
+        self.assertAlmostEqual(root, 2**0.5, places=10)
+
+    def test_brent_requires_bracket(self):
+        with self.assertRaises(ValueError):
+            brent(lambda x: x * x + 1, 0, 2)
+
+    def test_find_mercury_stations(self):
+        """Mercury's March 2025 retrograde stations land on the right minute."""
+        found = find_stations(date_to_jd("2025-03-01"), date_to_jd("2025-04-30"), ["hg"])
+        self.assertEqual([direction for _, _, direction in found], ["SR", "SD"])
+
+        sr_jd = found[0][0]
+        expected = date_to_jd("2025-03-15") + (6 + 46 / 60) / 24
+        self.assertAlmostEqual(sr_jd, expected, delta=2 / 1440)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_run_ascii(self, mock_stdout):
+        args = Namespace(start="2025-03-01", end="2025-03-20", ascii=True)
+        stations.run(args)
+        output = mock_stdout.getvalue().splitlines()
+        self.assertIn("2025-03-15 06:46 UTC  Mercury  SR", output[-1])
+
+    @patch("sys.stderr", new_callable=StringIO)
+    def test_run_reversed_range(self, mock_stderr):
+        args = Namespace(start="2025-03-20", end="2025-03-01", ascii=False)
+        with self.assertRaises(SystemExit):
+            stations.run(args)
+        self.assertIn("END must be after START", mock_stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import argparse
+import csv
+import io
+import unittest
+from unittest.mock import patch
+import numpy as np
+from ephem import db
+from ephem.cli import parse_arguments
+from ephem.commands import synastry
+from ephem.sweph.aspects import synastry_scores
+from ephem.sweph.stored import BODIES, load_longitudes
+from tests.helpers import TempDatabaseMixin
+
+CHARTS = [
+    ("Jean Cremers", "1957-03-14T18:55:00+00:00"),
+    ("Walter Pullen", "1971-11-19T19:01:00+00:00"),
+    ("Nick Cave", "1957-09-22T02:20:00+00:00"),
+    ("Jeon Soyeon", "1998-08-26T08:20:00+00:00"),
+    ("Kevin DeCapite", "1976-11-29T17:32:00+00:00"),
+]
+
+
+class TestSynastry(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        db.add_charts((name, stamp, stamp, None, None) for name, stamp in CHARTS)
+
+    def edges(self, ids=(), all=False, min_aspects=1, min_score=0.0):
+        args = argparse.Namespace(
+            ids=list(ids),
+            all=all,
+            min_aspects=min_aspects,
+            min_score=min_score,
+            jobs=1,
+            output=None,
+        )
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            synastry.main(args)
+        rows = list(csv.reader(io.StringIO(stdout.getvalue())))
+        self.assertEqual(rows[0], synastry.EDGE_FIELDS)
+        return [(int(a), int(b), int(n), float(s)) for a, b, n, s in rows[1:]]
+
+    def test_get_tiles_cover_each_pair_once(self):
+        pairs = [
+            (i, j)
+            for a0, a1, b0, b1 in synastry.get_tiles(10, tile_size=3)
+            for i in range(a0, a1)
+            for j in range(b0, b1)
+            if i < j
+        ]
+        self.assertEqual(len(pairs), 45)
+        self.assertEqual(len(set(pairs)), 45)
+
+    def test_all_pairs(self):
+        ids, lngs = load_longitudes()
+        self.assertEqual(ids.tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(lngs.shape, (5, len(BODIES)))
+
+        counts, scores = synastry_scores(lngs, lngs)
+        edges = self.edges(all=True)
+        self.assertEqual(
+            [(a, b) for a, b, _, _ in edges],
+            [(a, b) for a in range(1, 6) for b in range(a + 1, 6)],
+        )
+        for a, b, n, score in edges:
+            self.assertEqual(n, counts[a - 1, b - 1])
+            self.assertAlmostEqual(score, scores[a - 1, b - 1], places=3)
+
+        strong = self.edges(all=True, min_score=10)
+        self.assertEqual(strong, [edge for edge in edges if edge[3] >= 10])
+
+    def test_ids_against_all(self):
+        edges = self.edges(ids=[3])
+        self.assertEqual(
+            [(a, b) for a, b, _, _ in edges], [(3, 1), (3, 2), (3, 4), (3, 5)]
+        )
+        self.assertEqual(edges[0][2:], self.edges(all=True)[1][2:])
+
+    def test_ids_list_each_pair_once(self):
+        """Two requested charts are paired once, repeated IDs count once."""
+        edges = self.edges(ids=[2, 1, 2])
+        pairs = [(a, b) for a, b, _, _ in edges]
+        self.assertEqual(
+            pairs, [(2, 1), (2, 3), (2, 4), (2, 5), (1, 3), (1, 4), (1, 5)]
+        )
+        self.assertEqual(len({frozenset(pair) for pair in pairs}), len(pairs))
+
+    @patch("ephem.utils.output.os.dup2")
+    def test_broken_pipe(self, mock_dup2):
+        """A reader that quits early stops the edge list without a traceback."""
+
+        class ClosedPipe(io.StringIO):
+            def write(self, text):
+                raise BrokenPipeError
+
+        args = argparse.Namespace(
+            ids=[], all=True, min_aspects=0, min_score=0, jobs=1, output=None
+        )
+        with patch("sys.stdout", new_callable=ClosedPipe) as stdout:
+            stdout.fileno = lambda: 1
+            synastry.main(args)
+        self.assertEqual(mock_dup2.call_args.args[1], 1)
+
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_default_thresholds_thin_output(self, _):
+        """By default only strong pairs are listed, not every pair."""
+        args = parse_arguments(["data", "synastry", "--all"])
+        edges = self.edges(
+            all=True, min_aspects=args.min_aspects, min_score=args.min_score
+        )
+        every = self.edges(all=True, min_aspects=0, min_score=0)
+        self.assertEqual(len(every), 10)
+        self.assertLess(len(edges), len(every))
+        self.assertTrue(all(edge[3] >= 25 for edge in edges))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.edges()
+        with self.assertRaises(ValueError):
+            self.edges(ids=[1], all=True)
+
+        db.delete_chart(2)
+        with self.assertRaisesRegex(ValueError, "chart\\(s\\) 2"):
+            self.edges(ids=[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from argparse import Namespace
+from io import StringIO
+from unittest.mock import patch
+import numpy as np
+from ephem.commands import transits
+from ephem.sweph.julian import date_to_jd
+from ephem.sweph.search import find_crossings, find_transits, grid_crossings
+
+CHART = {
+    "id": 1,
+    "name": "Test",
+    "timestamp_utc": "1990-06-15T12:00:00+00:00",
+    "latitude": 51.5,
+    "longitude": -0.12,
+}
+
+
+class TestTransits(unittest.TestCase):
+    def setUp(self):
+        self.args = Namespace(
+            id=1,
+            start="2025-03-01",
+            end="2025-04-01",
+            ascii=True,
+            classical=False,
+            node="true",
+            no_moon=True,
+            precomputed=False,
+        )
+
+    def test_equinox_conjunction(self):
+        """The transiting Sun conjoins a natal point at 0° Aries on the equinox."""
+        found = list(
+            find_transits(
+                {"ae": 0.0},
+                ["ae"],
+                date_to_jd("2025-03-01"),
+                date_to_jd("2025-04-01"),
+                aspects=["con"],
+            )
+        )
+        self.assertEqual(len(found), 1)
+        jd, moving_key, natal_key, aspect_key, forward = found[0]
+        self.assertEqual((moving_key, natal_key, aspect_key), ("ae", "ae", "con"))
+        self.assertTrue(forward)
+        expected = date_to_jd("2025-03-20") + (9 + 1 / 60) / 24
+        self.assertAlmostEqual(jd, expected, delta=2 / 1440)
+
+    def test_matches_adaptive_search(self):
+        """Grid sampling finds the same crossings as the adaptive search,
+        including the three passes of a retrograde Mercury."""
+        targets = np.arange(0, 360, 7.5)
+        jd_start, jd_end = date_to_jd("2025-01-01"), date_to_jd("2026-01-01")
+        expected = sorted(
+            jd for jd, _, _ in find_crossings("hg", targets, jd_start, jd_end)
+        )
+        found, _, _ = grid_crossings("hg", targets, jd_start, jd_end)
+        self.assertEqual(len(found), len(expected))
+        np.testing.assert_allclose(np.sort(found), expected, atol=1 / 1440)
+
+    def test_windows_do_not_duplicate(self):
+        """Hits are unique and ordered across the yearly search windows."""
+        natal = {"ae": 100.0, "ag": 200.0}
+        found = list(
+            find_transits(
+                natal, ["ae", "cu"], date_to_jd("2024-01-01"), date_to_jd("2027-01-01")
+            )
+        )
+        self.assertEqual(found, sorted(set(found)))
+
+    @patch("ephem.commands.transits.get_chart", return_value=CHART)
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_run_sorted_output(self, mock_stdout, _):
+        transits.run(self.args)
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertTrue(lines)
+        self.assertEqual(lines, sorted(lines))
+        self.assertTrue(all(" natal " in line for line in lines))
+        self.assertFalse(any("Moon      " in line[:32] for line in lines))
+
+    @patch("ephem.commands.transits.get_chart", return_value=None)
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_missing_chart(self, mock_stdout, _):
+        transits.run(self.args)
+        self.assertIn("No chart found with ID 1", mock_stdout.getvalue())
+
+    @patch("ephem.commands.transits.get_chart", return_value=CHART)
+    def test_natal_points(self, _):
+        self.args.classical = True
+        natal = transits.get_natal_points(CHART, self.args)
+        self.assertIn("asc", natal)
+        self.assertIn("true_node", natal)
+        self.assertNotIn("mean_node", natal)
+        self.assertNotIn("plu", natal)
+
+
+if __name__ == "__main__":
+    unittest.main()
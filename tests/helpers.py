@@ -0,0 +1,28 @@
+import os
+import tempfile
+from unittest.mock import patch
+from ephem import db
+
+
+class TempDatabaseMixin:
+    """
+    Point ephem at a fresh database in a temporary directory for every
+    test, as self.path inside self.tmpdir. Tables are created up front
+    unless the class sets create_tables = False.
+    """
+
+    create_tables = True
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "ephem.db")
+        env = patch.dict(os.environ, {"EPHEM_DB": self.path})
+        env.start()
+        self.addCleanup(env.stop)
+        # cleanups run last in, first out: connections close before the
+        # environment is restored and the directory removed
+        self.addCleanup(db.close_connections)
+        if self.create_tables:
+            db.create_tables()
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from ephem.sweph import get_planets, build_horoscope
+from ephem.sweph.aspects import (
+    NO_ASPECT,
+    aspect_matrix,
+    count_aspects,
+    get_aspect_table,
+    get_aspects,
+    separation_matrix,
+    synastry_scores,
+)
+
+
+class TestAspects(unittest.TestCase):
+    def setUp(self):
+        self.keys, _, _ = get_aspect_table()
+
+    def kind(self, key):
+        return self.keys.index(key)
+
+    def test_separation_wraps(self):
+        """Separation is measured the short way round the zodiac."""
+        sep = separation_matrix([359.0, 1.0])
+        self.assertAlmostEqual(sep[0, 1], 2.0)
+        self.assertAlmostEqual(sep[1, 0], -2.0)
+
+    def test_aspect_kinds(self):
+        lngs = [0.0, 62.0, 178.0, 215.0]
+        kinds, deviation, _ = aspect_matrix(lngs)
+        self.assertEqual(kinds[0, 1], self.kind("sex"))
+        self.assertEqual(kinds[0, 2], self.kind("opp"))
+        self.assertEqual(kinds[1, 3], NO_ASPECT)  # 153° is out of every orb
+        self.assertAlmostEqual(deviation[0, 1], 2.0)
+
+    def test_orbs_and_aspect_set(self):
+        lngs = [0.0, 62.0]
+        kinds, _, _ = aspect_matrix(lngs, orbs={"sex": 1})
+        self.assertEqual(kinds[0, 1], NO_ASPECT)
+        kinds, _, _ = aspect_matrix(lngs, aspects=["con", "opp"])
+        self.assertEqual(kinds[0, 1], NO_ASPECT)
+        with self.assertRaises(ValueError):
+            aspect_matrix(lngs, aspects=["quincunx"])
+
+    def test_applying_and_separating(self):
+        """A faster body behind an exact trine applies; ahead of it, separates."""
+        kinds, _, applying = aspect_matrix([0.0, 118.0], [0.0, 1.0])
+        self.assertEqual(kinds[0, 1], self.kind("tri"))
+        self.assertTrue(applying[0, 1])
+        _, _, applying = aspect_matrix([0.0, 122.0], [0.0, 1.0])
+        self.assertFalse(applying[0, 1])
+        # retrograde motion reverses the picture
+        _, _, applying = aspect_matrix([0.0, 122.0], [0.0, -1.0])
+        self.assertTrue(applying[0, 1])
+
+    def test_many_charts(self):
+        """A stack of charts produces a stack of matrices."""
+        lngs = np.array([[0.0, 90.0, 180.0], [0.0, 45.0, 165.0]])
+        kinds, _, _ = aspect_matrix(lngs)
+        self.assertEqual(kinds.shape, (2, 3, 3))
+        np.testing.assert_array_equal(count_aspects(lngs), [3, 1])
+
+    def test_cross_charts(self):
+        counts = count_aspects([[0.0, 90.0]], others=[[0.0, 120.0]])
+        self.assertEqual(counts[0], 3)
+
+    def test_synastry_scores(self):
+        """Every chart in one stack against every chart in the other."""
+        rng = np.random.default_rng(0)
+        lngs = rng.uniform(0, 360, (5, 11))
+        others = rng.uniform(0, 360, (7, 11))
+        counts, scores = synastry_scores(lngs, others)
+        self.assertEqual(counts.shape, (5, 7))
+        for i in range(5):
+            np.testing.assert_array_equal(
+                counts[i], count_aspects(lngs[i : i + 1], others=others)
+            )
+
+        # an exact trine scores 1, a conjunction 2° wide of its 8° orb 0.75
+        counts, scores = synastry_scores([[0.0]], [[120.0], [358.0]])
+        np.testing.assert_array_equal(counts, [[1, 1]])
+        np.testing.assert_allclose(scores, [[1.0, 0.75]], atol=1e-6)
+
+    def test_get_aspects(self):
+        planets = get_planets(2460754.0)
+        horoscope = build_horoscope(planets, [], [])
+        matches = get_aspects(horoscope, keys=["ae", "ag", "hg", "cu"])
+        for match in matches:
+            self.assertLessEqual(match.orb, match.aspect.orb)
+            self.assertIsNotNone(match.applying)
+
+
+if __name__ == "__main__":
+    unittest.main()
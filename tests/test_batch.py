@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch
+import swisseph as swe
+from ephem.sweph import get_planets, get_planets_batch
+from ephem.sweph.batch import FILE_ORIGIN, FILE_SPAN, file_span, positions_from_batch
+from ephem.sweph.planets import PLANET_KEYS
+
+
+class TestPlanetsBatch(unittest.TestCase):
+    def setUp(self):
+        self.jds = [2460000.5, 2460000.75, 2460031.5]
+
+    def test_shape_and_fields(self):
+        """Batch output has one row per Julian day and one column per body."""
+        result = get_planets_batch(self.jds)
+        self.assertEqual(result.shape, (3, len(PLANET_KEYS)))
+        self.assertEqual(result.dtype.names, ("lng", "lat", "dist", "speed"))
+
+    def test_matches_get_planets(self):
+        """Batch longitudes agree with the single-chart path."""
+        result = get_planets_batch(self.jds)
+        for row, jd in zip(result, self.jds):
+            planets = get_planets(jd)
+            for position, record in zip(planets, row):
+                self.assertAlmostEqual(position.lng, record["lng"], places=9)
+                self.assertAlmostEqual(position.speed, record["speed"], places=9)
+
+    def test_ephemeris_file_per_span(self):
+        """
+        Only the file for 1800-2400 CE is present, so the middle of a batch
+        whose ends fall outside it is still calculated from the file.
+        """
+        calls = []
+        calc_ut = swe.calc_ut
+
+        def fake_calc_ut(jd, planet_id, flag):
+            calls.append((file_span(jd), flag & swe.FLG_MOSEPH))
+            values = calc_ut(jd, planet_id, swe.FLG_MOSEPH | swe.FLG_SPEED)[0]
+            covered = file_span(jd) == 0 and not flag & swe.FLG_MOSEPH
+            return values, swe.FLG_SWIEPH if covered else swe.FLG_MOSEPH
+
+        jds = [FILE_ORIGIN + FILE_SPAN * (span + 0.5) for span in (-1, 0, 0, 1, 1)]
+        with patch("ephem.sweph.batch.swe.calc_ut", side_effect=fake_calc_ut):
+            get_planets_batch(jds, keys=["ae", "ag"])
+
+        # one probe per body in each file, then Moshier outright without one
+        moshier = [span for span, fallback in calls if fallback]
+        self.assertEqual(moshier, [1, 1])
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(
+            [span for span, fallback in calls if not fallback],
+            [-1, -1, 0, 0, 0, 0, 1, 1],
+        )
+
+    def test_key_subset(self):
+        """Only the requested bodies are computed, in the requested order."""
+        result = get_planets_batch(self.jds, keys=["ag", "ae"])
+        self.assertEqual(result.shape, (3, 2))
+        moon, sun = positions_from_batch(result[0], keys=["ag", "ae"])
+        self.assertEqual(moon.obj.key, "ag")
+        self.assertEqual(sun.obj.key, "ae")
+        self.assertFalse(sun.rx)
+
+    def test_sidereal_offset(self):
+        """Sidereal batches are shifted back from tropical ones."""
+        tropical = get_planets_batch(self.jds, keys=["ae"])["lng"]
+        sidereal = get_planets_batch(self.jds, offset=1, keys=["ae"])["lng"]
+        shift = (tropical - sidereal) % 360
+        self.assertTrue(((shift > 23) & (shift < 25)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+import os
+import sqlite3
+import unittest
+from unittest.mock import patch
+from ephem import db
+from tests.helpers import TempDatabaseMixin
+
+
+class TestConnection(TempDatabaseMixin, unittest.TestCase):
+    def count(self):
+        with sqlite3.connect(self.path) as other:
+            return other.execute("SELECT COUNT(*) FROM charts").fetchone()[0]
+
+    def test_connection_is_reused_and_tuned(self):
+        conn = db.get_connection()
+        self.assertIs(db.get_connection(), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        # NORMAL
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+    def test_new_process_gets_new_connection(self):
+        conn = db.get_connection()
+        with patch("os.getpid", return_value=os.getpid() + 1):
+            self.assertIsNot(db.get_connection(), conn)
+
+    def test_transaction_groups_writes(self):
+        with db.transaction():
+            db.add_chart("A", "2000-01-01T12:00:00+00:00", "2000-01-01T12:00:00")
+            db.add_chart("B", "2000-01-02T12:00:00+00:00", "2000-01-02T12:00:00")
+            # nothing is visible to other connections until the block ends
+            self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with db.transaction():
+                db.add_chart("A", "2000-01-01T12:00:00+00:00", "2000-01-01T12:00:00")
+                raise RuntimeError
+        self.assertEqual(self.count(), 0)
+        self.assertEqual(db.view_charts(), [])
+
+    def test_after_commit(self):
+        calls = []
+        with db.transaction() as conn:
+            db.after_commit(conn, calls.append, "a")
+            db.after_commit(conn, calls.append, "a")
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ["a"])
+
+        with self.assertRaises(RuntimeError):
+            with db.transaction() as conn:
+                db.after_commit(conn, calls.append, "b")
+                raise RuntimeError
+        with db.transaction():
+            pass
+        self.assertEqual(calls, ["a"])
+
+    def test_single_writes_commit(self):
+        chart_id = db.add_chart("A", "2000-01-01T12:00:00+00:00", "2000-01-01")
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(db.get_chart(chart_id)["name"], "A")
+        self.assertTrue(db.delete_chart(chart_id))
+        self.assertEqual(self.count(), 0)
+
+
+class TestSearch(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        for chart in [
+            ("Nick Cave", "1957-09-22T02:20:00+00:00", -36.25, 142.416667),
+            ("Jeon Soyeon", "1998-08-26T08:20:00+00:00", 37.488167, 127.085472),
+            ("Jean Cremers", "1957-03-14T18:55:00+00:00", 52.0, 6.0),
+            ("Walter Pullen", "1971-11-19T19:01:00+00:00", 47.6, -122.33),
+        ]:
+            name, stamp, lat, lng = chart
+            db.add_chart(name, stamp, stamp, lat, lng)
+
+    def names(self, **filters):
+        return [chart["name"] for chart in db.search_charts(**filters)]
+
+    def test_name(self):
+        self.assertEqual(self.names(name="jea"), ["Jean Cremers"])
+        self.assertEqual(
+            self.names(name="e"),
+            ["Nick Cave", "Jeon Soyeon", "Jean Cremers", "Walter Pullen"],
+        )
+        self.assertEqual(self.names(name="%"), [])
+
+    def test_name_index_follows_changes(self):
+        conn = db.get_connection()
+        conn.execute("UPDATE charts SET name = 'Jean Smith' WHERE id = 3")
+        db.delete_chart(2)
+        self.assertEqual(self.names(name="jeon"), [])
+        self.assertEqual(self.names(name="Smith"), ["Jean Smith"])
+
+    def test_add_charts(self):
+        stamp = "2001-01-01T00:00:00+00:00"
+        inserted = db.add_charts(
+            (f"Bulk {i}", stamp, stamp, None, None) for i in range(3)
+        )
+        self.assertEqual(inserted, 3)
+        self.assertEqual(self.names(name="bulk"), ["Bulk 0", "Bulk 1", "Bulk 2"])
+
+        # the name index trigger is back for single inserts
+        db.add_chart("Bulk 3", stamp, stamp)
+        self.assertEqual(len(self.names(name="bulk")), 4)
+
+    def test_iter_charts_pages(self):
+        ids = [chart["id"] for chart in db.iter_charts()]
+        self.assertEqual(ids, [1, 2, 3, 4])
+        self.assertEqual([c["id"] for c in db.iter_charts(limit=2, offset=1)], [2, 3])
+        self.assertEqual([c["id"] for c in db.iter_charts(after_id=3)], [4])
+
+    def test_dates_and_box(self):
+        self.assertEqual(
+            self.names(start="1957-01-01", end="1958-01-01"),
+            ["Nick Cave", "Jean Cremers"],
+        )
+        self.assertEqual(
+            self.names(bbox=(30, -130, 60, 10)), ["Jean Cremers", "Walter Pullen"]
+        )
+        # crossing the antimeridian
+        self.assertEqual(
+            self.names(bbox=(-40, 120, 60, -120)),
+            ["Nick Cave", "Jeon Soyeon", "Walter Pullen"],
+        )
+        self.assertEqual(
+            self.names(name="cave", start="1950", bbox=(-40, 120, 60, -120), limit=1),
+            ["Nick Cave"],
+        )
+
+
+class TestPositions(TempDatabaseMixin, unittest.TestCase):
+    def positions(self, chart_id):
+        rows = db.get_connection().execute(
+            "SELECT body, longitude, sign, rx FROM chart_positions WHERE chart_id = ?",
+            (chart_id,),
+        )
+        return {body: (lng, sign, rx) for body, lng, sign, rx in rows}
+
+    def test_add_chart_indexes_positions(self):
+        chart_id = db.add_chart(
+            "Test", "1990-06-15T11:00:00+00:00", "1990-06-15T12:00:00+01:00"
+        )
+        positions = self.positions(chart_id)
+        self.assertEqual(len(positions), 12)
+        # Sun in Gemini, Moon in Pisces, Mercury direct
+        self.assertAlmostEqual(positions["ae"][0], 84.0898, places=3)
+        self.assertEqual(positions["ae"][1], 2)
+        self.assertEqual(positions["ag"][1], 11)
+        self.assertEqual(positions["hg"][2], 0)
+
+        db.delete_chart(chart_id)
+        self.assertEqual(self.positions(chart_id), {})
+
+    def test_add_charts_and_backfill(self):
+        stamp = "2024-04-10T00:00:00+00:00"
+        db.add_charts(
+            [("A", stamp, stamp, None, None), ("B", "bad", "bad", None, None)]
+        )
+        # Mercury stations retrograde on 2024-04-01
+        self.assertEqual(self.positions(1)["hg"][2], 1)
+        self.assertEqual(self.positions(2), {})
+
+        conn = db.get_connection()
+        conn.execute("DELETE FROM chart_positions")
+        conn.commit()
+        self.assertEqual(db.backfill_positions(), 2)
+        self.assertEqual(len(self.positions(1)), 12)
+        self.assertEqual(db.backfill_positions(), 1)
+
+    def test_add_charts_in_chunks_and_pool(self):
+        """Bulk positions match single-chart ones, with or without the pool."""
+        stamps = [f"{1950 + i}-0{1 + i % 9}-15T06:00:00+00:00" for i in range(7)]
+        single = db.add_chart("Single", stamps[3], stamps[3])
+
+        with patch("ephem.db.POSITION_CHUNK", 2):
+            db.add_charts((f"C{i}", s, s, None, None) for i, s in enumerate(stamps))
+        with (
+            patch("ephem.db.POSITION_POOL_MIN", 1),
+            patch("ephem.db.os.cpu_count", return_value=2),
+        ):
+            db.add_charts((f"P{i}", s, s, None, None) for i, s in enumerate(stamps))
+
+        self.assertEqual(self.positions(single), self.positions(single + 4))
+        for i in range(7):
+            self.assertEqual(self.positions(2 + i), self.positions(9 + i))
+            self.assertEqual(len(self.positions(9 + i)), 12)
+
+
+class TestContentHash(TempDatabaseMixin, unittest.TestCase):
+    create_tables = False
+
+    def test_chart_hash(self):
+        chart = ("A", "2000-01-01T12:00:00+00:00", "2000-01-01T12:00:00+00:00")
+        self.assertEqual(db.chart_hash(*chart, 52, 6), db.chart_hash(*chart, 52.0, 6.0))
+        self.assertNotEqual(db.chart_hash(*chart), db.chart_hash(*chart, 0.0, 0.0))
+        self.assertNotEqual(db.chart_hash(*chart), db.chart_hash("B", *chart[1:]))
+
+    def save_old_chart(self, stamp):
+        # the charts table as versions before the hash column made it
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE charts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    timestamp_utc TEXT NOT NULL,
+                    timestamp_input TEXT NOT NULL,
+                    latitude REAL,
+                    longitude REAL
+                )
+            """)
+            conn.execute(
+                "INSERT INTO charts (name, timestamp_utc, timestamp_input) "
+                "VALUES ('Old', ?, ?)",
+                (stamp, stamp),
+            )
+        conn.close()
+
+    def test_older_database_and_outside_edits(self):
+        stamp = "2000-01-01T12:00:00+00:00"
+        self.save_old_chart(stamp)
+
+        db.create_tables()
+        db.add_chart("New", stamp, stamp, 52, 6)
+        self.assertEqual(
+            db.content_hashes(),
+            {
+                db.chart_hash("Old", stamp, stamp),
+                db.chart_hash("New", stamp, stamp, 52, 6),
+            },
+        )
+
+        # an edit made without ephem is hashed again on the next lookup
+        with sqlite3.connect(self.path) as other:
+            other.execute("UPDATE charts SET name = 'Renamed' WHERE id = 1")
+        other.close()
+        self.assertIn(db.chart_hash("Renamed", stamp, stamp), db.content_hashes())
+
+    def test_older_database_upgraded_on_open(self):
+        self.save_old_chart("2000-01-01T12:00:00+00:00")
+        # a read is enough; nothing calls create_tables first
+        self.assertEqual([chart["name"] for chart in db.search_charts("Old")], ["Old"])
+        conn = db.get_connection()
+        self.assertTrue(db.has_name_index(conn))
+        self.assertTrue(db.has_position_index(conn))
+        self.assertEqual(db.schema_version(conn), db.SCHEMA_VERSION)
+
+        db.close_connections()
+        with patch("ephem.db.create_schema") as mock_create_schema:
+            db.get_connection()
+        mock_create_schema.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+import numpy as np
+from ephem.sweph import get_planets, get_planets_batch
+from ephem.sweph.pool import EphemerisPool, shard_by_offset
+from ephem.sweph.search import find_ingresses
+
+
+class TestSiderealThreads(unittest.TestCase):
+    def test_threads_keep_their_offset(self):
+        """Threads on different ayanamsas never see each other's mode."""
+        jd = 2460000.5
+        expected = {
+            offset: [p.lng for p in get_planets(jd, offset)] for offset in (0, 1, 3)
+        }
+        errors = []
+
+        def work(offset):
+            for _ in range(200):
+                lngs = [p.lng for p in get_planets(jd, offset)]
+                if lngs != expected[offset]:
+                    errors.append(offset)
+                    return
+
+        threads = [threading.Thread(target=work, args=(o,)) for o in expected]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_interleaved_searches(self):
+        """Searches on different ayanamsas can be advanced in turns."""
+        jd_start, jd_end = 2460000.5, 2460060.5
+        expected = [
+            list(find_ingresses("ag", jd_start, jd_end, offset)) for offset in (0, 1)
+        ]
+        searches = [find_ingresses("ag", jd_start, jd_end, offset) for offset in (0, 1)]
+        found = [[], []]
+        for pair in zip(*searches):
+            for results, hit in zip(found, pair):
+                results.append(hit)
+        self.assertEqual(found, expected)
+
+
+class TestEphemerisPool(unittest.TestCase):
+    def test_shard_by_offset(self):
+        shards = shard_by_offset([None, 1, None, 0, 1])
+        self.assertEqual(shards, {None: [0, 2], 1: [1, 4], 0: [3]})
+
+    def test_matches_batch_in_input_order(self):
+        """Mixed offsets come back in input order with the right zodiac."""
+        jds = 2460000.5 + np.arange(12) * 3.5
+        offsets = [None, 0, 1] * 4
+        with EphemerisPool(max_workers=2, chunk_size=3) as pool:
+            result = pool.planets_batch(jds, offsets, keys=["ae", "ag"])
+
+        for row, (jd, offset) in enumerate(zip(jds, offsets)):
+            direct = get_planets_batch(jd, offset, keys=["ae", "ag"])[0]
+            np.testing.assert_allclose(result[row]["lng"], direct["lng"])
+
+    def test_offset_count_mismatch(self):
+        with EphemerisPool(max_workers=1) as pool:
+            with self.assertRaises(ValueError):
+                pool.planets_batch([2460000.5, 2460001.5], [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
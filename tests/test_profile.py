@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import swisseph as swe
+from ephem import sweph
+from ephem.profile import Profiler, pop_profile_option
+from ephem.sweph import core, planets
+
+
+class TestProfiler(unittest.TestCase):
+    def test_pop_profile_option(self):
+        self.assertEqual(pop_profile_option(["now", "-C"]), (None, ["now", "-C"]))
+        self.assertEqual(pop_profile_option(["--profile", "now"]), ("-", ["now"]))
+        self.assertEqual(
+            pop_profile_option(["cal", "--profile=out.json"]), ("out.json", ["cal"])
+        )
+
+    @patch("ephem.cli.dispatch")
+    @patch("ephem.cli.forward_to_daemon")
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_profile_is_an_exact_option(self, _, __, mock_dispatch):
+        """A chart name that merely contains --profile isn't profiled."""
+        from ephem import cli
+
+        with patch("sys.argv", ["ephem", "cast", "now", "x--profile"]):
+            with patch("ephem.profile.run_profiled") as mock_run_profiled:
+                cli.main()
+        mock_run_profiled.assert_not_called()
+        mock_dispatch.assert_called_once()
+
+    def test_patches_modules_as_they_are_imported(self):
+        """Install imports nothing; a target is timed once its module loads."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "profile_probe.py"), "w") as f:
+                f.write("def work():\n    return 42\n")
+            sys.path.insert(0, tmpdir)
+            self.addCleanup(sys.path.remove, tmpdir)
+            self.addCleanup(sys.modules.pop, "profile_probe", None)
+
+            profiler = Profiler(targets=[("probe", "profile_probe:work")])
+            profiler.install()
+            try:
+                self.assertNotIn("profile_probe", sys.modules)
+                from profile_probe import work
+
+                self.assertEqual(work(), 42)
+            finally:
+                profiler.uninstall()
+
+        self.assertNotIn(profiler.finder, sys.meta_path)
+        self.assertEqual(profiler.summary(), [("probe.work", 1, profiler.events[0][2])])
+
+    def test_counts_calls_and_restores(self):
+        """Stages are timed through every reference, then put back."""
+        original = planets.get_planets
+        profiler = Profiler()
+        profiler.install()
+        try:
+            self.assertIsNot(sweph.get_planets, original)
+            self.assertIs(sweph.get_planets, core.get_planets)
+            core.cast_horoscope(2451545.0)
+        finally:
+            profiler.uninstall()
+
+        self.assertIs(sweph.get_planets, original)
+        self.assertIs(core.get_planets, original)
+        self.assertFalse(hasattr(swe.calc_ut, "__wrapped__"))
+
+        calls = {name: count for name, count, _ in profiler.summary()}
+        self.assertEqual(calls["sweph.cast_horoscope"], 1)
+        self.assertEqual(calls["sweph.get_planets"], 1)
+        self.assertEqual(calls["swisseph.calc_ut"], 12)
+
+    def test_write_trace(self):
+        profiler = Profiler(targets=[])
+        with profiler.stage("total"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            profiler.write_trace(path)
+            with open(path) as f:
+                (event,) = json.load(f)["traceEvents"]
+
+        self.assertEqual(event["name"], "total")
+        self.assertEqual(event["ph"], "X")
+        self.assertGreaterEqual(event["dur"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime
+from ephem import db, sweph
+from ephem.query import Query, query_charts
+from tests.helpers import TempDatabaseMixin
+
+CHARTS = [
+    # name, UTC time: tropical Sun, Moon, Mars
+    ("A", "1990-04-01T12:00:00+00:00"),  # Aries, Gemini, Aquarius
+    ("B", "1990-04-05T12:00:00+00:00"),  # Aries, Leo, Aquarius
+    ("C", "2016-05-01T12:00:00+00:00"),  # Taurus, Aquarius, Sagittarius rx
+    ("D", "2000-04-10T12:00:00+00:00"),  # Aries, Cancer, Taurus
+]
+
+
+class TestQuery(unittest.TestCase):
+    def test_compile(self):
+        query = Query("Sun in Aries and (moon in water or not mars rx)")
+        self.assertEqual(
+            query.sql.count("SELECT chart_id FROM chart_positions WHERE body = ?"), 3
+        )
+        self.assertIn(" OR NOT ", query.sql)
+        self.assertEqual(query.params, ["ae", 0, "ag", 3, 7, 11, "fe", 1])
+
+        self.assertEqual(Query("mean node in can").params, ["mean_node", 3])
+        self.assertEqual(Query("node in cardinal").params, ["true_node", 0, 3, 6, 9])
+
+    def test_errors(self):
+        for text in ["", "sun", "sun in", "sun in cancr", "vulcan rx", "(sun rx"]:
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                Query(text)
+
+
+class TestQueryCharts(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        for name, stamp in CHARTS:
+            db.add_chart(name, stamp, stamp)
+
+    def names(self, text, offset=None):
+        return [chart["name"] for chart in query_charts(text, offset)]
+
+    def test_tropical(self):
+        self.assertEqual(self.names("sun in aries"), ["A", "B", "D"])
+        self.assertEqual(self.names("sun in aries and moon in water"), ["D"])
+        self.assertEqual(self.names("sun in ari and moon in air"), ["A"])
+        self.assertEqual(self.names("mars rx or moon in leo"), ["B", "C"])
+        self.assertEqual(self.names("not sun in fire"), ["C"])
+
+    def test_sidereal_matches_recast(self):
+        """Shifted longitudes agree with charts cast in the sidereal zodiac."""
+        for offset in (0, 1, 5):
+            expected = []
+            for name, stamp in CHARTS:
+                jd, _ = sweph.get_julian_days(datetime.fromisoformat(stamp), None)
+                sun = sweph.get_planets(jd, offset)[0]
+                if sun.sign.trip == "water":
+                    expected.append(name)
+
+            with self.subTest(offset=offset):
+                self.assertEqual(self.names("sun in water", offset), expected)
+                self.assertEqual(self.names("sun in pisces", offset), ["A", "B", "D"])
+
+    def test_unindexed_charts_never_match(self):
+        conn = db.get_connection()
+        conn.execute("DELETE FROM chart_positions WHERE chart_id = 3")
+        conn.commit()
+        self.assertEqual(db.count_unindexed_charts(), 1)
+        self.assertEqual(self.names("not sun in fire"), [])
+        self.assertNotIn("C", self.names("not sun in aries", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from argparse import Namespace
+from io import StringIO
+from unittest.mock import patch
+from ephem.commands import cast
+from ephem.constants import AYANAMSAS
+from ephem.sweph import get_angles, get_planets, get_sidereal_horoscopes
+
+
+def angular_diff(a, b):
+    return abs((a - b + 180) % 360 - 180)
+
+
+class TestSiderealHoroscopes(unittest.TestCase):
+    def setUp(self):
+        self.jd = 2460000.3
+        self.lat, self.lng = 51.5, -0.12
+        planets = get_planets(self.jd)
+        angles = get_angles(self.jd, self.lat, self.lng)
+        self.horoscopes = get_sidereal_horoscopes(self.jd, planets, angles)
+
+    def test_one_per_ayanamsa(self):
+        """Every ayanamsa gets a horoscope, in index order."""
+        self.assertEqual([name for name, _ in self.horoscopes], list(AYANAMSAS))
+
+    def test_matches_sidereal_calculation(self):
+        """Shifted positions agree with a full FLG_SIDEREAL calculation."""
+        for offset in (0, 1, 5):
+            _, horoscope = self.horoscopes[offset]
+            for position in get_planets(self.jd, offset):
+                shifted = horoscope[position.obj.key]
+                self.assertLess(angular_diff(shifted.lng, position.lng), 1e-6)
+                self.assertEqual(shifted.rx, position.rx)
+            for angle in get_angles(self.jd, self.lat, self.lng, offset):
+                shifted = horoscope[angle.obj.key]
+                self.assertLess(angular_diff(shifted.lng, angle.lng), 1e-6)
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_cast_offset_all(self, mock_stdout):
+        args = Namespace(
+            event=["2023-02-24", "19:12", "Test"],
+            timezone=None,
+            lat=self.lat,
+            lng=self.lng,
+            offset="all",
+            save=False,
+            command="cast",
+            no_color=True,
+            no_geo=False,
+            no_angles=False,
+            classical=False,
+            theme="sect",
+            ascii=True,
+            node="true",
+            speed=False,
+        )
+        cast.run(args)
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertIn("Tropical and all sidereal", lines[0])
+        self.assertEqual(lines[2].split()[:2], ["Sun", "Moon"])
+        self.assertIn("Tropical", lines[3])
+        self.assertIn(" 1 Lahiri", lines[5])
+        self.assertEqual(len(lines), 4 + len(AYANAMSAS))
+
+
+if __name__ == "__main__":
+    unittest.main()
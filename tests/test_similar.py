@@ -0,0 +1,95 @@
+import io
+import unittest
+from unittest.mock import patch
+import numpy as np
+from ephem import db, similar
+from ephem.cli import parse_arguments
+from ephem.sweph.stored import load_longitudes
+from tests.helpers import TempDatabaseMixin
+
+CHARTS = [
+    ("A", "1990-04-01T12:00:00+00:00"),
+    ("B", "1990-04-05T12:00:00+00:00"),
+    ("C", "2016-05-01T12:00:00+00:00"),
+    ("D", "2000-04-10T12:00:00+00:00"),
+    ("E", "1990-04-01T18:00:00+00:00"),
+]
+
+
+class TestSimilar(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        for name, stamp in CHARTS:
+            db.add_chart(name, stamp, stamp)
+
+    def ids(self, chart_id, k=10):
+        return [match[0] for match in similar.similar_charts(chart_id, k)]
+
+    def indexed(self):
+        return similar.read_index()["id"].tolist()
+
+    def test_nearest_match_brute_force(self):
+        ids, lngs = load_longitudes()
+        for chart_id in ids.tolist():
+            with self.subTest(chart_id=chart_id):
+                target = lngs[ids == chart_id][0]
+                mean_cos = np.cos(np.radians(lngs - target)).mean(axis=1)
+                order = [
+                    i for i in ids[np.argsort(-mean_cos)].tolist() if i != chart_id
+                ]
+                self.assertEqual(self.ids(chart_id), order)
+
+        # six hours apart, A and E differ by little more than the Moon
+        (best, score), _ = similar.similar_charts(1, 2)
+        self.assertEqual(best, 5)
+        self.assertGreater(score, 0.99)
+        with self.assertRaises(ValueError):
+            similar.similar_charts(99)
+
+    @patch("sys.stderr", new_callable=io.StringIO)
+    @patch("ephem.cli.load_config_defaults", return_value={})
+    def test_k_at_least_one(self, _, mock_stderr):
+        for k in (0, -3):
+            with self.subTest(k=k):
+                with self.assertRaises(ValueError):
+                    similar.similar_charts(1, k)
+                with self.assertRaises(SystemExit):
+                    parse_arguments(["data", "similar", "1", "-k", str(k)])
+        self.assertIn("Must be at least 1", mock_stderr.getvalue())
+
+    def test_follows_add_and_delete(self):
+        self.assertFalse(db.get_similar_path().exists())
+        self.ids(1)
+        self.assertEqual(self.indexed(), [1, 2, 3, 4, 5])
+
+        chart_id = db.add_chart("A again", CHARTS[0][1], CHARTS[0][1])
+        self.assertEqual(self.indexed(), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(similar.similar_charts(1, 1), [(chart_id, 1.0)])
+
+        db.delete_chart(2)
+        self.assertEqual(self.indexed(), [1, 0, 3, 4, 5, 6])
+        self.assertNotIn(2, self.ids(1))
+
+        # nothing is indexed for a write that rolls back
+        with self.assertRaises(RuntimeError):
+            with db.transaction():
+                db.add_chart("Gone", CHARTS[0][1], CHARTS[0][1])
+                raise RuntimeError
+        self.assertEqual(len(self.indexed()), 6)
+
+    def test_repairs_changes_made_around_it(self):
+        self.ids(1)
+        conn = db.get_connection()
+        conn.execute("DELETE FROM chart_positions WHERE chart_id IN (1, 2, 3)")
+        conn.commit()
+        self.assertEqual(self.ids(4), [5])
+        # fewer live records than deleted ones: compacted
+        self.assertEqual(self.indexed(), [4, 5])
+
+        db.backfill_positions()
+        self.assertEqual(sorted(self.ids(4)), [1, 2, 3, 5])
+        self.assertEqual(self.indexed(), [1, 2, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from ephem.display.chart import format_speed
+from ephem.sweph import get_planets
+from ephem.sweph.planets import (
+    MEAN_SPEEDS,
+    PLANET_KEYS,
+    STATION_RATIO,
+    is_stationary,
+    make_position,
+)
+
+
+class TestIsStationary(unittest.TestCase):
+    def test_below_ratio(self):
+        """A body moving under STATION_RATIO of its mean speed is stationary."""
+        threshold = MEAN_SPEEDS["hg"] * STATION_RATIO
+        self.assertTrue(is_stationary("hg", threshold * 0.9))
+        self.assertTrue(is_stationary("hg", -threshold * 0.9))
+        self.assertFalse(is_stationary("hg", threshold * 1.1))
+        self.assertFalse(is_stationary("hg", -threshold * 1.1))
+
+    def test_threshold_scales_with_mean_speed(self):
+        """The same speed can be a station for Mercury but not for Pluto."""
+        self.assertTrue(is_stationary("hg", 0.01))
+        self.assertFalse(is_stationary("plu", 0.01))
+
+    def test_unknown_speed_or_body(self):
+        self.assertFalse(is_stationary("hg", None))
+        self.assertFalse(is_stationary("asc", 0.0))
+
+    def test_mercury_station(self):
+        """Mercury stations retrograde on 2024-04-01 at about 22:14 UTC."""
+        planets = dict(zip(PLANET_KEYS, get_planets(2460402.4264)))
+        self.assertTrue(is_stationary("hg", planets["hg"].speed))
+        self.assertFalse(is_stationary("ae", planets["ae"].speed))
+
+
+class TestFormatSpeed(unittest.TestCase):
+    def test_direct(self):
+        position = make_position("ae", 10.0, speed=0.9856)
+        self.assertEqual(format_speed(position), "+ 0°59'08\"")
+
+    def test_retrograde_ascii(self):
+        position = make_position("ag", 10.0, speed=-13.5)
+        self.assertEqual(format_speed(position, ascii_mode=True), "-13d30'00\"")
+
+    def test_stationary_marker(self):
+        position = make_position("hg", 10.0, speed=-0.001)
+        self.assertEqual(format_speed(position, ascii_mode=True), "- 0d00'04\" S")
+
+    def test_no_speed(self):
+        position = make_position("ae", 10.0)
+        self.assertEqual(format_speed(position), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# cumulative import time allowed for `ephem now --no-color`, in milliseconds
+STARTUP_BUDGET_MS = float(os.environ.get("EPHEM_STARTUP_BUDGET_MS", 200))
+
+# modules that only some commands need and `now` must not pay for
+LAZY_MODULES = ["rich", "numpy", "sqlite3"]
+
+
+def import_times(*args):
+    """Run the CLI under -X importtime and return {module: cumulative us}."""
+    with tempfile.TemporaryDirectory() as config_home:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(SRC), env.get("PYTHONPATH")])
+        )
+        env["XDG_CONFIG_HOME"] = config_home
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "ephem.cli", *args],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.times = import_times("now", "--no-color")
+
+    def test_heavy_modules_stay_lazy(self):
+        imported = {name.strip() for name in self.times}
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, imported, f"`ephem now` imported {module}")
+
+    def test_import_budget(self):
+        """Top-level imports of `ephem now --no-color` stay within budget."""
+        top_level = [us for name, us in self.times.items() if not name.startswith("  ")]
+        total_ms = sum(top_level) / 1000
+        self.assertLess(
+            total_ms,
+            STARTUP_BUDGET_MS,
+            f"imports took {total_ms:.0f} ms, budget is {STARTUP_BUDGET_MS:.0f} ms",
+        )
+
+
+class TestDataFormats(unittest.TestCase):
+    def test_cal_csv_skips_rich(self):
+        imported = {name.strip() for name in import_times("cal", "-f", "csv")}
+        self.assertNotIn("rich", imported)
+
+
+if __name__ == "__main__":
+    unittest.main()
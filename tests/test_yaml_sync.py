@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 from datetime import datetime
 from pathlib import Path
+from ephem.db import chart_hash
 from ephem.yaml_sync import (
     slugify,
     get_charts_dir,
@@ -115,23 +116,61 @@ class TestYamlSync(unittest.TestCase):
         result = find_chart_by_content(modified_chart, db_charts)
         self.assertIsNone(result)
 
+    @patch("ephem.yaml_sync.transaction")
     @patch("ephem.yaml_sync.find_yaml_files")
-    @patch("ephem.yaml_sync.view_charts")
+    @patch("ephem.yaml_sync.content_hashes")
     @patch("ephem.yaml_sync.load_yaml_chart")
     @patch("ephem.yaml_sync.add_chart")
     def test_sync_yaml_to_db(
-        self, mock_add_chart, mock_load_yaml, mock_view_charts, mock_find_files
+        self,
+        mock_add_chart,
+        mock_load_yaml,
+        mock_content_hashes,
+        mock_find_files,
+        mock_transaction,
     ):
         """Test YAML to database synchronization."""
         mock_find_files.return_value = [Path("test-chart.yaml")]
-        mock_view_charts.return_value = []
-        mock_load_yaml.return_value = self.sample_chart
+        mock_content_hashes.return_value = set()
+        mock_load_yaml.return_value = yaml_dict_to_chart(
+            self.sample_yaml_dict, "test-chart.yaml"
+        )
 
         results = sync_yaml_to_db()
 
         self.assertEqual(len(results["added"]), 1)
         self.assertEqual(len(results["errors"]), 0)
         mock_add_chart.assert_called_once()
+        mock_transaction.assert_called_once()
+
+    @patch("ephem.yaml_sync.transaction")
+    @patch("ephem.yaml_sync.find_yaml_files")
+    @patch("ephem.yaml_sync.content_hashes")
+    @patch("ephem.yaml_sync.load_yaml_chart")
+    @patch("ephem.yaml_sync.add_chart")
+    def test_sync_skips_saved_and_repeated_charts(
+        self,
+        mock_add_chart,
+        mock_load_yaml,
+        mock_content_hashes,
+        mock_find_files,
+        mock_transaction,
+    ):
+        """Files whose content hash is already saved are not added again."""
+        saved = yaml_dict_to_chart(self.sample_yaml_dict, "test-chart.yaml")
+        new = dict(saved, name="Other Chart")
+        mock_find_files.return_value = [
+            Path("test-chart.yaml"),
+            Path("other-chart.yaml"),
+            Path("other-chart-copy.yaml"),
+        ]
+        mock_content_hashes.return_value = {chart_hash(**saved)}
+        mock_load_yaml.side_effect = [saved, new, dict(new)]
+
+        results = sync_yaml_to_db()
+
+        self.assertEqual(results["added"], ["other-chart.yaml"])
+        mock_add_chart.assert_called_once()
 
     @patch("ephem.yaml_sync.create_tables")
     @patch("ephem.yaml_sync.find_yaml_files")